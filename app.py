@@ -1,7 +1,10 @@
 import streamlit as st
-from utils.data_fetcher import fetch_options_dates, fetch_option_chain, fetch_stock_data,fetch_options_data
+from utils.data_fetcher import fetch_options_dates, fetch_option_chain, fetch_options_data, chain_version
 from utils.plotters import create_oi_volume_charts, create_treemap, create_donut_chart,create_bar_chart
 from utils.data_transformer import transform_options_df, reorder_and_round
+from utils.figure_cache import cached_figure
+from utils.intraday import intraday_feed
+from utils.timing import start_run, finish_run, render_chart, render_debug_panel
 
 import yfinance as yf
 import pandas as pd
@@ -10,9 +13,42 @@ import pandas as pd
 st.set_page_config(layout="wide")
 st.title("Real-Time Stock Options Data")
 
+
+def _fmt(value, pattern):
+    return "n/a" if value is None or pd.isna(value) else pattern.format(value)
+
+
+def render_price_header(ticker):
+    """
+    Current price and volume against the previous session, daily RSI and
+    50/200-day moving averages, and today's VWAP from 1-minute bars.
+    Each rerun only processes bars that arrived since the last poll.
+    """
+    daily = intraday_feed.bars(ticker, "1d")
+    today, previous = daily.latest(), daily.latest(1)
+    if today is None:
+        st.warning(f"No price history for {ticker}.")
+        return
+    previous = previous or today
+    try:
+        vwap = (intraday_feed.bars(ticker, "1m").latest() or {}).get("VWAP")
+    except Exception:
+        vwap = None
+
+    price, volume, rsi, ma50, ma200, vwap_col = st.columns(6)
+    price.metric("Current Price", _fmt(today["Close"], "${:,.2f}"), _fmt(today["Close"] - previous["Close"], "{:+,.2f}"))
+    volume.metric("Volume", _fmt(today["Volume"], "{:,.0f}"), _fmt(today["Volume"] - previous["Volume"], "{:+,.0f}"))
+    rsi.metric("RSI (14)", _fmt(today["RSI"], "{:.1f}"))
+    ma50.metric("50-day MA", _fmt(today["SMA_50"], "${:,.2f}"))
+    ma200.metric("200-day MA", _fmt(today["SMA_200"], "${:,.2f}"))
+    vwap_col.metric("VWAP (1m)", _fmt(vwap, "${:,.2f}"))
+
 # Sidebar for Navigation
 st.sidebar.title("Navigation")
 page = st.sidebar.radio("Select a page:", ["Options Data", "Gamma Exposure"])
+profile_stages = st.sidebar.checkbox("Profile page stages", value=False)
+track_memory = st.sidebar.checkbox("Track peak memory (slower)", value=False, disabled=not profile_stages)
+start_run(page, enabled=profile_stages, track_memory=track_memory)
 
 if page == "Options Data":
     # Arrange ticker, expiry date, and color selections in a single row
@@ -22,7 +58,8 @@ if page == "Options Data":
         ticker = st.text_input("Ticker", value="AAPL")
 
     with col2:
-        selected_expiries = st.multiselect("Expiry Date(s)", options=fetch_options_dates(ticker), default=[fetch_options_dates(ticker)[0]])
+        expiry_options = fetch_options_dates(ticker)
+        selected_expiries = st.multiselect("Expiry Date(s)", options=expiry_options, default=[expiry_options[0]])
 
     with col3:
         discrete_palette = st.selectbox("Discrete Palette", ["Plotly", "Pastel", "Dark2"], index=0)
@@ -30,46 +67,38 @@ if page == "Options Data":
     with col4:
         continuous_scale = st.selectbox("Continuous Scale", ["Hot", "Reds", "Viridis"], index=0)
 
-    # Fetch stock data
-    stock_data = fetch_stock_data(ticker)
-
-    # Get current & previous day's values
-    current_price = stock_data['Close'][0]
-    prev_price = stock_data['Close'][1] if len(stock_data) > 1 else current_price
-    price_change = current_price - prev_price
-    price_arrow = "↑" if price_change > 0 else "↓" if price_change < 0 else "→"
-
-    volume = stock_data['Volume'][0]
-    prev_volume = stock_data['Volume'][1] if len(stock_data) > 1 else volume
-    volume_change = volume - prev_volume
-    volume_arrow = "↑" if volume_change > 0 else "↓" if volume_change < 0 else "→"
+    # Price, volume and indicators from the shared bar buffers
+    render_price_header(ticker)
 
    
 
     if selected_expiries:
         expiry_date = selected_expiries[0]  # Assuming user selects a date
         calls, puts = fetch_option_chain(ticker, expiry_date)
+        data_version = chain_version(ticker, expiry_date)
 
         # Further processing and visualization
         call_vol_sum = calls['volume'].sum()
         put_vol_sum = puts['volume'].sum()
 
-        donut_fig = create_donut_chart(call_vol_sum, put_vol_sum, discrete_palette)
-        treemap_fig = create_treemap(calls, puts, continuous_scale, expiry_date)
+        donut_fig = cached_figure(data_version, (ticker,), create_donut_chart, call_vol_sum, put_vol_sum, discrete_palette)
+        treemap_fig = cached_figure(data_version, (ticker,), create_treemap, calls, puts, continuous_scale, expiry_date)
 
         colA, colB = st.columns(2)
         with colA:
-            st.plotly_chart(donut_fig, use_container_width=True, key="volume_ratio_donut")
+            render_chart(donut_fig, use_container_width=True, key="volume_ratio_donut")
         with colB:
-            st.plotly_chart(treemap_fig, use_container_width=True, key="treemap")
+            render_chart(treemap_fig, use_container_width=True, key="treemap")
 
         # Bar charts for OI & Volume
-        fig_oi, fig_volume = create_oi_volume_charts(calls, puts, discrete_palette)
-        st.plotly_chart(fig_oi, use_container_width=True, key="oi_chart")
-        st.plotly_chart(fig_volume, use_container_width=True, key="vol_chart")
+        fig_oi, fig_volume = cached_figure(data_version, (ticker, expiry_date), create_oi_volume_charts,
+                                           calls, puts, discrete_palette)
+        render_chart(fig_oi, use_container_width=True, key="oi_chart")
+        render_chart(fig_volume, use_container_width=True, key="vol_chart")
 
         calls["Type"] = "Call"
         puts["Type"] = "Put"
+        calls["expiry"] = puts["expiry"] = expiry_date
         combined_options = pd.concat([calls, puts]).sort_values(by="volume", ascending=False).head(20)
         combined_options = transform_options_df(combined_options)
 
@@ -85,7 +114,8 @@ if page == "Gamma Exposure":
         ticker = st.text_input("Ticker", value="AAPL")
 
     with col2:
-        selected_expiries = st.multiselect("Expiry Date(s)", options=fetch_options_dates(ticker), default=[fetch_options_dates(ticker)[0]])
+        expiry_options = fetch_options_dates(ticker)
+        selected_expiries = st.multiselect("Expiry Date(s)", options=expiry_options, default=[expiry_options[0]])
 
     with col3:
         discrete_palette = st.selectbox("Discrete Palette", ["Plotly", "Pastel", "Dark2"], index=0)
@@ -93,26 +123,14 @@ if page == "Gamma Exposure":
     with col4:
         continuous_scale = st.selectbox("Continuous Scale", ["Hot", "Reds", "Viridis"], index=0)
 
-    # Fetch stock data
-    stock_data = fetch_stock_data(ticker)
-
-    # Get current & previous day's values
-    current_price = stock_data['Close'][0]
-    prev_price = stock_data['Close'][1] if len(stock_data) > 1 else current_price
-    price_change = current_price - prev_price
-    price_arrow = "↑" if price_change > 0 else "↓" if price_change < 0 else "→"
-
-    volume = stock_data['Volume'][0]
-    prev_volume = stock_data['Volume'][1] if len(stock_data) > 1 else volume
-    volume_change = volume - prev_volume
-    volume_arrow = "↑" if volume_change > 0 else "↓" if volume_change < 0 else "→"
+    # Price, volume and indicators from the shared bar buffers
+    render_price_header(ticker)
 
    
 
 
     symbol = ticker
-    stock = yf.Ticker(symbol)
-    expiration_dates = stock.options
+    expiration_dates = expiry_options
 
     # Multi-select for expiration dates
   
@@ -126,8 +144,11 @@ if page == "Gamma Exposure":
             fig_delta = create_bar_chart(combined, 'delta_exposure', f'Delta Exposure for {symbol} Options Expiring on {expiration_date}')
             fig_vanna = create_bar_chart(combined, 'vanna_exposure', f'Vanna Exposure for {symbol} Options Expiring on {expiration_date}')
 
-            st.plotly_chart(fig_gamma)
-            st.plotly_chart(fig_delta)
-            st.plotly_chart(fig_vanna)
+            render_chart(fig_gamma)
+            render_chart(fig_delta)
+            render_chart(fig_vanna)
     else:
-        st.write("Please select at least one expiration date.")
\ No newline at end of file
+        st.write("Please select at least one expiration date.")
+
+if profile_stages:
+    render_debug_panel(finish_run())
@@ -0,0 +1,155 @@
+# benchmarks/import_report.py
+"""
+Cold-start report for the Streamlit app: import time of the app shell and
+each page module, and time to first render of each page.
+
+Every measurement runs in a fresh interpreter so nothing is already
+imported. First renders use Streamlit's AppTest (Streamlit >= 1.28) against
+a synthetic chain served by the replay provider, so no network is needed.
+Pass several --scripts (e.g. an older YahooOptions.py saved from git) to
+compare them.
+
+Usage (from the repository root):
+    python -m benchmarks.import_report
+    python -m benchmarks.import_report --scripts YahooOptions.py old_YahooOptions.py --repeat 5
+"""
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.synthetic_chain import SyntheticProvider
+from utils.providers import record_snapshot
+
+# What YahooOptions.py imported at the top before the pages were split out.
+MONOLITH_IMPORTS = (
+    "streamlit", "pandas", "plotly.express", "plotly.graph_objects",
+    "py_vollib.black_scholes.greeks.analytical",
+    "utils.option_charts", "utils.exposures", "utils.quotes", "utils.figure_cache",
+    "utils.timing", "utils.refresher", "utils.data_fetcher",
+)
+APP_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "YahooOptions.py")
+REPORT_TICKER = "AAPL"
+
+
+def shell_imports(script=APP_SCRIPT):
+    """Modules the app script imports at the top level, in order, read from its source."""
+    with open(script) as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            names = [node.module]
+        else:
+            continue
+        modules.extend(name for name in names if name not in modules)
+    return tuple(modules)
+
+
+def page_modules(script=APP_SCRIPT):
+    """The app script's PAGES dict (page name -> module), read from its source."""
+    with open(script) as f:
+        tree = ast.parse(f.read())
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(t, "id", None) == "PAGES" for t in node.targets):
+            return ast.literal_eval(node.value)
+    raise ValueError(f"{script} defines no PAGES dict")
+
+
+SHELL_IMPORTS = shell_imports()
+PAGE_MODULES = page_modules()
+
+_IMPORT_CODE = """
+import importlib, json, sys, time
+start = time.perf_counter()
+for name in sys.argv[1:]:
+    importlib.import_module(name)
+print(json.dumps({"seconds": time.perf_counter() - start, "modules": len(sys.modules)}))
+"""
+
+_RENDER_CODE = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+script, page = sys.argv[1], sys.argv[2]
+at = AppTest.from_file(script, default_timeout=120)
+start = time.perf_counter()
+at.run()
+first = time.perf_counter() - start
+switch = None
+if page:
+    start = time.perf_counter()
+    at.sidebar.radio[0].set_value(page).run()
+    switch = time.perf_counter() - start
+print(json.dumps({"first_run_s": first, "page_switch_s": switch, "exceptions": len(at.exception)}))
+"""
+
+
+def _run(code, args, env=None):
+    result = subprocess.run([sys.executable, "-c", code, *args], capture_output=True, text=True, env=env)
+    if result.returncode != 0:
+        return {"error": result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed"}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def time_imports(modules, repeat):
+    """Median cold import time of modules (in order) over repeat fresh interpreters."""
+    runs = [_run(_IMPORT_CODE, modules) for _ in range(repeat)]
+    if any("error" in r for r in runs):
+        return {"error": next(r["error"] for r in runs if "error" in r)}
+    return {
+        "median_s": statistics.median(r["seconds"] for r in runs),
+        "modules_loaded": runs[-1]["modules"],
+    }
+
+
+def time_first_render(script, page, replay_dir, repeat):
+    """Median cold first run of script, then of switching to page, over fresh interpreters."""
+    env = dict(os.environ, OPTIONS_REPLAY_DIR=replay_dir)
+    runs = [_run(_RENDER_CODE, [os.path.abspath(script), page or ""], env=env) for _ in range(repeat)]
+    if any("error" in r for r in runs):
+        return {"error": next(r["error"] for r in runs if "error" in r)}
+    report = {"first_run_s": statistics.median(r["first_run_s"] for r in runs),
+              "exceptions": max(r["exceptions"] for r in runs)}
+    if page:
+        report["page_switch_s"] = statistics.median(r["page_switch_s"] for r in runs)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure cold import and first-render times of the app.")
+    parser.add_argument("--scripts", nargs="+", default=["YahooOptions.py"], help="App scripts to compare.")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters per measurement; medians are reported.")
+    parser.add_argument("--contracts", type=int, default=20_000, help="Size of the synthetic chain rendered.")
+    parser.add_argument("-o", "--output", help="Write JSON here instead of stdout.")
+    args = parser.parse_args(argv)
+
+    report = {"imports": {}, "first_render": {}}
+    report["imports"]["pre-split top-level imports"] = time_imports(MONOLITH_IMPORTS, args.repeat)
+    report["imports"]["shell"] = time_imports(SHELL_IMPORTS, args.repeat)
+    for page, module in PAGE_MODULES.items():
+        report["imports"][f"shell + {page}"] = time_imports(SHELL_IMPORTS + (module,), args.repeat)
+
+    with tempfile.TemporaryDirectory() as replay_dir:
+        record_snapshot(REPORT_TICKER, replay_dir, source=SyntheticProvider(args.contracts))
+        for script in args.scripts:
+            report["first_render"][script] = {
+                page: time_first_render(script, page, replay_dir, args.repeat) for page in PAGE_MODULES
+            }
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(payload)
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+# benchmarks/run_benchmarks.py
+"""
+Offline benchmark of the options analysis pipeline on synthetic chains.
+
+Times each stage (symbol parsing, chain compaction, expiry selection,
+Greeks, IV solving, exposure reductions, scenario grids and figure building) for a range of chain sizes and
+writes the results as JSON, so runs can be compared over time.
+
+Usage (from the repository root):
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --sizes 1000 100000 --repeat 5 -o bench.json
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic_chain import synthetic_chain
+from utils.chain import OptionChain
+from utils.data_transformer import extract_expiry_from_contract, parse_contract_symbols
+from utils.exposures import add_exposures, gamma_profile, strike_exposures, years_to_expiry
+from utils.greeks import bs_greeks, chain_prices, implied_volatility
+from utils.option_charts import create_heatmap
+from utils.scenarios import scenario_grid
+from utils.plotters import create_bar_chart, create_treemap
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+SPOT = 100.0
+
+
+def time_stage(fn, repeat):
+    """Runs fn repeat times; returns best and median wall time in seconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return {"best_s": min(times), "median_s": statistics.median(times), "runs": repeat}
+
+
+def benchmark_size(n_contracts, n_expiries, repeat, scalar_cap, scenario_cap, seed):
+    """Times every pipeline stage for one synthetic chain size."""
+    calls, puts = synthetic_chain(n_contracts, n_expiries=n_expiries, spot=SPOT, seed=seed)
+    chain_frame = pd.concat([calls, puts], ignore_index=True)
+    symbols = chain_frame["contractSymbol"]
+    scalar_symbols = symbols.iloc[:scalar_cap]
+
+    for df in (calls, puts):
+        df["extracted_expiry"] = parse_contract_symbols(df["contractSymbol"])["expiry"]
+    chain = OptionChain(calls, puts)
+    flags = np.where(chain.frame["type"] == "Call", "c", "p")
+    t = years_to_expiry(chain.frame["extracted_expiry"])
+    strikes = chain.frame["strike"].to_numpy(dtype=float)
+    ivs = chain.frame["impliedVolatility"].to_numpy(dtype=float)
+    prices = chain_prices(chain.frame)
+
+    exp_calls = add_exposures(chain.calls, "c", SPOT, years_to_expiry(chain.calls["extracted_expiry"]))
+    exp_puts = add_exposures(chain.puts, "p", SPOT, years_to_expiry(chain.puts["extracted_expiry"]))
+
+    # Figures are built for the nearest expiry, as the pages do.
+    nearest = chain.frame["extracted_expiry"].min()
+    near_calls = exp_calls[exp_calls["extracted_expiry"] == nearest]
+    near_puts = exp_puts[exp_puts["extracted_expiry"] == nearest]
+    near_combined = pd.concat([near_calls.assign(type="Call"), near_puts.assign(type="Put")], ignore_index=True)
+    # The middle half of the nearest expiry's strikes, as a zoomed page shows.
+    near_strikes = near_calls["strike"].to_numpy(dtype=float)
+    strike_range = tuple(np.quantile(near_strikes, [0.25, 0.75])) if len(near_strikes) else (SPOT, SPOT)
+    # The scenario grid re-prices every contract 5000 times, so it runs on
+    # at most scenario_cap contracts (a full SPX chain is roughly 20k).
+    grid_calls, grid_puts = chain.calls.iloc[:scenario_cap // 2], chain.puts.iloc[:scenario_cap // 2]
+
+    stages = [
+        ("extract_expiry_from_contract", len(scalar_symbols), lambda: scalar_symbols.apply(extract_expiry_from_contract)),
+        ("parse_contract_symbols", len(symbols), lambda: parse_contract_symbols(symbols)),
+        ("build_option_chain", len(chain), lambda: OptionChain(calls, puts)),
+        ("select_expiry_mask", len(chain), lambda: [
+            df[(df["extracted_expiry"] == nearest) & (df["strike"] >= strike_range[0]) & (df["strike"] <= strike_range[1])]
+            for df in (chain.calls, chain.puts)
+        ]),
+        ("select_expiry_index", len(chain), lambda: chain.select(nearest, strike_range)),
+        ("bs_greeks", len(chain), lambda: bs_greeks(flags, SPOT, strikes, t, ivs)),
+        ("implied_volatility", len(chain), lambda: implied_volatility(prices, flags, SPOT, strikes, t)),
+        ("add_exposures", len(chain), lambda: (
+            add_exposures(chain.calls, "c", SPOT, years_to_expiry(chain.calls["extracted_expiry"])),
+            add_exposures(chain.puts, "p", SPOT, years_to_expiry(chain.puts["extracted_expiry"])),
+        )),
+        ("strike_exposures", len(chain), lambda: strike_exposures(exp_calls, exp_puts)),
+        ("gamma_profile", len(near_combined), lambda: gamma_profile(near_calls, near_puts, SPOT)),
+        # The default 50 spot x 20 IV x 5 day grid over the whole chain.
+        ("scenario_grid", len(grid_calls) + len(grid_puts), lambda: scenario_grid(
+            grid_calls, grid_puts, SPOT,
+            years_to_expiry(grid_calls["extracted_expiry"]), years_to_expiry(grid_puts["extracted_expiry"]),
+        )),
+        ("create_heatmap", len(near_combined), lambda: create_heatmap(near_calls, near_puts, value="volume")),
+        ("create_treemap", len(near_combined), lambda: create_treemap(near_calls.copy(), near_puts.copy(), "Viridis", nearest)),
+        ("create_bar_chart", len(near_combined), lambda: create_bar_chart(near_combined, "GEX", "GEX by strike")),
+    ]
+
+    results = []
+    for name, rows, fn in stages:
+        result = {"stage": name, "contracts": len(chain), "rows": rows}
+        result.update(time_stage(fn, repeat))
+        results.append(result)
+        print(f"{len(chain):>9} contracts  {name:<30} {rows:>9} rows  {result['best_s'] * 1000:10.2f} ms", file=sys.stderr)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the options analysis pipeline on synthetic chains.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="Chain sizes (contracts).")
+    parser.add_argument("--expiries", type=int, default=40, help="Expirations per synthetic chain.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per stage; best and median are reported.")
+    parser.add_argument("--scalar-cap", type=int, default=50_000,
+                        help="Max rows for the per-row extract_expiry_from_contract stage.")
+    parser.add_argument("--scenario-cap", type=int, default=25_000,
+                        help="Max contracts for the 50x20x5 scenario_grid stage.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic chain generator.")
+    parser.add_argument("-o", "--output", help="Write JSON here instead of stdout.")
+    args = parser.parse_args(argv)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "seed": args.seed,
+            "expiries": args.expiries,
+            "repeat": args.repeat,
+            "scenario_cap": args.scenario_cap,
+        },
+        "results": [],
+    }
+    for size in args.sizes:
+        report["results"].extend(benchmark_size(size, args.expiries, args.repeat, args.scalar_cap, args.scenario_cap, args.seed))
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(payload)
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+# benchmarks/synthetic_chain.py
+"""
+Seeded synthetic option chains shaped like yfinance's option_chain output,
+for benchmarking the analysis pipeline without network access.
+"""
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from utils.greeks import bs_price
+from utils.providers import DataProvider
+
+
+def synthetic_chain(n_contracts, n_expiries=40, spot=100.0, seed=0, root="SYN", today=None):
+    """
+    Builds a reproducible chain of roughly n_contracts contracts.
+
+    Contracts are split evenly over n_expiries weekly expirations and over
+    calls and puts, with strikes centred on spot. IVs follow a simple smile,
+    prices are Black-Scholes values with a bid/ask spread, and volume and
+    open interest decay away from the money.
+
+    Returns:
+        tuple: (calls, puts) DataFrames with the columns yfinance returns.
+    """
+    rng = np.random.default_rng(seed)
+    today = today or date.today()
+    n_expiries = max(1, min(n_expiries, n_contracts // 2 or 1))
+    per_side = max(1, n_contracts // (2 * n_expiries))
+
+    expiries = [today + timedelta(days=7 * (i + 1)) for i in range(n_expiries)]
+    moneyness = np.linspace(0.5, 1.5, per_side)
+    strikes = np.round(spot * moneyness, 2)
+
+    exp_idx = np.repeat(np.arange(n_expiries), per_side)
+    strike = np.tile(strikes, n_expiries)
+    t = np.array([(e - today).days / 365.0 for e in expiries])[exp_idx]
+    log_m = np.log(strike / spot)
+    iv = np.clip(0.2 + 0.4 * log_m**2 - 0.1 * log_m + rng.normal(0, 0.01, strike.size), 0.05, 3.0)
+    distance = np.abs(log_m)
+
+    frames = []
+    for flag in ("C", "P"):
+        price = bs_price(flag.lower(), spot, strike, t, iv)
+        spread = np.maximum(0.01, price * 0.02)
+        volume = rng.poisson(2000 * np.exp(-8 * distance)).astype(float)
+        volume[rng.random(volume.size) < 0.05] = np.nan
+        date_codes = [expiries[i].strftime("%y%m%d") for i in exp_idx]
+        frames.append(pd.DataFrame({
+            "contractSymbol": [f"{root}{d}{flag}{int(round(k * 1000)):08d}" for d, k in zip(date_codes, strike)],
+            "lastTradeDate": pd.Timestamp(today) - pd.to_timedelta(rng.integers(0, 86400, strike.size), unit="s"),
+            "strike": strike,
+            "lastPrice": np.round(price, 2),
+            "bid": np.round(np.maximum(price - spread / 2, 0), 2),
+            "ask": np.round(price + spread / 2, 2),
+            "change": np.round(rng.normal(0, 0.1, strike.size), 2),
+            "percentChange": np.round(rng.normal(0, 5, strike.size), 2),
+            "volume": volume,
+            "openInterest": rng.poisson(5000 * np.exp(-5 * distance)),
+            "impliedVolatility": iv,
+            "inTheMoney": (strike < spot) if flag == "C" else (strike > spot),
+            "contractSize": "REGULAR",
+            "currency": "USD",
+        }))
+    return frames[0], frames[1]
+
+
+class SyntheticProvider(DataProvider):
+    """
+    Data provider serving one seeded synthetic chain for any ticker, e.g. as
+    the source for record_snapshot() when building an offline replay set.
+    """
+    name = "synthetic"
+
+    def __init__(self, n_contracts=10_000, n_expiries=40, spot=100.0, seed=0):
+        self.spot_price = spot
+        calls, puts = synthetic_chain(n_contracts, n_expiries=n_expiries, spot=spot, seed=seed)
+        codes = calls["contractSymbol"].str[-15:-9]
+        self._expiries = pd.to_datetime(codes, format="%y%m%d").dt.strftime("%Y-%m-%d")
+        self._calls, self._puts = calls, puts
+
+    def option_dates(self, ticker):
+        return tuple(sorted(self._expiries.unique()))
+
+    def option_chain(self, ticker, expiry_date):
+        mask = (self._expiries == str(expiry_date)).to_numpy()
+        return self._calls[mask].reset_index(drop=True), self._puts[mask].reset_index(drop=True)
+
+    def spot(self, ticker):
+        return self.spot_price, self.name
+
+    def history(self, ticker, period="1d", interval="1d"):
+        today = pd.Timestamp.today().normalize()
+        return pd.DataFrame({"Open": [self.spot_price], "High": [self.spot_price], "Low": [self.spot_price],
+                             "Close": [self.spot_price], "Volume": [0]}, index=pd.DatetimeIndex([today], name="Date"))
@@ -0,0 +1,178 @@
+"""
+Headless exposure scanner.
+
+Fetches the full option chain of every ticker in a watchlist, computes
+GEX/DEX/VEX across all expirations in a process pool and writes a ranked
+summary table. Does not import Streamlit.
+
+Usage:
+    python scan_exposures.py watchlist.txt -o exposures.csv
+    python scan_exposures.py AAPL,TSLA,SPX --sort net_dex --top 20
+    python scan_exposures.py AAPL --replay recorded/ --replay-latency 0.05
+    python scan_exposures.py watchlist.txt --fetch-rate 3 --fetch-burst 10
+    python scan_exposures.py watchlist.txt --store history/
+    python scan_exposures.py AAPL,TSLA --record recorded/
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+from utils.data_fetcher import format_ticker, load_all_options, DEFAULT_MAX_WORKERS, DEFAULT_EXPIRY_TIMEOUT
+from utils.exposures import chain_exposures, exposure_totals, years_to_expiry
+from utils.providers import ReplayProvider, record_snapshot, set_provider
+from utils.quotes import get_spot
+from utils.scheduler import fetch_scheduler
+from utils.store import close_store, open_store
+
+SUMMARY_COLUMNS = [
+    "ticker", "spot", "spot_source", "expiries", "contracts",
+    "call_gex", "put_gex", "net_gex", "net_dex", "net_vex", "errors",
+]
+SORT_CHOICES = ["net_gex", "net_dex", "net_vex", "call_gex", "put_gex"]
+
+# Compute workers start while the fetch threads run. A forked child would
+# inherit any lock one of them held (requests, logging, the caches) and
+# could deadlock on it, so workers start from a clean process instead.
+COMPUTE_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+def read_watchlist(source):
+    """
+    Accepts a path to a file with one ticker per line (blank lines and
+    '#' comments ignored) or a comma-separated list of tickers.
+    """
+    if os.path.isfile(source):
+        with open(source) as f:
+            lines = [line.split("#", 1)[0].strip() for line in f]
+        tickers = [line for line in lines if line]
+    else:
+        tickers = [t.strip() for t in source.split(",") if t.strip()]
+    return list(dict.fromkeys(format_ticker(t) for t in tickers))
+
+
+def fetch_ticker(ticker, expiry_workers, timeout):
+    """I/O half of a scan: spot price and every expiry's chain."""
+    S, source = get_spot(ticker)
+    calls, puts, errors = load_all_options(ticker, max_workers=expiry_workers, timeout=timeout)
+    return ticker, S, source, calls, puts, errors
+
+
+def compute_ticker(ticker, S, source, calls, puts, n_errors):
+    """CPU half of a scan; runs in a worker process."""
+    row = {"ticker": ticker, "spot": S, "spot_source": source, "errors": n_errors}
+    frames = [df for df in (calls, puts) if not df.empty]
+    row["contracts"] = sum(len(df) for df in frames)
+    row["expiries"] = pd.concat([df["extracted_expiry"] for df in frames]).nunique() if frames else 0
+    if S is None or not frames:
+        return row
+
+    # Each contract uses its own time to expiry; nothing to share across
+    # processes, so the exposures are computed without caching.
+    calls, puts = chain_exposures(ticker, None, None, calls, puts, S,
+                                  years_to_expiry(calls["extracted_expiry"]), years_to_expiry(puts["extracted_expiry"]))
+    row.update(exposure_totals(calls, puts))
+    return row
+
+
+def scan(tickers, workers=None, fetch_workers=DEFAULT_MAX_WORKERS, expiry_workers=DEFAULT_MAX_WORKERS,
+         timeout=DEFAULT_EXPIRY_TIMEOUT):
+    """
+    Scans every ticker and returns one summary row per ticker.
+    Chains are fetched on a thread pool; as each arrives, its exposures are
+    computed on a process pool, so fetching and computing overlap.
+    """
+    rows = []
+    with ThreadPoolExecutor(max_workers=fetch_workers) as fetch_pool, \
+            ProcessPoolExecutor(max_workers=workers,
+                                mp_context=multiprocessing.get_context(COMPUTE_START_METHOD)) as compute_pool:
+        fetches = {fetch_pool.submit(fetch_ticker, t, expiry_workers, timeout): t for t in tickers}
+        computes = {}
+        for future in as_completed(fetches):
+            try:
+                ticker, S, source, calls, puts, errors = future.result()
+            except Exception as e:
+                print(f"Skipping {fetches[future]}: {e}", file=sys.stderr)
+                continue
+            computes[compute_pool.submit(compute_ticker, ticker, S, source, calls, puts, len(errors))] = ticker
+        for future in as_completed(computes):
+            try:
+                rows.append(future.result())
+            except Exception as e:
+                print(f"Exposure computation failed for {computes[future]}: {e}", file=sys.stderr)
+    return rows
+
+
+def rank(rows, sort_by="net_gex", top=None):
+    """Summary table ordered by the absolute value of sort_by, largest first."""
+    table = pd.DataFrame(rows).reindex(columns=SUMMARY_COLUMNS)
+    table = table.sort_values(by=sort_by, key=lambda col: col.abs(), ascending=False, na_position="last")
+    if top:
+        table = table.head(top)
+    return table.reset_index(drop=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scan a watchlist for GEX/DEX/VEX totals across all expirations.")
+    parser.add_argument("watchlist", help="File with one ticker per line, or a comma-separated list of tickers.")
+    parser.add_argument("-o", "--output", help="Write the summary to this CSV file instead of stdout.")
+    parser.add_argument("--sort", choices=SORT_CHOICES, default="net_gex", help="Column to rank by (absolute value).")
+    parser.add_argument("--top", type=int, help="Only keep the top N tickers.")
+    parser.add_argument("--workers", type=int, help="Processes computing exposures (default: CPU count).")
+    parser.add_argument("--fetch-workers", type=int, default=DEFAULT_MAX_WORKERS, help="Tickers fetched at once.")
+    parser.add_argument("--expiry-workers", type=int, default=DEFAULT_MAX_WORKERS, help="Expiries fetched at once per ticker.")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_EXPIRY_TIMEOUT, help="Seconds to wait for each expiry.")
+    parser.add_argument("--fetch-rate", type=float,
+                        help="Upstream requests per second, 0 for unlimited (default: OPTIONS_FETCH_RATE, or "
+                             "unlimited with --replay).")
+    parser.add_argument("--fetch-burst", type=int, help="Requests that may go out back to back after an idle period.")
+    parser.add_argument("--replay", metavar="DIR", help="Serve recorded snapshots from DIR instead of Yahoo Finance.")
+    parser.add_argument("--replay-latency", type=float, default=0.0, help="Seconds added to every replayed request.")
+    parser.add_argument("--replay-jitter", type=float, default=0.0, help="Max random extra seconds per replayed request.")
+    parser.add_argument("--replay-rate-limit", type=float,
+                        help="Throttle replayed requests beyond this many per second, like a rate-limited source.")
+    parser.add_argument("--store", metavar="DIR",
+                        help="Also append the fetched chains and their exposures to the snapshot store in DIR.")
+    parser.add_argument("--record", metavar="DIR", help="Record the watchlist's live chains to DIR for --replay, then exit.")
+    args = parser.parse_args(argv)
+
+    tickers = read_watchlist(args.watchlist)
+    if not tickers:
+        parser.error("the watchlist is empty")
+
+    if args.record:
+        for ticker in tickers:
+            errors = record_snapshot(ticker, args.record)
+            print(f"Recorded {ticker} ({len(errors)} expiries failed)", file=sys.stderr)
+        return 0
+    if args.replay:
+        set_provider(ReplayProvider(args.replay, latency=args.replay_latency, jitter=args.replay_jitter,
+                                    rate_limit=args.replay_rate_limit))
+        if args.fetch_rate is None:
+            args.fetch_rate = 0.0
+    fetch_scheduler.configure(rate=args.fetch_rate, burst=args.fetch_burst)
+    if args.store:
+        open_store(args.store)
+
+    rows = scan(tickers, workers=args.workers, fetch_workers=args.fetch_workers,
+                expiry_workers=args.expiry_workers, timeout=args.timeout)
+    # Write out what the store still has queued before exiting.
+    close_store()
+    table = rank(rows, sort_by=args.sort, top=args.top)
+    stats = fetch_scheduler.stats()
+    waits = stats["classes"]["interactive"]
+    print(f"Fetched {waits['requests']} requests (p95 wait {waits['wait_p95_s']:.2f}s, "
+          f"{stats['throttled']} throttled, {stats['gave_up']} given up)", file=sys.stderr)
+
+    if args.output:
+        table.to_csv(args.output, index=False)
+    else:
+        print(table.to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
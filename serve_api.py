@@ -0,0 +1,62 @@
+"""
+Headless HTTP API for chains, Greeks and strike-level exposures.
+
+Does not import Streamlit. See utils/api.py for the endpoints.
+
+Usage:
+    python serve_api.py --port 8502
+    python serve_api.py --replay recorded/ --replay-latency 0.05
+    python serve_api.py --fetch-rate 3 --fetch-burst 10
+    python serve_api.py --store history/
+    curl 'http://127.0.0.1:8502/history?ticker=AAPL&start=2024-06-03T09:30'
+    curl 'http://127.0.0.1:8502/exposures?ticker=AAPL&expiry=all'
+    curl -H 'Accept: application/vnd.apache.arrow.stream' 'http://127.0.0.1:8502/greeks?ticker=AAPL' -o greeks.arrow
+"""
+import argparse
+import logging
+import sys
+
+from utils.api import make_server, DEFAULT_HOST, DEFAULT_PORT
+from utils.providers import ReplayProvider, set_provider
+from utils.scheduler import fetch_scheduler
+from utils.store import close_store, open_store
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve option chains, Greeks and exposures over HTTP.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Interface to bind.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on.")
+    parser.add_argument("--fetch-rate", type=float,
+                        help="Upstream requests per second, 0 for unlimited (default: OPTIONS_FETCH_RATE, or "
+                             "unlimited with --replay).")
+    parser.add_argument("--fetch-burst", type=int, help="Requests that may go out back to back after an idle period.")
+    parser.add_argument("--store", metavar="DIR",
+                        help="Append every fetched chain and its exposures to the snapshot store in DIR "
+                             "(default: OPTIONS_STORE_DIR).")
+    parser.add_argument("--replay", metavar="DIR", help="Serve recorded snapshots from DIR instead of Yahoo Finance.")
+    parser.add_argument("--replay-latency", type=float, default=0.0, help="Seconds added to every replayed request.")
+    parser.add_argument("--replay-jitter", type=float, default=0.0, help="Max random extra seconds per replayed request.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    if args.replay:
+        set_provider(ReplayProvider(args.replay, latency=args.replay_latency, jitter=args.replay_jitter))
+        if args.fetch_rate is None:
+            args.fetch_rate = 0.0
+    fetch_scheduler.configure(rate=args.fetch_rate, burst=args.fetch_burst)
+
+    open_store(args.store)
+    server = make_server(args.host, args.port)
+    print(f"Serving on http://{args.host}:{server.server_address[1]}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        close_store()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
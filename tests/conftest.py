@@ -0,0 +1,21 @@
+import pytest
+
+from benchmarks.synthetic_chain import SyntheticProvider
+from utils.data_fetcher import chain_cache
+from utils.providers import ReplayProvider, get_provider, record_snapshot, set_provider
+from utils.scheduler import fetch_scheduler
+
+
+@pytest.fixture
+def replay(tmp_path):
+    """A 400-contract synthetic SYN chain served by ReplayProvider, with unlimited fetches."""
+    record_snapshot("SYN", str(tmp_path / "replay"), source=SyntheticProvider(400))
+    previous = get_provider()
+    set_provider(ReplayProvider(str(tmp_path / "replay")))
+    rate = fetch_scheduler.rate
+    fetch_scheduler.configure(rate=0)
+    chain_cache.invalidate()
+    yield ReplayProvider
+    fetch_scheduler.configure(rate=rate or 0)
+    set_provider(previous)
+    chain_cache.invalidate()
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from utils.api import handle, to_json
+from utils.scheduler import fetch_scheduler
+
+
+def _reject_constant(name):
+    raise ValueError(f"{name} is not valid JSON")
+
+
+def test_health_is_strict_json_with_unlimited_rate():
+    rate = fetch_scheduler.rate
+    fetch_scheduler.configure(rate=0)
+    try:
+        meta, frame = handle("/health", {})
+        body = json.loads(to_json(meta, frame), parse_constant=_reject_constant)
+    finally:
+        fetch_scheduler.configure(rate=rate or 0)
+    assert body["scheduler"]["rate"] is None
+
+
+def test_non_finite_meta_values_are_sent_as_null():
+    body = json.loads(to_json({"a": float("nan"), "b": [float("inf"), 1.0]}, None), parse_constant=_reject_constant)
+    assert body == {"a": None, "b": [None, 1.0]}
+
+
+def test_unknown_ticker_and_provider_failures(tmp_path, monkeypatch):
+    from benchmarks.synthetic_chain import SyntheticProvider
+    from utils import api
+    from utils.data_fetcher import chain_cache, load_expiry_chain
+    from utils.providers import ReplayProvider, get_provider, record_snapshot, set_provider
+
+    record_snapshot("SYN", str(tmp_path), source=SyntheticProvider(200))
+    previous = get_provider()
+    set_provider(ReplayProvider(str(tmp_path)))
+    chain_cache.invalidate()
+    try:
+        for path in ("/expiries", "/chain", "/exposures"):
+            with pytest.raises(api.ApiError) as error:
+                handle(path, {"ticker": ["NOPE"]})
+            assert error.value.status == 404
+
+        expiry = handle("/expiries", {"ticker": ["SYN"]})[0]["expiries"][0]
+        query = {"ticker": ["SYN"], "expiry": [expiry]}
+        # The single-expiry chain is assembled once and then reused.
+        assert load_expiry_chain("SYN", expiry) is load_expiry_chain("SYN", expiry)
+        assert len(handle("/chain", query)[1])
+
+        def fail(*args):
+            raise ConnectionError("upstream down")
+
+        chain_cache.invalidate()
+        monkeypatch.setattr(ReplayProvider, "option_chain", fail)
+        with pytest.raises(api.ApiError) as error:
+            handle("/chain", query)
+        assert error.value.status == 502
+    finally:
+        set_provider(previous)
+        chain_cache.invalidate()
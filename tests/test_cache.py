@@ -0,0 +1,105 @@
+import threading
+import time
+
+from utils.cache import LoadCancelled, TTLCache
+
+
+def _wait_until(condition, timeout=2.0):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        assert time.perf_counter() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def test_followers_retry_a_cancelled_load():
+    cache = TTLCache(ttl=60, stale_ttl=0)
+    leader_started, release = threading.Event(), threading.Event()
+    results = []
+
+    def abandoned():
+        leader_started.set()
+        release.wait()
+        raise LoadCancelled("caller gave up")
+
+    def leader():
+        try:
+            cache.get_or_load("k", abandoned)
+        except LoadCancelled:
+            results.append("leader cancelled")
+
+    def follower():
+        results.append(cache.get_or_load("k", lambda: "loaded"))
+
+    threads = [threading.Thread(target=leader)]
+    threads[0].start()
+    leader_started.wait()
+    threads.append(threading.Thread(target=follower))
+    threads[1].start()
+    _wait_until(lambda: cache.stats()["coalesced"] == 1)
+    release.set()
+    for thread in threads:
+        thread.join(timeout=1)
+    assert sorted(results) == ["leader cancelled", "loaded"]
+    assert cache.get("k") == "loaded"
+
+
+def test_concurrent_misses_load_once():
+    cache = TTLCache(ttl=60, stale_ttl=0)
+    loads = []
+    gate = threading.Event()
+
+    def loader():
+        loads.append(1)
+        gate.wait()
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("k", loader))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    _wait_until(lambda: cache.stats()["coalesced"] == 7)
+    gate.set()
+    for thread in threads:
+        thread.join(timeout=1)
+    assert results == ["value"] * 8
+    assert len(loads) == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_stale_hit_serves_old_value_while_refreshing(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr("utils.cache.time.monotonic", lambda: clock[0])
+    cache = TTLCache(ttl=10, stale_ttl=100)
+    cache.get_or_load("k", lambda: "old")
+
+    clock[0] = 50.0
+    refreshing, release = threading.Event(), threading.Event()
+
+    def reload():
+        refreshing.set()
+        release.wait()
+        return "new"
+
+    assert cache.get_or_load("k", reload) == "old"
+    assert refreshing.wait(timeout=1)
+    # Still refreshing: further stale hits neither block nor start a second reload.
+    assert cache.get_or_load("k", lambda: "second reload") == "old"
+    release.set()
+    _wait_until(lambda: cache.get("k") == "new")
+    assert cache.get("k") == "new"
+    assert cache.stats()["stale_hits"] == 2
+
+    # Past ttl + stale_ttl the value is reloaded synchronously.
+    clock[0] = 200.0
+    assert cache.get_or_load("k", lambda: "fresh") == "fresh"
+
+
+def test_capacity_evicts_least_recently_used():
+    cache = TTLCache(ttl=60, stale_ttl=0, max_entries=2)
+    cache.get_or_load("a", lambda: 1)
+    cache.get_or_load("b", lambda: 2)
+    cache.get_or_load("a", lambda: "reloaded")  # hit: a becomes most recent
+    cache.get_or_load("c", lambda: 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["entries"] == 2
@@ -0,0 +1,78 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic_chain import synthetic_chain
+from utils.chain import OptionChain
+from utils.data_transformer import parse_contract_symbols
+
+
+@pytest.fixture(scope="module")
+def frames():
+    calls, puts = synthetic_chain(600, n_expiries=4, seed=3)
+    for df in (calls, puts):
+        df["extracted_expiry"] = parse_contract_symbols(df["contractSymbol"])["expiry"]
+    return calls, puts
+
+
+def _expected(df, expiry=None, strike_range=None):
+    # The same selection on the original float64 / object frame.
+    mask = np.ones(len(df), dtype=bool)
+    if expiry is not None:
+        mask &= (df["extracted_expiry"] == pd.Timestamp(expiry)).to_numpy()
+    if strike_range is not None:
+        mask &= ((df["strike"] >= strike_range[0]) & (df["strike"] <= strike_range[1])).to_numpy()
+    return sorted(df.loc[mask, "contractSymbol"])
+
+
+def _symbols(df):
+    return sorted(df["contractSymbol"].astype(str))
+
+
+def test_expiry_partitions_cover_the_chain(frames):
+    calls, puts = frames
+    chain = OptionChain(calls, puts)
+    expiries = sorted(pd.concat([calls, puts])["extracted_expiry"].dt.date.unique())
+    assert list(chain.expiries) == expiries
+    for expiry in expiries:
+        for form in (expiry, str(expiry), pd.Timestamp(expiry)):
+            c, p = chain.select(form)
+            assert _symbols(c) == _expected(calls, expiry) and _symbols(p) == _expected(puts, expiry)
+            assert (c["type"] == "Call").all() and (p["type"] == "Put").all()
+            assert c["strike"].is_monotonic_increasing
+    c, p = chain.select()
+    assert len(c) == len(calls) and len(p) == len(puts)
+
+
+def test_strike_ranges_are_inclusive_despite_float32_strikes(frames):
+    calls, puts = frames
+    chain = OptionChain(calls, puts)
+    assert chain.frame["strike"].dtype == np.float32
+    assert isinstance(chain.frame["contractSymbol"].dtype, pd.CategoricalDtype)
+    expiry = chain.expiries[1]
+    strikes = np.unique(calls.loc[calls["extracted_expiry"] == pd.Timestamp(expiry), "strike"])
+    # Bounds exactly on listed strikes, most of which float32 cannot represent.
+    assert (strikes.astype(np.float32).astype(float) != strikes).any()
+    for low, high in ((strikes[3], strikes[3]), (strikes[1], strikes[-2]), (strikes[0], strikes[-1])):
+        for selected_expiry in (expiry, None):
+            c, p = chain.select(selected_expiry, strike_range=(low, high))
+            assert _symbols(c) == _expected(calls, selected_expiry, (low, high))
+            assert _symbols(p) == _expected(puts, selected_expiry, (low, high))
+            assert len(c) > 0
+
+
+def test_empty_selections(frames):
+    calls, puts = frames
+    chain = OptionChain(calls, puts)
+    expiry = chain.expiries[0]
+    strikes = np.unique(calls["strike"])
+    between = (strikes[0] + strikes[1]) / 2
+    for strike_range in ((between, between), (strikes[-1] + 1, strikes[-1] + 10), (strikes[1], strikes[0])):
+        for selected_expiry in (expiry, None):
+            c, p = chain.select(selected_expiry, strike_range=strike_range)
+            assert c.empty and p.empty
+    c, p = chain.select(date(2099, 1, 1))
+    assert c.empty and p.empty
+    assert list(c.columns) == list(chain.frame.columns)
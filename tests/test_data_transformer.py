@@ -0,0 +1,42 @@
+import pandas as pd
+
+from utils.data_transformer import _parse_regex, extract_expiry_from_contract, parse_contract_symbols
+
+SYMBOLS = pd.Series([
+    "AAPL240621C00150000",
+    "AAPL240621P00152500",
+    "SPXW240621C05000000",
+    "BRKB690101P00001500",   # 1969 by the %y century pivot
+    "SPX20240621P00150000",  # 8-digit date: regex fallback
+    "XYZ240621C150",         # short strike: regex fallback
+    "AAPL241331C00150000",   # month 13
+    "AAPL240631C00150000",   # June 31
+    "ÄPL240621C00150000",    # non-ASCII
+    "SPY240621X00150000",
+    "nan",
+    "",
+])
+
+
+def test_fast_path_matches_regex():
+    pd.testing.assert_frame_equal(parse_contract_symbols(SYMBOLS), _parse_regex(SYMBOLS), check_dtype=False)
+
+
+def test_regular_symbols():
+    parsed = parse_contract_symbols(SYMBOLS.iloc[:4])
+    assert parsed["root"].tolist() == ["AAPL", "AAPL", "SPXW", "BRKB"]
+    assert parsed["flag"].tolist() == ["C", "P", "C", "P"]
+    assert parsed["strike"].tolist() == [150.0, 152.5, 5000.0, 1.5]
+    assert [d.date() for d in parsed["expiry"]] == [extract_expiry_from_contract(s) for s in SYMBOLS.iloc[:4]]
+
+
+def test_mixed_roots_and_lengths_keep_their_index():
+    symbols = pd.Series(["TSLA240621C00200000", "F240621P00012000", "AAPL240621C00150000"], index=[7, 3, 5])
+    parsed = parse_contract_symbols(symbols)
+    assert parsed.index.tolist() == [7, 3, 5]
+    assert parsed["root"].tolist() == ["TSLA", "F", "AAPL"]
+    assert parsed["strike"].tolist() == [200.0, 12.0, 150.0]
+
+
+def test_empty():
+    assert parse_contract_symbols(pd.Series([], dtype=object)).empty
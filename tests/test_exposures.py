@@ -0,0 +1,46 @@
+import numpy as np
+
+from benchmarks.synthetic_chain import synthetic_chain
+from utils.data_transformer import parse_contract_symbols
+from utils.exposures import add_exposures, exposure_totals, gamma_profile, years_to_expiry
+
+S = 100.0
+
+
+def _exposures(solve_iv):
+    calls, puts = synthetic_chain(400, n_expiries=2, spot=S, seed=5)
+    frames = []
+    for df, flag in ((calls, "c"), (puts, "p")):
+        df["extracted_expiry"] = parse_contract_symbols(df["contractSymbol"])["expiry"]
+        frames.append(add_exposures(df, flag, S, years_to_expiry(df["extracted_expiry"]), solve_iv=solve_iv))
+    return frames
+
+
+def test_gamma_profile_at_spot_matches_net_gex():
+    for solve_iv in (False, True):
+        calls, puts = _exposures(solve_iv)
+        # An odd number of points puts the middle one exactly at S.
+        spots, net_gex = gamma_profile(calls, puts, S, points=81, solve_iv=solve_iv)
+        assert spots[40] == S
+        assert np.isclose(net_gex[40], exposure_totals(calls, puts)["net_gex"], rtol=1e-9)
+
+
+def test_chain_gamma_profile_is_computed_once_per_snapshot(monkeypatch):
+    from utils import exposures
+
+    calls, puts = _exposures(False)
+    calls_made = []
+    real = exposures.gamma_profile
+
+    def counting(*args, **kwargs):
+        calls_made.append(1)
+        return real(*args, **kwargs)
+
+    monkeypatch.setattr(exposures, "gamma_profile", counting)
+    exposures.exposure_cache.invalidate()
+    first = exposures.chain_gamma_profile("SYN", ("v1",), "All expirations", calls, puts, S)
+    again = exposures.chain_gamma_profile("SYN", ("v1",), "All expirations", calls, puts, S)
+    assert again is first and len(calls_made) == 1
+    exposures.chain_gamma_profile("SYN", ("v2",), "All expirations", calls, puts, S)
+    assert len(calls_made) == 2
+    exposures.exposure_cache.invalidate()
@@ -0,0 +1,73 @@
+import math
+
+import numpy as np
+import pytest
+
+from utils.greeks import GREEKS_TOLERANCE, bs_greeks, bs_price, implied_volatility
+
+S = 100.0
+
+
+def _reference_greeks(flag, K, t, sigma):
+    # The per-row py_vollib computation bs_greeks replaced (r = 0).
+    analytical = pytest.importorskip("py_vollib.black_scholes.greeks.analytical")
+    d2 = (math.log(S / K) - 0.5 * sigma**2 * t) / (sigma * math.sqrt(t))
+    vega = analytical.vega(flag, S, K, t, 0, sigma)
+    return {
+        "delta": analytical.delta(flag, S, K, t, 0, sigma),
+        "gamma": analytical.gamma(flag, S, K, t, 0, sigma),
+        "vega": vega,
+        "vanna": -vega * d2 / (S * sigma * math.sqrt(t)),
+    }
+
+
+@pytest.mark.parametrize("flag", ["c", "p"])
+@pytest.mark.parametrize("t", [1 / 365, 30 / 365, 2.0], ids=["1d", "30d", "2y"])
+@pytest.mark.parametrize("sigma", [0.15, 0.8])
+def test_greeks_match_py_vollib(flag, t, sigma):
+    # Deep and slightly in/out of the money on both sides, and at the money.
+    strikes = np.array([60.0, 95.0, 100.0, 105.0, 160.0])
+    greeks = bs_greeks(flag, S, strikes, t, sigma)
+    for i, K in enumerate(strikes):
+        for name, expected in _reference_greeks(flag, K, t, sigma).items():
+            assert abs(greeks[name][i] - expected) <= GREEKS_TOLERANCE, (name, K)
+
+
+def test_invalid_inputs_get_nan_greeks():
+    # Zero strike, expired, missing IV.
+    greeks = bs_greeks(["p", "c", "p"], S, [0.0, 100.0, 100.0], [0.5, 0.0, 0.5], [0.2, 0.2, np.nan])
+    for values in greeks.values():
+        assert np.isnan(values).all()
+
+
+def test_deep_in_the_money_round_trip():
+    # Calls far below spot and puts far above it, where the price is almost
+    # all intrinsic value.
+    strikes = np.array([50.0, 60.0, 70.0, 140.0, 160.0, 200.0])
+    flags = np.array(["c", "c", "c", "p", "p", "p"])
+    t = np.array([1.0, 0.5, 0.25, 0.25, 0.5, 1.0])
+    sigma = np.array([0.35, 0.3, 0.25, 0.25, 0.3, 0.35])
+    iv, converged = implied_volatility(bs_price(flags, S, strikes, t, sigma), flags, S, strikes, t)
+    assert converged.all()
+    np.testing.assert_allclose(iv, sigma, atol=1e-5)
+
+
+def test_unresolvable_time_value_is_not_converged():
+    # At 12% vol the time value of this call is far below double precision
+    # of its price: no volatility can be recovered, and none is claimed.
+    price = bs_price("c", S, 40.0, 0.25, 0.122)
+    iv, converged = implied_volatility(price, "c", S, 40.0, 0.25)
+    assert not converged
+    assert np.isnan(iv)
+
+
+def test_random_contracts_never_converge_to_a_wrong_iv():
+    rng = np.random.default_rng(0)
+    n = 5000
+    strikes = rng.uniform(30, 250, n)
+    t = rng.uniform(2 / 365, 2, n)
+    sigma = rng.uniform(0.05, 1.5, n)
+    flags = np.where(rng.random(n) < 0.5, "c", "p")
+    iv, converged = implied_volatility(bs_price(flags, S, strikes, t, sigma), flags, S, strikes, t)
+    assert converged.mean() > 0.95
+    assert np.abs(iv[converged] - sigma[converged]).max() < 1e-4
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.intraday import BarBuffer
+
+CAPACITY = 64
+SMA_PERIODS = (5, 100)  # one window longer than the buffer
+EMA_PERIOD = 10
+RSI_PERIOD = 14
+
+
+def _bars(days=3, per_day=120, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.DatetimeIndex([pd.Timestamp(f"2026-10-{19 + d} 09:30") + pd.Timedelta(minutes=m)
+                              for d in range(days) for m in range(per_day)], name="Datetime")
+    close = 100 + np.cumsum(rng.normal(0, 0.3, len(index)))
+    spread = rng.uniform(0.05, 0.5, len(index))
+    return pd.DataFrame({"Open": close + rng.normal(0, 0.1, len(index)), "High": close + spread,
+                         "Low": close - spread, "Close": close,
+                         "Volume": rng.integers(100, 10_000, len(index)).astype(float)}, index=index)
+
+
+def _seeded_ewm(values, period, alpha):
+    # Mean of the first `period` values, then exponential smoothing.
+    seeded = pd.concat([pd.Series([values.iloc[:period].mean()]), values.iloc[period:]], ignore_index=True)
+    smoothed = seeded.ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    return pd.Series(np.r_[np.full(period - 1, np.nan), smoothed], index=values.index)
+
+
+def _reference(bars):
+    close = bars["Close"]
+    ref = pd.DataFrame(index=bars.index)
+    change = close.diff().iloc[1:]
+    gain = _seeded_ewm(change.clip(lower=0), RSI_PERIOD, 1 / RSI_PERIOD)
+    loss = _seeded_ewm((-change).clip(lower=0), RSI_PERIOD, 1 / RSI_PERIOD)
+    ref["RSI"] = 100 - 100 / (1 + gain / loss)
+    for n in SMA_PERIODS:
+        ref[f"SMA_{n}"] = close.rolling(n).mean()
+    ref[f"EMA_{EMA_PERIOD}"] = _seeded_ewm(close, EMA_PERIOD, 2 / (EMA_PERIOD + 1))
+    typical_volume = (bars["High"] + bars["Low"] + close) / 3 * bars["Volume"]
+    day = bars.index.normalize()
+    ref["VWAP"] = typical_volume.groupby(day).cumsum() / bars["Volume"].groupby(day).cumsum()
+    return ref
+
+
+def _buffer():
+    return BarBuffer(CAPACITY, rsi_period=RSI_PERIOD, sma_periods=SMA_PERIODS, ema_periods=(EMA_PERIOD,))
+
+
+def _assert_matches(buffer, bars):
+    frame = buffer.frame()
+    expected = _reference(bars).iloc[-CAPACITY:]
+    assert list(frame.index) == list(expected.index)
+    np.testing.assert_allclose(frame[list(bars.columns)], bars.iloc[-CAPACITY:], rtol=0, atol=0)
+    for column in expected.columns:
+        np.testing.assert_allclose(frame[column], expected[column], rtol=1e-9, err_msg=column)
+
+
+def test_indicators_match_pandas_across_wraparound_and_sessions():
+    bars = _bars()
+    buffer = _buffer()
+    assert buffer.extend(bars) == len(bars)
+    assert len(buffer) == CAPACITY < len(bars)
+    _assert_matches(buffer, bars)
+    assert buffer.latest()["time"] == bars.index[-1]
+    assert buffer.latest(back=CAPACITY - 1)["time"] == bars.index[-CAPACITY]
+    assert buffer.latest(back=CAPACITY) is None
+
+
+def test_vwap_restarts_each_session():
+    bars = _bars()
+    buffer = _buffer()
+    buffer.extend(bars.iloc[:121])  # the first bar of day 2 has just arrived
+    first = bars.iloc[120]
+    assert buffer.latest()["VWAP"] == pytest.approx((first["High"] + first["Low"] + first["Close"]) / 3)
+
+
+def test_incremental_polls_and_revised_last_bar():
+    bars = _bars()
+    buffer = _buffer()
+    # Overlapping polls, as the feed sees them; the forming last bar of each
+    # poll is revised by the next one.
+    for end in range(30, len(bars) + 1, 25):
+        poll = bars.iloc[max(0, end - 40):end].copy()
+        if end < len(bars):
+            poll.iloc[-1, poll.columns.get_loc("Close")] += 5.0
+        buffer.extend(poll)
+    buffer.extend(bars.iloc[-40:])
+    _assert_matches(buffer, bars)
+
+
+def test_bars_must_arrive_in_time_order():
+    bars = _bars(days=1, per_day=3)
+    buffer = _buffer()
+    buffer.extend(bars)
+    with pytest.raises(ValueError):
+        buffer.append(bars.index[0], 1.0, 1.0, 1.0, 1.0, 1.0)
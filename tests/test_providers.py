@@ -0,0 +1,25 @@
+import pytest
+
+from benchmarks.synthetic_chain import SyntheticProvider
+from utils.providers import DataProvider, ReplayProvider
+
+
+class _NoHistory(DataProvider):
+    def option_dates(self, ticker):
+        return ()
+
+    def option_chain(self, ticker, expiry_date):
+        return None
+
+    def spot(self, ticker):
+        return None, None
+
+
+def test_incomplete_provider_fails_at_construction():
+    with pytest.raises(TypeError):
+        _NoHistory()
+
+
+def test_shipped_providers_implement_the_interface(tmp_path):
+    ReplayProvider(str(tmp_path))
+    SyntheticProvider(n_contracts=10, n_expiries=1)
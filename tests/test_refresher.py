@@ -0,0 +1,50 @@
+import pytest
+
+from utils.data_fetcher import chain_cache
+from utils.providers import get_provider
+from utils.refresher import ChainRefresher
+
+
+def test_failed_expiry_does_not_drop_the_others(replay, monkeypatch):
+    expiries = get_provider().option_dates("SYN")
+    assert len(expiries) > 1
+    all_ok = ChainRefresher().refresh("SYN")
+    chain_cache.invalidate()
+
+    real = replay.option_chain
+
+    def flaky(self, ticker, expiry_date):
+        if str(expiry_date) == expiries[0]:
+            raise ConnectionError("upstream down")
+        return real(self, ticker, expiry_date)
+
+    monkeypatch.setattr(replay, "option_chain", flaky)
+    diff = ChainRefresher().refresh("SYN")
+    assert 0 < diff["added"] < all_ok["added"]
+
+
+def test_refresh_raises_when_every_expiry_fails(replay, monkeypatch):
+    def down(self, ticker, expiry_date):
+        raise ConnectionError("upstream down")
+
+    monkeypatch.setattr(replay, "option_chain", down)
+    with pytest.raises(ConnectionError):
+        ChainRefresher().refresh("SYN")
+
+
+def test_interval_is_the_shortest_live_subscriber(monkeypatch):
+    refresher = ChainRefresher(idle_timeout=100)
+    monkeypatch.setattr(refresher, "start", lambda: None)
+    clock = [1000.0]
+    monkeypatch.setattr("utils.refresher.time.monotonic", lambda: clock[0])
+
+    refresher.track("SYN", interval=30, subscriber="fast")
+    refresher.track("SYN", interval=120, subscriber="slow")
+    assert refresher.status("SYN")["interval"] == 30
+    refresher.track("SYN", interval=60, subscriber="fast")
+    assert refresher.status("SYN")["interval"] == 60
+
+    # The fast session goes away; the slow one keeps polling.
+    clock[0] += 150
+    refresher.track("SYN", interval=120, subscriber="slow")
+    assert refresher.status("SYN")["interval"] == 120
@@ -0,0 +1,18 @@
+import pytest
+
+from scan_exposures import scan
+from utils.data_fetcher import load_all_options
+from utils.exposures import chain_exposures, exposure_totals, years_to_expiry
+from utils.providers import get_provider
+
+
+def test_scan_computes_in_worker_processes(replay):
+    (row,) = scan(["SYN"], workers=2)
+    calls, puts, errors = load_all_options("SYN")
+    S, _ = get_provider().spot("SYN")
+    calls, puts = chain_exposures("SYN", None, None, calls, puts, S, years_to_expiry(calls["extracted_expiry"]),
+                                  years_to_expiry(puts["extracted_expiry"]))
+    expected = exposure_totals(calls, puts)
+    assert row["errors"] == 0 and not errors
+    for key in ("net_gex", "net_dex", "net_vex"):
+        assert row[key] == pytest.approx(expected[key])
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from utils.exposures import add_exposures, exposure_totals
+from utils.scenarios import scenario_grid
+
+S = 100.0
+T = 30 / 365
+
+
+def _chain(ivs):
+    strikes = np.linspace(90, 110, len(ivs))
+    frame = pd.DataFrame({"strike": strikes, "impliedVolatility": ivs, "openInterest": 1000.0})
+    return frame, frame.copy()
+
+
+def test_base_scenario_matches_exposure_totals():
+    calls, puts = _chain([0.25, 0.2, 0.18, 0.22, 0.3])
+    totals = exposure_totals(add_exposures(calls, "c", S, T), add_exposures(puts, "p", S, T))
+    grid = scenario_grid(calls, puts, S, T, T, spot_shocks=[0.0], iv_shifts=[0.0], days_forward=[0])
+    for value in ("net_gex", "net_dex", "net_vex"):
+        assert np.isclose(grid[value][0, 0, 0], totals[value], rtol=1e-9, atol=1e-6)
+
+
+def test_zero_iv_contract_stays_out_under_iv_shocks():
+    ivs = [0.25, 0.2, 0.18, 0.22, 0.3]
+    calls, puts = _chain(ivs)
+    with_zero, _ = _chain(ivs[:2] + [0.0] + ivs[3:])
+    shifts = [0.0, 0.02, 0.05]
+    # The IV=0 call at the money must not reappear once its IV is shifted up.
+    grid = scenario_grid(with_zero, puts, S, T, T, spot_shocks=[0.0], iv_shifts=shifts, days_forward=[0])
+    without = scenario_grid(calls.drop(index=2), puts, S, T, T, spot_shocks=[0.0], iv_shifts=shifts,
+                            days_forward=[0])
+    for value in ("net_gex", "net_dex", "net_vex"):
+        np.testing.assert_allclose(grid[value], without[value], rtol=1e-12)
@@ -0,0 +1,59 @@
+import threading
+import time
+
+import pytest
+
+from benchmarks.synthetic_chain import SyntheticProvider
+from utils.data_fetcher import chain_cache, fetch_option_chains
+from utils.providers import ReplayProvider, get_provider, record_snapshot, set_provider
+from utils.scheduler import FetchCancelled, FetchScheduler, fetch_cancel_event, fetch_scheduler
+
+
+def test_cancelled_request_leaves_the_queue():
+    scheduler = FetchScheduler(rate=0.5, burst=1)
+    scheduler.call(lambda: None)  # spend the only token
+    event = threading.Event()
+    outcome = []
+
+    def waiter():
+        with fetch_cancel_event(event):
+            try:
+                scheduler.call(lambda: "sent")
+            except FetchCancelled:
+                outcome.append("cancelled")
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    while scheduler.stats()["queued"] == 0:
+        time.sleep(0.01)
+    scheduler.cancel(event)
+    thread.join(timeout=1)
+    assert outcome == ["cancelled"]
+    stats = scheduler.stats()
+    assert stats["queued"] == 0 and stats["cancelled"] == 1
+    assert stats["classes"]["interactive"]["requests"] == 1
+
+
+def test_timed_out_expiries_are_withdrawn(tmp_path):
+    record_snapshot("SYN", str(tmp_path), source=SyntheticProvider(200))
+    expiries = list(SyntheticProvider(200).option_dates("SYN"))[:4]
+    previous = get_provider()
+    set_provider(ReplayProvider(str(tmp_path)))
+    chain_cache.invalidate()
+    rate, burst = fetch_scheduler.rate, fetch_scheduler.burst
+    # One request goes out at once; the next token is 5 s away.
+    fetch_scheduler.configure(rate=0.2, burst=1)
+    cancelled = fetch_scheduler.stats()["cancelled"]
+    try:
+        chains, errors = fetch_option_chains("SYN", expiries, max_workers=len(expiries), timeout=0.2)
+        assert len(chains) == 1 and len(errors) == len(expiries) - 1
+        deadline = time.monotonic() + 2
+        while fetch_scheduler.stats()["queued"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        stats = fetch_scheduler.stats()
+        assert stats["queued"] == 0
+        assert stats["cancelled"] - cancelled == len(expiries) - 1
+    finally:
+        fetch_scheduler.configure(rate=rate or 0, burst=burst)
+        set_provider(previous)
+        chain_cache.invalidate()
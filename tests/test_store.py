@@ -0,0 +1,65 @@
+import pandas as pd
+import pytest
+
+from utils.data_fetcher import load_all_options
+from utils.exposures import chain_exposures, exposure_totals, years_to_expiry
+from utils.providers import get_provider
+from utils.store import SnapshotStore, close_store, get_store, open_store
+
+pytest.importorskip("pyarrow")
+
+
+def test_fetched_chains_are_written_on_close(replay, tmp_path):
+    store = open_store(str(tmp_path / "store"), flush_interval=0.05)
+    try:
+        calls, puts, errors = load_all_options("SYN")
+    finally:
+        assert close_store(timeout=30)
+    assert not errors and get_store() is None
+    expiries = get_provider().option_dates("SYN")
+
+    stored = store.read("SYN")
+    assert len(stored) == len(calls) + len(puts)
+    assert set(stored["expiry"]) == set(expiries)
+    assert sorted(stored["contractSymbol"]) == sorted(pd.concat([calls, puts])["contractSymbol"])
+    assert len(store.read("SYN", "exposures")) == len(stored)
+    assert store.stats()["errors"] == 0
+
+    # The index can be rebuilt from the files alone.
+    files = store.partitions("SYN") + store.partitions("SYN", "exposures")
+    assert store.reindex() == len(files)
+    assert len(store.read("SYN")) == len(stored)
+
+
+def test_history_and_expiry_queries(replay, tmp_path):
+    store = SnapshotStore(str(tmp_path / "store"), flush_interval=0.01)
+    provider = get_provider()
+    first, second = provider.option_dates("SYN")[:2]
+    morning, noon = pd.Timestamp("2026-10-19 09:30"), pd.Timestamp("2026-10-19 12:00")
+    for captured_at in (morning, noon):
+        for expiry in (first, second):
+            store.record_chain("SYN", expiry, *provider.option_chain("SYN", expiry), captured_at=captured_at)
+        assert store.flush(timeout=30)
+
+    # Time ranges are inclusive and may be open on either side.
+    assert set(store.read("SYN", start=noon)["captured_at"]) == {noon}
+    assert set(store.read("SYN", end=morning)["captured_at"]) == {morning}
+    assert set(store.read("SYN", start=morning, end=noon)["captured_at"]) == {morning, noon}
+    assert store.read("SYN", start=noon + pd.Timedelta(seconds=1)).empty
+
+    only_first = store.read("SYN", expiries=[first])
+    assert not only_first.empty and set(only_first["expiry"]) == {first}
+    assert store.partitions("SYN", expiries=["2099-01-01"]) == []
+
+    # Each capture's totals equal exposure_totals over both expiries.
+    history = store.exposure_history("SYN")
+    assert list(history["captured_at"]) == [morning, noon]
+    frames = [provider.option_chain("SYN", e) for e in (first, second)]
+    calls = pd.concat([c.assign(expiry=e) for (c, _), e in zip(frames, (first, second))], ignore_index=True)
+    puts = pd.concat([p.assign(expiry=e) for (_, p), e in zip(frames, (first, second))], ignore_index=True)
+    S, _ = provider.spot("SYN")
+    t_calls = years_to_expiry(calls["expiry"], today="2026-10-19")
+    t_puts = years_to_expiry(puts["expiry"], today="2026-10-19")
+    expected = exposure_totals(*chain_exposures("SYN", None, None, calls, puts, S, t_calls, t_puts))
+    for key in ("call_gex", "put_gex", "net_gex", "net_dex", "net_vex"):
+        assert history[key].to_numpy() == pytest.approx([expected[key]] * 2, rel=1e-5)
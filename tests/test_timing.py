@@ -0,0 +1,51 @@
+import threading
+import tracemalloc
+
+from utils.timing import finish_run, span, start_run
+
+
+def test_tracing_stops_with_the_last_memory_run():
+    assert not tracemalloc.is_tracing()
+    start_run("a", track_memory=True)
+    assert tracemalloc.is_tracing()
+    with span("alloc"):
+        data = bytearray(1 << 20)
+    spans = finish_run()
+    assert not tracemalloc.is_tracing()
+    assert spans[0]["peak_mem_kb"] >= 1024
+    del data
+
+
+def test_discarded_run_releases_tracing():
+    start_run("a", track_memory=True)
+    start_run("b")
+    assert not tracemalloc.is_tracing()
+    finish_run()
+
+
+def test_overlapping_memory_runs_report_no_peaks():
+    started, done = threading.Event(), threading.Event()
+
+    def other_session():
+        start_run("other", track_memory=True)
+        started.set()
+        done.wait()
+        finish_run()
+
+    thread = threading.Thread(target=other_session)
+    start_run("mine", track_memory=True)
+    with span("overlapped"):
+        thread.start()
+        started.wait()
+    with span("shared"):
+        pass
+    done.set()
+    thread.join()
+    assert tracemalloc.is_tracing()
+    with span("alone"):
+        pass
+    spans = {s["stage"]: s for s in finish_run()}
+    assert not tracemalloc.is_tracing()
+    assert spans["overlapped"]["peak_mem_kb"] is None
+    assert spans["shared"]["peak_mem_kb"] is None
+    assert spans["alone"]["peak_mem_kb"] is not None
@@ -0,0 +1,264 @@
+# utils/api.py
+"""
+Headless HTTP API over the fetch cache and exposure pipeline.
+
+Endpoints (GET, query parameters in brackets):
+    /health     (cache and fetch-scheduler counters)
+    /expiries   [ticker]
+    /chain      [ticker, expiry]
+    /greeks     [ticker, expiry, solve_iv]
+    /exposures  [ticker, expiry, solve_iv]
+    /history    [ticker, start, end, expiry]  (needs an open snapshot store)
+
+expiry is a YYYY-MM-DD date or 'all' (the default); start and end are
+ISO timestamps. Tables are returned as
+JSON ({"meta": {...}, "data": [records]}) or, with format=arrow or an
+'Accept: application/vnd.apache.arrow.stream' header, as an Arrow IPC
+stream with the meta stored in the schema metadata (needs pyarrow).
+Errors come back as JSON ({"error": message}): 400 for bad parameters,
+404 for an unknown ticker or expiry, 502 when the data source fails.
+
+Each request runs on its own thread. Chains come from the process-wide
+chain_cache, so concurrent requests for the same ticker share downloads and
+stale entries are served while they refresh in the background.
+"""
+import json
+import logging
+import math
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+from utils.data_fetcher import (chain_cache, chain_version, fetch_options_dates, format_ticker, load_all_options,
+                                load_expiry_chain, snapshot_version, DEFAULT_EXPIRY_TIMEOUT, DEFAULT_MAX_WORKERS)
+from utils.exposures import chain_exposures, exposure_cache, exposure_totals, strike_exposures, years_to_expiry
+from utils.quotes import get_spot, quote_cache
+from utils.scenarios import scenario_cache
+from utils.scheduler import fetch_scheduler
+from utils.store import get_store
+
+logger = logging.getLogger("options_analyzer.api")
+
+ARROW_MIME = "application/vnd.apache.arrow.stream"
+JSON_MIME = "application/json"
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8502
+
+CHAIN_COLUMNS = ["contractSymbol", "type", "extracted_expiry", "strike", "lastPrice", "bid", "ask",
+                 "volume", "openInterest", "impliedVolatility"]
+GREEK_COLUMNS = CHAIN_COLUMNS + ["t", "calc_delta", "calc_gamma", "calc_vanna", "DEX", "GEX", "VEX"]
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _param(query, name, default=None, required=False):
+    values = query.get(name)
+    if not values or not values[0]:
+        if required:
+            raise ApiError(400, f"missing query parameter '{name}'")
+        return default
+    return values[0]
+
+
+def _flag(query, name):
+    return str(_param(query, name, "false")).lower() in ("1", "true", "yes")
+
+
+def _upstream_error(ticker, what, error):
+    # The replay provider raises FileNotFoundError for data it never
+    # recorded; anything else is a failure of the data source.
+    if isinstance(error, FileNotFoundError):
+        return ApiError(404, f"unknown ticker {ticker}")
+    return ApiError(502, f"could not fetch {what}: {error}")
+
+
+def list_expiries(ticker):
+    """The expiries ticker lists, as 'YYYY-MM-DD' strings."""
+    try:
+        return fetch_options_dates(ticker)
+    except Exception as e:
+        raise _upstream_error(ticker, f"expiries for {ticker}", e)
+
+
+def load_chain(ticker, expiry, timeout=DEFAULT_EXPIRY_TIMEOUT, max_workers=DEFAULT_MAX_WORKERS):
+    """
+    (calls, puts, version) for one expiry ('YYYY-MM-DD') or every expiry
+    (expiry 'all'). A single expiry only downloads that chain.
+    """
+    if expiry == "all":
+        expiries = list_expiries(ticker)
+        version = snapshot_version(ticker)
+        calls, puts, errors = load_all_options(ticker, max_workers=max_workers, timeout=timeout)
+        if calls.empty and puts.empty and errors:
+            error = next(iter(errors.values()))
+            if not expiries:
+                # Nothing listed and the fallback expiry failed too.
+                raise ApiError(404, f"unknown ticker {ticker}, or it lists no options")
+            raise _upstream_error(ticker, f"options for {ticker}", error)
+        return calls, puts, version if version is not None else snapshot_version(ticker)
+
+    try:
+        datetime.strptime(expiry, "%Y-%m-%d")
+    except ValueError:
+        raise ApiError(400, "expiry must be YYYY-MM-DD or 'all'")
+    if expiry not in list_expiries(ticker):
+        raise ApiError(404, f"{ticker} has no expiry {expiry}")
+    version = chain_version(ticker, expiry)
+    try:
+        chain = load_expiry_chain(ticker, expiry)
+    except Exception as e:
+        raise _upstream_error(ticker, f"{ticker} {expiry}", e)
+    return chain.calls, chain.puts, version if version is not None else chain_version(ticker, expiry)
+
+
+def compute_greeks(ticker, expiry, solve_iv=False):
+    """(calls, puts, meta) with Greeks and exposures, read from the shared exposure cache."""
+    calls, puts, version = load_chain(ticker, expiry)
+    try:
+        S, source = get_spot(ticker)
+    except Exception as e:
+        raise _upstream_error(ticker, f"a spot price for {ticker}", e)
+    if S is None:
+        raise ApiError(502, f"no spot price for {ticker}")
+    S = round(S, 2)
+    calls, puts = chain_exposures(ticker, version, expiry, calls, puts, S,
+                                  years_to_expiry(calls["extracted_expiry"]),
+                                  years_to_expiry(puts["extracted_expiry"]), solve_iv=solve_iv)
+    meta = {"ticker": ticker, "expiry": expiry, "spot": S, "spot_source": source, "solve_iv": solve_iv}
+    return calls, puts, meta
+
+
+def exposures_table(calls, puts):
+    """Strike-level call, put and net GEX/DEX/VEX, one row per strike."""
+    calls_by_strike, puts_by_strike = strike_exposures(calls, puts)
+    table = calls_by_strike.merge(puts_by_strike, on="strike", how="outer", suffixes=("_call", "_put")).fillna(0)
+    table["GEX_net"] = table["GEX_call"] - table["GEX_put"]
+    table["DEX_net"] = table["DEX_call"] + table["DEX_put"]
+    table["VEX_net"] = table["VEX_call"] + table["VEX_put"]
+    return table.sort_values("strike", ignore_index=True)
+
+
+def stored_history(ticker, expiry, start=None, end=None):
+    """(meta, exposure totals over time) from the snapshot store."""
+    store = get_store()
+    if store is None:
+        raise ApiError(404, "no snapshot store is open; start the server with --store")
+    try:
+        start, end = (None if v is None else pd.Timestamp(v) for v in (start, end))
+    except ValueError:
+        raise ApiError(400, "start and end must be ISO timestamps")
+    expiries = None if expiry == "all" else [expiry]
+    meta = {"ticker": ticker, "expiry": expiry, "start": str(start) if start else None, "end": str(end) if end else None}
+    return meta, store.exposure_history(ticker, start, end, expiries)
+
+
+def _chain_frame(calls, puts, columns):
+    frame = pd.concat([calls, puts], ignore_index=True)
+    return frame[[c for c in columns if c in frame.columns]]
+
+
+def handle(path, query):
+    """Dispatches one request; returns (meta, DataFrame or None)."""
+    if path == "/health":
+        # Cache counters (including coalesced loads) and fetch queue metrics.
+        return {"status": "ok", "caches": {"chain": chain_cache.stats(), "quote": quote_cache.stats(),
+                                           "exposure": exposure_cache.stats(), "scenario": scenario_cache.stats()},
+                "scheduler": fetch_scheduler.stats(),
+                "store": get_store().stats() if get_store() is not None else None}, None
+
+    ticker = format_ticker(_param(query, "ticker", required=True))
+    if path == "/expiries":
+        return {"ticker": ticker, "expiries": list(list_expiries(ticker))}, None
+
+    expiry = _param(query, "expiry", "all")
+    if path == "/chain":
+        calls, puts, _ = load_chain(ticker, expiry)
+        return {"ticker": ticker, "expiry": expiry}, _chain_frame(calls, puts, CHAIN_COLUMNS)
+    if path == "/greeks":
+        calls, puts, meta = compute_greeks(ticker, expiry, _flag(query, "solve_iv"))
+        columns = GREEK_COLUMNS + (["solved_iv", "iv_converged"] if meta["solve_iv"] else [])
+        return meta, _chain_frame(calls, puts, columns)
+    if path == "/exposures":
+        calls, puts, meta = compute_greeks(ticker, expiry, _flag(query, "solve_iv"))
+        meta["totals"] = exposure_totals(calls, puts)
+        return meta, exposures_table(calls, puts)
+    if path == "/history":
+        return stored_history(ticker, expiry, _param(query, "start"), _param(query, "end"))
+    raise ApiError(404, f"unknown endpoint {path}")
+
+
+def _json_safe(value):
+    # NaN and infinity are not valid JSON; send them as null.
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {k: _json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(v) for v in value]
+    return value
+
+
+def to_json(meta, frame):
+    if frame is None:
+        return json.dumps(_json_safe(meta), allow_nan=False).encode()
+    meta = dict(meta, rows=len(frame))
+    # Let pandas serialize the table directly rather than round-tripping it.
+    records = frame.to_json(orient="records", date_format="iso")
+    return f'{{"meta": {json.dumps(_json_safe(meta), allow_nan=False)}, "data": {records}}}'.encode()
+
+
+def to_arrow(meta, frame):
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ApiError(406, "Arrow output needs pyarrow; install it or request JSON")
+    table = pa.Table.from_pandas(frame if frame is not None else pd.DataFrame(), preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), b"meta": json.dumps(meta).encode()})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    server_version = "OptionsAnalyzerAPI/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        wants_arrow = _param(query, "format") == "arrow" or ARROW_MIME in self.headers.get("Accept", "")
+        try:
+            meta, frame = handle(url.path.rstrip("/") or "/", query)
+            if wants_arrow:
+                self._send(200, ARROW_MIME, to_arrow(meta, frame))
+            else:
+                self._send(200, JSON_MIME, to_json(meta, frame))
+        except ApiError as e:
+            self._send(e.status, JSON_MIME, json.dumps({"error": str(e)}).encode())
+        except Exception as e:
+            logger.exception("request failed: %s", self.path)
+            self._send(500, JSON_MIME, json.dumps({"error": str(e)}).encode())
+
+    def _send(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.info("%s - %s", self.address_string(), format % args)
+
+
+def make_server(host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """A threading HTTP server for the API; call serve_forever() on it."""
+    server = ThreadingHTTPServer((host, port), ApiHandler)
+    server.daemon_threads = True
+    return server
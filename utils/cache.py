@@ -0,0 +1,229 @@
+# utils/cache.py
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def estimate_size(value):
+    """
+    Rough in-memory size of a cached value in bytes.
+    DataFrames and Series are measured with pandas, objects with a
+    memory_usage() method report their own size, and tuples, lists and dicts
+    are summed over their items.
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if callable(getattr(value, "memory_usage", None)):
+        # Containers such as OptionChain report their own footprint.
+        return int(value.memory_usage())
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value.values())
+    return sys.getsizeof(value)
+
+
+class LoadCancelled(Exception):
+    """
+    Raised by a loader whose caller gave up on it. Callers waiting on the
+    same single-flight load retry it themselves instead of failing with it.
+    """
+
+
+class _Entry:
+    __slots__ = ("value", "loaded_at", "size", "version")
+
+    def __init__(self, value, loaded_at, size, version):
+        self.value = value
+        self.loaded_at = loaded_at
+        self.size = size
+        self.version = version
+
+
+class _Flight:
+    """One in-progress load that concurrent callers for the same key wait on."""
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TTLCache:
+    """
+    Thread-safe, process-wide cache with a time-to-live and LRU eviction.
+
+    Entries younger than `ttl` are served as-is. Entries older than `ttl` but
+    younger than `ttl + stale_ttl` are served immediately while a background
+    thread reloads them (stale-while-revalidate). Anything older is reloaded
+    synchronously. When the cache holds more than `max_entries` entries or
+    more than `max_bytes` bytes, the least recently used entries are evicted.
+
+    Loads are single-flight: while one caller is loading a key, concurrent
+    callers missing on the same key wait for that load and share its result
+    (or its exception) instead of loading it again; `coalesced` counts them.
+    If the load raises LoadCancelled, they retry it instead.
+    """
+
+    def __init__(self, ttl=60.0, stale_ttl=300.0, max_entries=256, max_bytes=512 * 1024 * 1024):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._version = 0
+        self._refreshing = set()
+        self._inflight = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.coalesced = 0
+
+    def configure(self, ttl=None, stale_ttl=None, max_entries=None, max_bytes=None):
+        """Update the cache limits; lower bounds take effect immediately."""
+        with self._lock:
+            if ttl is not None:
+                self.ttl = ttl
+            if stale_ttl is not None:
+                self.stale_ttl = stale_ttl
+            if max_entries is not None:
+                self.max_entries = max_entries
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            self._evict()
+
+    def get_or_load(self, key, loader):
+        """
+        Returns the cached value for key, calling loader() to fill or refresh it.
+        Values are shared between callers and must not be mutated in place.
+        """
+        while True:
+            now = time.monotonic()
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    age = now - entry.loaded_at
+                    if age < self.ttl:
+                        self._entries.move_to_end(key)
+                        self.hits += 1
+                        return entry.value
+                    if age < self.ttl + self.stale_ttl:
+                        self._entries.move_to_end(key)
+                        self.stale_hits += 1
+                        self._refresh_in_background(key, loader)
+                        return entry.value
+                flight = self._inflight.get(key)
+                leader = flight is None
+                if leader:
+                    self.misses += 1
+                    flight = self._inflight[key] = _Flight()
+                else:
+                    self.coalesced += 1
+
+            if leader:
+                return self._load(key, loader, flight)
+            flight.done.wait()
+            if isinstance(flight.error, LoadCancelled):
+                # The leader's caller gave up on it; load it ourselves.
+                continue
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+    def _load(self, key, loader, flight):
+        # Runs loader() for the caller that started the flight, outside the
+        # lock, then wakes everyone waiting on it.
+        try:
+            flight.value = loader()
+            self.set(key, flight.value)
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+    def get(self, key, default=None):
+        """Returns the cached value regardless of age, without loading it."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return default if entry is None else entry.value
+
+    def version(self, key):
+        """
+        Version stamp of key's current value, or None if it is not cached.
+        Every set() stamps a new, larger version, so a changed stamp means
+        the value was reloaded.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            return None if entry is None else entry.version
+
+    def set(self, key, value):
+        size = estimate_size(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._version += 1
+            self._entries[key] = _Entry(value, time.monotonic(), size, self._version)
+            self._bytes += size
+            self._evict()
+
+    def invalidate(self, key=None):
+        """Drops one key, or every entry when key is None."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._bytes = 0
+            else:
+                entry = self._entries.pop(key, None)
+                if entry is not None:
+                    self._bytes -= entry.size
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._inflight),
+            }
+
+    def _evict(self):
+        # Always keep the most recent entry, even if it alone exceeds max_bytes.
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+
+    def _refresh_in_background(self, key, loader):
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self.set(key, loader())
+            except Exception:
+                # Keep serving the stale value; the next expiry retries.
+                pass
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name=f"cache-refresh-{key}", daemon=True).start()
@@ -0,0 +1,132 @@
+# utils/chain.py
+import numpy as np
+import pandas as pd
+
+# Narrow dtypes for the columns yfinance returns as float64/int64/object.
+FLOAT_COLUMNS = ("strike", "lastPrice", "bid", "ask", "change", "percentChange", "impliedVolatility")
+COUNT_COLUMNS = ("volume", "openInterest")
+CATEGORY_COLUMNS = ("contractSymbol", "currency", "contractSize", "type")
+
+
+def compact_chain_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns a copy of an option-chain DataFrame with compact dtypes:
+    float32 prices, strikes and IVs, int32 volume/open interest (missing
+    counts become 0) and categorical symbol, currency, size and type columns.
+    Columns that are absent are skipped; all other columns are kept as-is.
+    """
+    dtypes = {}
+    for col in FLOAT_COLUMNS:
+        if col in df.columns:
+            dtypes[col] = "float32"
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            dtypes[col] = "category"
+    counts = [col for col in COUNT_COLUMNS if col in df.columns]
+
+    compact = df.astype(dtypes)
+    for col in counts:
+        compact[col] = compact[col].fillna(0).astype("int32")
+    return compact
+
+
+class OptionChain:
+    """
+    Compact, typed in-memory option chain for one ticker.
+
+    Calls and puts live in a single compact frame, sorted by type, expiry and
+    strike, so `calls` and `puts` are positional slices of it (views, not
+    copies). Both are ordinary DataFrames with the usual yfinance columns
+    plus 'type', so every chart and Greeks function accepts them directly.
+
+    The row range of every expiry is indexed once when the chain is built:
+    `expiries` lists them and select() returns one expiry's calls and puts
+    as slices, narrowed to a strike range by binary search.
+    """
+
+    def __init__(self, calls: pd.DataFrame, puts: pd.DataFrame):
+        frame = pd.concat(
+            [calls.assign(type="Call"), puts.assign(type="Put")],
+            ignore_index=True,
+        )
+        sort_cols = [c for c in ("type", "extracted_expiry", "strike") if c in frame.columns]
+        frame = frame.sort_values(sort_cols, kind="stable", ignore_index=True)
+        self.frame = compact_chain_frame(frame)
+        self._n_calls = len(calls)
+        self._strikes = (self.frame["strike"].to_numpy(dtype=float) if "strike" in self.frame.columns
+                         else np.empty(len(self.frame)))
+        self._partitions = (self._index_expiries(0, self._n_calls),
+                            self._index_expiries(self._n_calls, len(self.frame)))
+        self.expiries = tuple(sorted(set(self._partitions[0]) | set(self._partitions[1])))
+
+    def _index_expiries(self, start, stop):
+        # {expiry date: (first row, end row)} for rows start:stop, which are
+        # sorted by expiry with missing expiries (NaT) last.
+        if "extracted_expiry" not in self.frame.columns:
+            return {}
+        values = self.frame["extracted_expiry"].to_numpy()[start:stop]
+        if values.dtype.kind != "M":
+            return {}
+        n = len(values) - int(np.isnat(values).sum())
+        if n == 0:
+            return {}
+        breaks = np.flatnonzero(values[1:n] != values[:n - 1]) + 1
+        firsts = np.concatenate(([0], breaks))
+        ends = np.concatenate((breaks, [n]))
+        days = values[firsts].astype("datetime64[D]").tolist()
+        return {day: (start + a, start + b) for day, a, b in zip(days, firsts.tolist(), ends.tolist())}
+
+    @staticmethod
+    def _strike_bounds(strike_range):
+        # Strikes are stored as float32, so the bounds are rounded the same
+        # way; otherwise a bound equal to a listed strike could exclude it.
+        low, high = strike_range
+        return float(np.float32(low)), float(np.float32(high))
+
+    def _rows(self, side, expiry, strike_range):
+        first, end = self._partitions[side].get(expiry, (0, 0))
+        if strike_range is not None and end > first:
+            low, high = self._strike_bounds(strike_range)
+            strikes = self._strikes[first:end]
+            first, end = (first + int(np.searchsorted(strikes, low, side="left")),
+                          first + int(np.searchsorted(strikes, high, side="right")))
+        return self.frame.iloc[first:end]
+
+    def select(self, expiry=None, strike_range=None):
+        """
+        Calls and puts of one expiry (a date, Timestamp or 'YYYY-MM-DD'),
+        or of every expiry when expiry is None, optionally limited to
+        strikes within strike_range (low, high), inclusive.
+
+        For a single expiry both are positional slices of the chain found
+        through the expiry index and binary search, so nothing is copied or
+        scanned; they are shared and must not be modified in place.
+        """
+        if expiry is None:
+            calls, puts = self.calls, self.puts
+            if strike_range is not None:
+                low, high = self._strike_bounds(strike_range)
+                in_range = (self._strikes >= low) & (self._strikes <= high)
+                calls, puts = calls[in_range[:self._n_calls]], puts[in_range[self._n_calls:]]
+            return calls, puts
+        expiry = pd.Timestamp(expiry).date()
+        return self._rows(0, expiry, strike_range), self._rows(1, expiry, strike_range)
+
+    @property
+    def calls(self) -> pd.DataFrame:
+        return self.frame.iloc[:self._n_calls]
+
+    @property
+    def puts(self) -> pd.DataFrame:
+        return self.frame.iloc[self._n_calls:]
+
+    @property
+    def empty(self) -> bool:
+        return self.frame.empty
+
+    def __len__(self):
+        return len(self.frame)
+
+    def memory_usage(self) -> int:
+        """Bytes used by the chain, including string categories and the strike index."""
+        return int(self.frame.memory_usage(deep=True).sum()) + self._strikes.nbytes
@@ -1,26 +1,284 @@
-import yfinance as yf
+import contextvars
+import logging
+import threading
+import weakref
+
 import pandas as pd
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from datetime import datetime
+from utils.cache import TTLCache
+from utils.timing import timed
+from utils.chain import OptionChain, compact_chain_frame
+from utils.data_transformer import parse_contract_symbols
+from utils.intraday import intraday_feed
+from utils.providers import get_provider
+from utils.scheduler import fetch_cancel_event, fetch_scheduler, scheduled
+
+# Default limits for concurrent option-chain downloads.
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_EXPIRY_TIMEOUT = 15.0
+
+# Process-wide cache of expiry lists and option chains, shared by every page
+# and Streamlit session. Use chain_cache.configure(...) to change the limits.
+CHAIN_CACHE_TTL = 60.0
+CHAIN_CACHE_STALE_TTL = 300.0
+CHAIN_CACHE_MAX_ENTRIES = 512
+CHAIN_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+chain_cache = TTLCache(
+    ttl=CHAIN_CACHE_TTL,
+    stale_ttl=CHAIN_CACHE_STALE_TTL,
+    max_entries=CHAIN_CACHE_MAX_ENTRIES,
+    max_bytes=CHAIN_CACHE_MAX_BYTES,
+)
+
+logger = logging.getLogger("options_analyzer.data_fetcher")
+
+# Called as listener(ticker, expiry, calls, puts) after every chain download
+# (see utils/store.py). Listeners run on the fetching thread, so they must
+# return quickly, and must not modify the frames.
+_chain_listeners = []
+
+def format_ticker(ticker):
+    """
+    Maps index tickers to the symbols Yahoo expects for their option chains.
+    """
+    ticker = ticker.upper()
+    if ticker == "SPX":
+        return "%5ESPX"
+    elif ticker == "NDX":
+        return "%5ENDX"
+    elif ticker == "VIX":
+        return "^VIX"
+    return ticker
+
+def add_chain_listener(listener):
+    if listener not in _chain_listeners:
+        _chain_listeners.append(listener)
+
+def remove_chain_listener(listener):
+    if listener in _chain_listeners:
+        _chain_listeners.remove(listener)
+
+def _download_option_chain(ticker, expiry_date):
+    calls, puts = scheduled(get_provider().option_chain, ticker, expiry_date)
+    # Cached chains are stored with compact dtypes to keep memory down.
+    calls, puts = compact_chain_frame(calls), compact_chain_frame(puts)
+    for listener in list(_chain_listeners):
+        try:
+            listener(ticker, str(expiry_date), calls, puts)
+        except Exception:
+            logger.exception("chain listener failed for %s %s", ticker, expiry_date)
+    return calls, puts
 
+@timed("fetch")
 def fetch_options_dates(ticker):
-    stock = yf.Ticker(ticker)
-    return stock.options
+    return chain_cache.get_or_load(("dates", ticker), lambda: scheduled(get_provider().option_dates, ticker))
 
+def get_cached_option_chain(ticker, expiry_date):
+    """
+    Returns the cached (calls, puts) for one expiry, downloading on a miss.
+    The DataFrames are shared through chain_cache and must not be modified.
+    """
+    key = ("chain", ticker, str(expiry_date))
+    return chain_cache.get_or_load(key, lambda: _download_option_chain(ticker, expiry_date))
+
+@timed("fetch")
 def fetch_option_chain(ticker, expiry_date):
-    stock = yf.Ticker(ticker)
-    option_chain = stock.option_chain(expiry_date)
-    return option_chain.calls, option_chain.puts
+    calls, puts = get_cached_option_chain(ticker, expiry_date)
+    return calls.copy(), puts.copy()
+
+def chain_version(ticker, expiry_date):
+    """Version stamp of the cached chain for one expiry, or None if not cached."""
+    return chain_cache.version(("chain", ticker, str(expiry_date)))
 
+def snapshot_version(ticker):
+    """
+    Identifies the cached data load_all_options(ticker) would return: it
+    changes whenever the expiry list or any of its chains is reloaded.
+    Returns None if the expiry list is not cached.
+    """
+    dates = chain_cache.get(("dates", ticker))
+    if dates is None:
+        return None
+    expiries = dates or (datetime.now().date(),)
+    return (chain_cache.version(("dates", ticker)),) + tuple(chain_version(ticker, exp) for exp in expiries)
+
+def refresh_options_dates(ticker):
+    """Re-downloads the expiry list, replacing the cached one."""
+    dates = scheduled(get_provider().option_dates, ticker)
+    chain_cache.set(("dates", ticker), dates)
+    return dates
+
+def refresh_option_chain(ticker, expiry_date):
+    """
+    Re-downloads one expiry regardless of its cache age and stores it.
+    Returns (previous, current), where each is a (calls, puts) tuple and
+    previous is None if the expiry was not cached before.
+    """
+    key = ("chain", ticker, str(expiry_date))
+    previous = chain_cache.get(key)
+    current = _download_option_chain(ticker, expiry_date)
+    chain_cache.set(key, current)
+    return previous, current
+
+def _get_chain_until_cancelled(event, ticker, expiry_date):
+    with fetch_cancel_event(event):
+        return get_cached_option_chain(ticker, expiry_date)
+
+def fetch_option_chains(ticker, expiries, max_workers=DEFAULT_MAX_WORKERS, timeout=DEFAULT_EXPIRY_TIMEOUT):
+    """
+    Fetch option chains for several expirations concurrently.
+
+    Args:
+        ticker (str): Stock ticker symbol (e.g., "AAPL").
+        expiries (list): Expiration dates to download.
+        max_workers (int): Maximum number of chains downloaded at once.
+        timeout (float): Seconds to wait for each expiry before giving up on
+            it; an expiry given up on is also withdrawn from the fetch queue
+            if it has not been sent yet.
+
+    Returns:
+        tuple: (chains, errors). chains is a list of (expiry, calls, puts)
+        in the same order as expiries, skipping failed ones; errors maps each
+        failed expiry to its exception. Chains come from chain_cache and
+        must be copied before they are modified.
+    """
+    expiries = list(expiries)
+    chains = []
+    errors = {}
+    if not expiries:
+        return chains, errors
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(expiries))))
+    events = [threading.Event() for _ in expiries]
+    try:
+        # Each download runs in a copy of the caller's context, so it keeps
+        # the caller's fetch priority.
+        futures = [executor.submit(contextvars.copy_context().run, _get_chain_until_cancelled, event, ticker, exp)
+                   for event, exp in zip(events, expiries)]
+        for exp, event, future in zip(expiries, events, futures):
+            try:
+                calls, puts = future.result(timeout=timeout)
+                chains.append((exp, calls, puts))
+            except FuturesTimeoutError:
+                future.cancel()
+                # A download already waiting in the fetch queue is past
+                # cancel(); withdraw it so it spends no token.
+                fetch_scheduler.cancel(event)
+                errors[exp] = TimeoutError(f"timed out after {timeout}s")
+            except Exception as e:
+                errors[exp] = e
+    finally:
+        # Don't block on downloads that already timed out, and withdraw any
+        # still queued if we are leaving early.
+        fetch_scheduler.cancel(*events)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return chains, errors
+
+@timed("fetch")
+def load_option_chain(ticker, max_workers=DEFAULT_MAX_WORKERS, timeout=DEFAULT_EXPIRY_TIMEOUT):
+    """
+    Loads the option chains for every expiry of ticker, without any UI.
+
+    If the ticker lists no expirations (as for SPX), today's date is tried
+    as a fallback expiry.
+
+    Returns:
+        tuple: (chain, errors). chain is the assembled OptionChain, indexed
+        by expiry and ordered by expiry and strike; errors maps each expiry
+        that could not be fetched to its exception. The chain is cached
+        until one of its expiries is reloaded, so it is shared between
+        callers and must not be modified in place.
+    """
+    expiries = fetch_options_dates(ticker)
+    all_calls = []
+    all_puts = []
+
+    if expiries:
+        chains, errors = fetch_option_chains(ticker, expiries, max_workers=max_workers, timeout=timeout)
+    else:
+        # Fallback for tickers like SPX which return an empty options list.
+        default_expiry = datetime.now().date()
+        chains, errors = fetch_option_chains(ticker, [default_expiry], max_workers=1, timeout=timeout)
+
+    for exp, calls, puts in chains:
+        if not calls.empty:
+            all_calls.append(calls)
+        if not puts.empty:
+            all_puts.append(puts)
+
+    return _assembled_chain(ticker, all_calls, all_puts), errors
+
+def load_expiry_chain(ticker, expiry_date):
+    """
+    The assembled OptionChain of one expiry of ticker, without any UI.
+    Only that expiry is downloaded. Like load_option_chain's chain, it is
+    cached until the expiry is reloaded and must not be modified in place.
+    Raises whatever the provider raised if the expiry could not be fetched.
+    """
+    calls, puts = get_cached_option_chain(ticker, expiry_date)
+    call_frames = [calls] if not calls.empty else []
+    put_frames = [puts] if not puts.empty else []
+    return _assembled_chain(ticker, call_frames, put_frames, scope=str(expiry_date))
+
+def load_all_options(ticker, max_workers=DEFAULT_MAX_WORKERS, timeout=DEFAULT_EXPIRY_TIMEOUT):
+    """
+    (calls, puts, errors) for every expiry of ticker: the calls and puts of
+    load_option_chain's chain, with a datetime64 'extracted_expiry' column.
+    They are shared between callers and must not be modified in place.
+    """
+    chain, errors = load_option_chain(ticker, max_workers=max_workers, timeout=timeout)
+    return chain.calls, chain.puts, errors
+
+def _assembled_chain(ticker, call_frames, put_frames, scope="all"):
+    # Reuse the chain assembled from these exact cached frames, if any; weak
+    # references tell whether any of them has been replaced since. scope
+    # keeps the whole-chain and single-expiry chains from evicting each other.
+    sources = call_frames + put_frames
+    key = ("assembled", ticker, scope)
+    cached = chain_cache.get(key)
+    if cached is not None:
+        refs, n_calls, chain = cached
+        if n_calls == len(call_frames) and len(refs) == len(sources) and all(
+            ref() is frame for ref, frame in zip(refs, sources)
+        ):
+            return chain
+    chain = build_option_chain(call_frames, put_frames)
+    chain_cache.set(key, ([weakref.ref(f) for f in sources], len(call_frames), chain))
+    return chain
+
+@timed("parse")
+def build_option_chain(call_frames, put_frames):
+    """
+    Combines per-expiry call and put frames into one compact OptionChain,
+    with a datetime64 'extracted_expiry' column decoded from the contract
+    symbols in one vectorized pass.
+    """
+    # Concatenating builds fresh frames, so the cached chains stay untouched.
+    frames = []
+    for parts in (call_frames, put_frames):
+        if parts:
+            combined = pd.concat(parts, ignore_index=True)
+            combined['extracted_expiry'] = parse_contract_symbols(combined['contractSymbol'])['expiry']
+        else:
+            combined = pd.DataFrame(columns=['contractSymbol', 'strike', 'extracted_expiry'])
+        frames.append(combined)
+    return OptionChain(*frames)
+
+@timed("fetch")
 def fetch_stock_data(ticker):
-    stock = yf.Ticker(ticker)
-    data = stock.history(period="1d")
-    return data
+    """
+    Daily bars for ticker, oldest first, with RSI, SMA_50, SMA_200, EMA_20
+    and VWAP columns. They come from the shared daily bar buffer, so only
+    bars newer than the last stored one are downloaded and processed.
+    """
+    return intraday_feed.bars(ticker, "1d").frame()
 
 def fetch_options_data(symbol, expiration_date):
-    stock = yf.Ticker(symbol)
-    options_data = stock.option_chain(expiration_date)
-    calls = options_data.calls
-    puts = options_data.puts
+    calls, puts = fetch_option_chain(symbol, expiration_date)
 
     # Mock gamma, delta, and vanna values
     calls['gamma'] = np.random.Generator(len(calls))
@@ -50,22 +308,17 @@ def fetch_options_data(symbol, expiration_date):
     return combined
 
 
-def fetch_intraday_stock_data(ticker, interval="5s", period="1d"):
+def fetch_intraday_stock_data(ticker, interval="1m", last=None):
     """
-    Fetch intraday stock data (e.g., 5-minute or 1-minute intervals) using yfinance.
-    
+    Fetch intraday stock data (e.g., 5-minute or 1-minute intervals) from the shared bar buffer.
+
     Args:
         ticker (str): Stock ticker symbol (e.g., "AAPL").
         interval (str): Time interval (e.g., "1m" for 1-minute, "5m" for 5-minute).
-        period (str): Historical period (e.g., "1d" for 1-day).
-    
+        last (int): Only return the newest `last` bars.
+
     Returns:
-        pd.DataFrame: Intraday stock price data.
+        pd.DataFrame: Intraday OHLCV bars, oldest first, with their RSI,
+        moving averages and session VWAP; empty if no data is found.
     """
-    stock = yf.Ticker(ticker)
-    df = stock.history(interval=interval, period=period)
-    
-    if df.empty:
-        return pd.DataFrame()  # Return an empty DataFrame if no data is found
-    
-    return df
\ No newline at end of file
+    return intraday_feed.bars(ticker, interval).frame(last)
@@ -0,0 +1,151 @@
+# utils/exposure_charts.py
+# Plotly figure builders for the Greek exposure pages, apart from
+# option_charts so the other pages do not load them.
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from utils.option_charts import BUBBLE_MAX_SIZE, LARGE_CHART_POINTS, add_current_price_line, prepare_chart_data
+from utils.timing import timed
+
+@timed("figure")
+def create_exposure_bubble_chart(calls, puts, value, label, max_points=LARGE_CHART_POINTS, strike_range=None,
+                                 title=None):
+    """
+    Bubble chart of the exposure column value by strike for calls and puts.
+    Above max_points the strikes are binned and drawn with WebGL markers,
+    sized relative to the largest bucket.
+    """
+    calls, puts, binned = prepare_chart_data(calls, puts, [value], max_points, strike_range)
+    scatter = go.Scattergl if binned else go.Scatter
+    largest = max([df[value].abs().max() for df in (calls, puts) if not df.empty] + [0])
+    
+    fig = go.Figure()
+    for df, name, color in ((calls, 'Calls', 'green'), (puts, 'Puts', 'red')):
+        if df.empty:
+            continue
+        if binned:
+            size = df[value].abs() / largest * BUBBLE_MAX_SIZE if largest else 0
+            hovertemplate = f'Strike: ~%{{x:.2f}} (%{{customdata}} contracts)<br>{label}: %{{y}}'
+            customdata = df['contracts']
+        else:
+            size = df[value].abs() / 1000
+            hovertemplate = f'Strike: %{{x}}<br>{label}: %{{y}}'
+            customdata = None
+        fig.add_trace(scatter(
+            x=df['strike'],
+            y=df[value],
+            mode='markers',
+            name=name,
+            customdata=customdata,
+            marker=dict(
+                size=size,
+                color=color,
+                opacity=0.6,
+                line=dict(width=1, color='DarkSlateGrey')
+            ),
+            hovertemplate=hovertemplate
+        ))
+    fig.update_layout(
+        title=(title or label) + (' (binned by strike)' if binned else ''),
+        xaxis_title='Strike Price',
+        yaxis_title=label,
+        hovermode='closest',
+        showlegend=True
+    )
+    return fig
+
+@timed("figure")
+def create_exposure_bar_chart(calls, puts, value, label, S, max_points=LARGE_CHART_POINTS, strike_range=None):
+    """
+    Grouped bar chart of the exposure column value by strike, with a line at
+    the underlying price S. Large chains are summed into strike buckets.
+    """
+    calls, puts, binned = prepare_chart_data(calls, puts, [value], max_points, strike_range)
+    calls_df = calls[['strike', value]].copy()
+    calls_df['OptionType'] = 'Call'
+    puts_df = puts[['strike', value]].copy()
+    puts_df['OptionType'] = 'Put'
+    combined_chart = pd.concat([calls_df, puts_df], ignore_index=True)
+    combined_chart.sort_values(by='strike', inplace=True)
+    fig = px.bar(
+        combined_chart,
+        x='strike',
+        y=value,
+        color='OptionType',
+        title=f'{label} by Strike' + (' (binned by strike)' if binned else ''),
+        barmode='group'
+    )
+    fig.update_layout(
+        xaxis_title='Strike Price',
+        yaxis_title=label,
+        hovermode='x unified'
+    )
+    fig.update_xaxes(rangeslider=dict(visible=True))
+    return add_current_price_line(fig, S)
+
+def create_gex_bubble_chart(calls, puts, max_points=LARGE_CHART_POINTS, strike_range=None):
+    """Gamma exposure bubble chart computed from the chain's own 'gamma' column."""
+    calls_gex = calls[['strike', 'gamma', 'openInterest']].copy()
+    calls_gex['GEX'] = calls_gex['gamma'] * calls_gex['openInterest'] * 100
+    puts_gex = puts[['strike', 'gamma', 'openInterest']].copy()
+    puts_gex['GEX'] = puts_gex['gamma'] * puts_gex['openInterest'] * 100
+    return create_exposure_bubble_chart(calls_gex, puts_gex, 'GEX', 'Gamma Exposure', max_points, strike_range,
+                                        title='Gamma Exposure (GEX) Bubble Chart')
+
+@timed("figure")
+def create_gamma_profile_chart(spots, net_gex, S, flip=None):
+    """
+    Net gamma exposure across a grid of underlying prices, with the current
+    price and (if any) the gamma-flip level marked.
+    """
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=spots,
+        y=net_gex,
+        mode='lines',
+        name='Net GEX',
+        line=dict(color='orange', width=2),
+        hovertemplate='Spot: %{x:.2f}<br>Net Gamma Exposure: %{y:.0f}'
+    ))
+    fig.add_hline(y=0, line_color='grey', opacity=0.5)
+    if flip is not None:
+        fig.add_vline(
+            x=flip,
+            line_dash="dot",
+            line_color="orange",
+            annotation_text=f"Gamma flip {flip:.2f}",
+            annotation_position="bottom right",
+        )
+    fig.update_layout(
+        title='Net Gamma Exposure Profile',
+        xaxis_title='Underlying Price',
+        yaxis_title='Net Gamma Exposure',
+        hovermode='x unified'
+    )
+    return add_current_price_line(fig, S)
+
+@timed("figure")
+def create_scenario_heatmap(spots, iv_shifts, values, S, label, days_forward=0):
+    """
+    Net exposure across a grid of underlying prices (rows) and IV shifts
+    (columns, in vol points), on a diverging scale centred on zero, with the
+    current price marked.
+    """
+    fig = go.Figure(go.Heatmap(
+        x=np.asarray(iv_shifts) * 100,
+        y=spots,
+        z=values,
+        colorscale='RdBu',
+        zmid=0,
+        colorbar=dict(title=label),
+        hovertemplate='Spot: %{y:.2f}<br>IV shift: %{x:+.1f} pts<br>' + label + ': %{z:.0f}<extra></extra>'
+    ))
+    fig.add_hline(y=S, line_dash="dash", line_color="black", annotation_text=f"Current Price: {S:.2f}",
+                  annotation_position="top left")
+    fig.update_layout(
+        title=f'{label} Scenarios ({days_forward:g} days forward)',
+        xaxis_title='IV Shift (vol points)',
+        yaxis_title='Underlying Price',
+    )
+    return fig
@@ -0,0 +1,240 @@
+# utils/exposures.py
+import math
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from utils.cache import TTLCache
+from utils.greeks import bs_greeks, chain_prices, implied_volatility
+from utils.timing import timed
+
+# Shares per equity option contract.
+CONTRACT_MULTIPLIER = 100
+
+# Exposure tables computed by chain_exposures, shared by every page and
+# session viewing the same chain snapshot, expiry and spot. Keys include the
+# snapshot version, so entries never need to expire; old ones age out of the LRU.
+EXPOSURE_CACHE_MAX_ENTRIES = 32
+EXPOSURE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+exposure_cache = TTLCache(
+    ttl=math.inf,
+    stale_ttl=0.0,
+    max_entries=EXPOSURE_CACHE_MAX_ENTRIES,
+    max_bytes=EXPOSURE_CACHE_MAX_BYTES,
+)
+
+
+def years_to_expiry(expiries, today=None):
+    """
+    Calendar-day time to expiry in years (days / 365) for an array of
+    expiry dates, matching the t used on the exposure pages.
+    """
+    today = pd.Timestamp(today or datetime.today().date())
+    days = (pd.to_datetime(pd.Series(expiries)).dt.normalize() - today).dt.days
+    return days.to_numpy(dtype=float) / 365.0
+
+
+@timed("greeks")
+def add_exposures(df, flag, S, t, solve_iv=False):
+    """
+    Returns a copy of df with calc_delta, calc_gamma, calc_vanna, the
+    per-contract exposures DEX, GEX and VEX (Greek * openInterest * 100)
+    and the time to expiry used, in column 't'.
+
+    Args:
+        df (pd.DataFrame): Chain rows with 'strike', 'impliedVolatility' and 'openInterest'.
+        flag: 'c'/'p' or an array of flags, one per row.
+        S (float): Underlying price.
+        t: Time to expiration in years, scalar or one value per row.
+        solve_iv (bool): Price the Greeks with IV solved from the bid/ask mid
+            (or lastPrice) instead of Yahoo's impliedVolatility. Adds
+            'solved_iv' and 'iv_converged'; unconverged rows get NaN Greeks.
+    """
+    df = df.copy()
+    df["t"] = np.broadcast_to(np.asarray(t, dtype=float), len(df)).copy()
+    sigma = df["impliedVolatility"]
+    if solve_iv:
+        df["solved_iv"], df["iv_converged"] = implied_volatility(chain_prices(df), flag, S, df["strike"], df["t"])
+        sigma = df["solved_iv"]
+    greeks = bs_greeks(flag, S, df["strike"], df["t"], sigma)
+    df["calc_delta"] = greeks["delta"]
+    df["calc_gamma"] = greeks["gamma"]
+    df["calc_vanna"] = greeks["vanna"]
+    oi = df["openInterest"].to_numpy(dtype=float) * CONTRACT_MULTIPLIER
+    df["DEX"] = df["calc_delta"] * oi
+    df["GEX"] = df["calc_gamma"] * oi
+    df["VEX"] = df["calc_vanna"] * oi
+    return df
+
+
+def _both_exposures(calls, puts, S, t_calls, t_puts, solve_iv):
+    # One vectorized pass over calls and puts together, split back afterwards.
+    n_calls = len(calls)
+    both = pd.concat([calls, puts], ignore_index=True)
+    flags = np.repeat(np.array(["c", "p"]), [n_calls, len(puts)])
+    t = np.concatenate([
+        np.broadcast_to(np.asarray(t_calls, dtype=float), n_calls),
+        np.broadcast_to(np.asarray(t_puts, dtype=float), len(puts)),
+    ])
+    both = add_exposures(both, flags, S, t, solve_iv=solve_iv)
+    return both.iloc[:n_calls], both.iloc[n_calls:]
+
+
+@timed("greeks")
+def chain_exposures(ticker, version, expiry, calls, puts, S, t_calls, t_puts, solve_iv=False):
+    """
+    Calls and puts with delta, gamma, vanna and DEX/GEX/VEX (see
+    add_exposures), computed in one pass and memoized in exposure_cache.
+
+    Args:
+        ticker (str): Ticker the chain belongs to.
+        version: Snapshot version of the chain (data_fetcher.snapshot_version);
+            None computes without caching.
+        expiry: Label of the expiry selection calls and puts were filtered to
+            (a date string, or the pages' 'All expirations').
+        calls, puts (pd.DataFrame): The filtered chain.
+        S (float): Underlying price.
+        t_calls, t_puts: Time to expiry in years, scalar or per row.
+        solve_iv (bool): See add_exposures.
+
+    Returns:
+        tuple: (calls, puts). They are shared between pages and sessions and
+        must not be modified in place.
+    """
+    if version is None:
+        return _both_exposures(calls, puts, S, t_calls, t_puts, solve_iv)
+    # Time to expiry is counted in days, so the table turns over with the date.
+    key = (ticker, version, expiry, S, solve_iv, datetime.today().date())
+    return exposure_cache.get_or_load(key, lambda: _both_exposures(calls, puts, S, t_calls, t_puts, solve_iv))
+
+
+def exposure_totals(calls, puts):
+    """
+    Chain-wide exposure totals from frames produced by add_exposures.
+    Net GEX counts call gamma as positive and put gamma as negative; DEX and
+    VEX are summed as-is since put delta already carries its sign.
+    """
+    call_gex = float(np.nansum(calls["GEX"])) if not calls.empty else 0.0
+    put_gex = float(np.nansum(puts["GEX"])) if not puts.empty else 0.0
+    dex = sum(float(np.nansum(df["DEX"])) for df in (calls, puts) if not df.empty)
+    vex = sum(float(np.nansum(df["VEX"])) for df in (calls, puts) if not df.empty)
+    return {
+        "call_gex": call_gex,
+        "put_gex": put_gex,
+        "net_gex": call_gex - put_gex,
+        "net_dex": dex,
+        "net_vex": vex,
+    }
+
+
+@timed("reshape")
+def strike_exposures(calls, puts, columns=("GEX", "DEX", "VEX")):
+    """
+    Sums per-contract exposures by strike across every expiry in the frames.
+
+    Calls and puts are reduced in a single groupby over (type, strike).
+
+    Returns:
+        tuple: (calls_by_strike, puts_by_strike) DataFrames with a 'strike'
+        column and one summed column per entry in columns, sorted by strike.
+    """
+    columns = list(columns)
+    chain = pd.concat(
+        [calls.assign(OptionType="Call"), puts.assign(OptionType="Put")],
+        ignore_index=True,
+    )
+    totals = chain.groupby(["OptionType", "strike"], sort=True)[columns].sum()
+    option_type = totals.index.get_level_values("OptionType")
+    calls_by_strike = totals[option_type == "Call"].droplevel("OptionType").reset_index()
+    puts_by_strike = totals[option_type == "Put"].droplevel("OptionType").reset_index()
+    return calls_by_strike, puts_by_strike
+
+
+@timed("greeks")
+def gamma_profile(calls, puts, S, t=None, span=0.10, points=81, solve_iv=False):
+    """
+    Net gamma exposure as the underlying moves across a spot grid.
+
+    Greeks are evaluated for the whole (spot grid x contracts) matrix in one
+    array operation. Call GEX counts as positive and put GEX as negative,
+    as in exposure_totals.
+
+    Args:
+        calls, puts (pd.DataFrame): Chain rows with 'strike', 'impliedVolatility' and 'openInterest'.
+        S (float): Current underlying price; the grid spans S * (1 +/- span).
+        t: Time to expiration in years, scalar or one value per row (calls
+            first, then puts). Defaults to the 't' column set by add_exposures.
+        span (float): Relative half-width of the spot grid.
+        points (int): Number of spot levels.
+        solve_iv (bool): Price with the 'solved_iv' column added by
+            add_exposures(..., solve_iv=True) instead of Yahoo's
+            impliedVolatility, as the page's other charts do.
+
+    Returns:
+        tuple: (spots, net_gex) arrays of length points.
+    """
+    chain = pd.concat([calls, puts], ignore_index=True)
+    is_call = np.r_[np.ones(len(calls), dtype=bool), np.zeros(len(puts), dtype=bool)]
+    spots = np.linspace(S * (1 - span), S * (1 + span), points)
+    if t is None:
+        t = chain["t"].to_numpy(dtype=float)
+
+    gamma = bs_greeks(
+        is_call[None, :],
+        spots[:, None],
+        chain["strike"].to_numpy(dtype=float)[None, :],
+        np.asarray(t, dtype=float),
+        chain["solved_iv" if solve_iv else "impliedVolatility"].to_numpy(dtype=float)[None, :],
+    )["gamma"]
+    signed_oi = np.where(is_call, 1.0, -1.0) * chain["openInterest"].to_numpy(dtype=float) * CONTRACT_MULTIPLIER
+    net_gex = np.nansum(gamma * signed_oi[None, :], axis=1)
+    return spots, net_gex
+
+
+def chain_gamma_profile(ticker, version, expiry, calls, puts, S, solve_iv=False):
+    """
+    gamma_profile for a page's chain selection, memoized in exposure_cache
+    under the same inputs as chain_exposures, so reruns with unchanged data
+    do not re-evaluate the spot grid.
+
+    Args:
+        ticker, version, expiry, S, solve_iv: As in chain_exposures; version
+            None computes without caching.
+        calls, puts (pd.DataFrame): Frames returned by chain_exposures.
+
+    Returns:
+        tuple: (spots, net_gex), shared between sessions and not to be
+        modified in place.
+    """
+    def load():
+        return gamma_profile(calls, puts, S, solve_iv=solve_iv)
+
+    if version is None:
+        return load()
+    key = ("gamma_profile", ticker, version, expiry, S, solve_iv, datetime.today().date())
+    return exposure_cache.get_or_load(key, load)
+
+
+def gamma_flip(spots, net_gex, S=None):
+    """
+    Spot level where net GEX crosses zero, found by linear interpolation
+    between grid points. When the curve crosses more than once, the crossing
+    closest to S (or the first one if S is not given) is returned; None if
+    it never crosses.
+    """
+    spots = np.asarray(spots, dtype=float)
+    net_gex = np.asarray(net_gex, dtype=float)
+    sign = np.sign(net_gex)
+    idx = np.nonzero(sign[:-1] * sign[1:] < 0)[0]
+    exact = spots[net_gex == 0]
+    if idx.size == 0 and exact.size == 0:
+        return None
+
+    x0, x1 = spots[idx], spots[idx + 1]
+    y0, y1 = net_gex[idx], net_gex[idx + 1]
+    crossings = np.concatenate([x0 - y0 * (x1 - x0) / (y1 - y0), exact])
+    if S is None:
+        return float(crossings.min())
+    return float(crossings[np.argmin(np.abs(crossings - S))])
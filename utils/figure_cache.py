@@ -0,0 +1,65 @@
+# utils/figure_cache.py
+import math
+
+import numpy as np
+import pandas as pd
+
+from utils.cache import TTLCache
+from utils.timing import span
+
+# Figures are built from frames, which are not hashable, so they are keyed by
+# the version of the data snapshot they came from plus the view parameters
+# that shaped them. Figures never expire; a new data version makes a new key
+# and old ones age out of the LRU.
+FIGURE_CACHE_MAX_ENTRIES = 128
+
+figure_cache = TTLCache(ttl=math.inf, stale_ttl=0.0, max_entries=FIGURE_CACHE_MAX_ENTRIES)
+
+_SCALARS = (str, int, float, bool, type(None), np.generic, pd.Timestamp)
+
+
+def _key_part(value):
+    # Scalar arguments (labels, palettes, thresholds...) key the figure
+    # directly; frames are stood in for by the version and params.
+    if isinstance(value, _SCALARS):
+        return value
+    if isinstance(value, (tuple, list)) and all(isinstance(v, _SCALARS) for v in value):
+        return tuple(value)
+    return type(value).__name__
+
+
+def cached_figure(version, params, builder, *args, **kwargs):
+    """
+    Returns builder(*args, **kwargs), reusing the figure built earlier for
+    the same builder, data version, params and scalar arguments.
+
+    Args:
+        version: Data snapshot version (see data_fetcher.snapshot_version and
+            chain_version). None disables caching for this call.
+        params (tuple): Hashable view parameters that shaped the frames
+            passed in (expiry, strike range, filters...).
+        builder (callable): Figure builder; it must not mutate its inputs.
+
+    The returned figure is shared across reruns and sessions and must not
+    be modified.
+    """
+    if version is None:
+        return builder(*args, **kwargs)
+    key = (
+        builder.__module__,
+        builder.__qualname__,
+        version,
+        params,
+        tuple(_key_part(a) for a in args),
+        tuple(sorted((k, _key_part(v)) for k, v in kwargs.items())),
+    )
+    loaded = []
+
+    def load():
+        loaded.append(True)
+        return builder(*args, **kwargs)
+
+    with span(f"figure_cache:{builder.__name__}") as record:
+        figure = figure_cache.get_or_load(key, load)
+        record["hit"] = not loaded
+    return figure
@@ -0,0 +1,212 @@
+# utils/greeks.py
+import numpy as np
+from scipy.special import ndtr
+
+# Largest absolute difference against the scalar py_vollib analytical Greeks
+# (r = 0) observed over strikes 0.5x-2x spot, IV 1%-300% and t 1 day-3 years.
+# Both sides use double precision, so the gap is pure floating-point noise.
+GREEKS_TOLERANCE = 1e-9
+
+_SQRT_2PI = np.sqrt(2.0 * np.pi)
+
+
+def _call_mask(flag, size):
+    """
+    Returns a boolean array that is True for calls.
+    Accepts a single 'c'/'p' flag or an array of flags (any case).
+    """
+    flags = np.asarray(flag)
+    if flags.dtype == bool:
+        return np.broadcast_to(flags, size)
+    flags = np.char.lower(flags.astype(str))
+    return np.broadcast_to(flags == "c", size)
+
+
+def bs_greeks(flag, S, K, t, sigma):
+    """
+    Vectorized Black-Scholes Greeks for a whole option chain (risk-free rate 0).
+
+    Matches py_vollib's analytical Greeks (see GREEKS_TOLERANCE), but
+    evaluates every contract in a single NumPy pass. Contracts with a missing
+    or non-positive IV, strike, spot or time to expiry are masked out and get
+    NaN for every Greek.
+
+    Args:
+        flag: 'c'/'p' or an array of flags, one per contract.
+        S: Underlying price (scalar or array).
+        K: Strike prices.
+        t: Time to expiration in years (scalar or array).
+        sigma: Implied volatilities.
+
+    Returns:
+        dict: 'delta', 'gamma', 'vega' and 'vanna' float64 arrays. Vega is
+        per 1% move in volatility, as in py_vollib, and vanna is derived from
+        that vega as -vega * d2 / (S * sigma * sqrt(t)).
+    """
+    S, K, t, sigma = np.broadcast_arrays(
+        np.asarray(S, dtype=float),
+        np.asarray(K, dtype=float),
+        np.asarray(t, dtype=float),
+        np.asarray(sigma, dtype=float),
+    )
+    is_call = _call_mask(flag, S.shape)
+
+    valid = (
+        np.isfinite(S) & np.isfinite(K) & np.isfinite(t) & np.isfinite(sigma)
+        & (S > 0) & (K > 0) & (t > 0) & (sigma > 0)
+    )
+
+    delta = np.full(S.shape, np.nan)
+    gamma = np.full(S.shape, np.nan)
+    vega = np.full(S.shape, np.nan)
+    vanna = np.full(S.shape, np.nan)
+
+    S_v, K_v, t_v, sigma_v = S[valid], K[valid], t[valid], sigma[valid]
+    sqrt_t = np.sqrt(t_v)
+    vol_sqrt_t = sigma_v * sqrt_t
+    d1 = (np.log(S_v / K_v) + 0.5 * sigma_v**2 * t_v) / vol_sqrt_t
+    d2 = d1 - vol_sqrt_t
+    pdf_d1 = np.exp(-0.5 * d1**2) / _SQRT_2PI
+    cdf_d1 = ndtr(d1)
+
+    delta[valid] = np.where(is_call[valid], cdf_d1, cdf_d1 - 1.0)
+    gamma[valid] = pdf_d1 / (S_v * vol_sqrt_t)
+    vega_v = S_v * pdf_d1 * sqrt_t * 0.01
+    vega[valid] = vega_v
+    vanna[valid] = -vega_v * d2 / (S_v * vol_sqrt_t)
+
+    return {"delta": delta, "gamma": gamma, "vega": vega, "vanna": vanna}
+
+
+def _d1(S, K, t, sigma):
+    return (np.log(S / K) + 0.5 * sigma**2 * t) / (sigma * np.sqrt(t))
+
+
+def bs_price(flag, S, K, t, sigma):
+    """
+    Vectorized Black-Scholes option price with a zero risk-free rate.
+    Arguments broadcast like bs_greeks; invalid inputs give NaN.
+    """
+    S, K, t, sigma = np.broadcast_arrays(
+        np.asarray(S, dtype=float),
+        np.asarray(K, dtype=float),
+        np.asarray(t, dtype=float),
+        np.asarray(sigma, dtype=float),
+    )
+    is_call = _call_mask(flag, S.shape)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d1 = _d1(S, K, t, sigma)
+        d2 = d1 - sigma * np.sqrt(t)
+        call = S * ndtr(d1) - K * ndtr(d2)
+        # Priced directly rather than by parity, which would lose the
+        # value of cheap out-of-the-money puts to cancellation.
+        put = K * ndtr(-d2) - S * ndtr(-d1)
+    price = np.where(is_call, call, put)
+    valid = (S > 0) & (K > 0) & (t > 0) & (sigma > 0)
+    return np.where(valid, price, np.nan)
+
+
+def implied_volatility(price, flag, S, K, t, tol=1e-6, max_iter=100, low=1e-4, high=5.0):
+    """
+    Batch implied-volatility solver (risk-free rate 0).
+
+    Inverts Black-Scholes for every contract at once with Newton steps on
+    vega, falling back to bisection whenever a step would leave the current
+    [low, high] bracket, so every contract converges monotonically. Only the
+    contracts that are still unconverged are repriced on each iteration.
+
+    In-the-money contracts are solved on their time value, which with r = 0
+    is the price of the out-of-the-money option at the same strike (put-call
+    parity). Their price is almost all intrinsic value, so a tolerance on
+    the full price would accept badly wrong volatilities.
+
+    Args:
+        price: Option prices (e.g. bid/ask mids), one per contract.
+        flag: 'c'/'p' or an array of flags.
+        S: Underlying price (scalar or array).
+        K: Strike prices.
+        t: Time to expiration in years (scalar or array).
+        tol (float): Convergence tolerance on the repriced time value,
+            relative to the target time value so cheap wings and deep
+            in-the-money contracts are solved as precisely as at-the-money ones.
+        max_iter (int): Iteration cap.
+        low, high (float): Volatility search bracket.
+
+    Returns:
+        tuple: (iv, converged). iv is NaN wherever converged is False, which
+        includes prices outside the no-arbitrage bounds, time values too small
+        to resolve and invalid inputs.
+    """
+    price, S, K, t = np.broadcast_arrays(
+        np.asarray(price, dtype=float),
+        np.asarray(S, dtype=float),
+        np.asarray(K, dtype=float),
+        np.asarray(t, dtype=float),
+    )
+    is_call = np.array(_call_mask(flag, price.shape))
+    shape = price.shape
+    price, S, K, t, is_call = (a.ravel() for a in (price, S, K, t, is_call))
+
+    intrinsic = np.where(is_call, np.maximum(S - K, 0.0), np.maximum(K - S, 0.0))
+    upper = np.where(is_call, S, K)
+    valid = (
+        np.isfinite(price) & np.isfinite(S) & np.isfinite(K) & np.isfinite(t)
+        & (S > 0) & (K > 0) & (t > 0)
+        & (price > intrinsic) & (price < upper)
+    )
+
+    # Swap in-the-money contracts for their out-of-the-money counterpart.
+    # A time value below what the quoted price can resolve to tol carries
+    # no volatility information, so those contracts are left unconverged.
+    itm = intrinsic > 0
+    with np.errstate(invalid="ignore"):
+        valid &= price - intrinsic >= np.spacing(np.abs(price)) / tol
+    price = price - intrinsic
+    is_call = np.where(itm, ~is_call, is_call)
+
+    iv = np.full(price.shape, np.nan)
+    converged = np.zeros(price.shape, dtype=bool)
+
+    idx = np.nonzero(valid)[0]
+    lo = np.full(idx.size, low)
+    hi = np.full(idx.size, high)
+    # Brenner-Subrahmanyam starting point, clipped into the bracket
+    sigma = np.clip(np.sqrt(2.0 * np.pi / t[idx]) * price[idx] / S[idx], low * 2, high / 2)
+
+    for _ in range(max_iter):
+        if idx.size == 0:
+            break
+        S_i, K_i, t_i = S[idx], K[idx], t[idx]
+        diff = bs_price(is_call[idx], S_i, K_i, t_i, sigma) - price[idx]
+
+        done = np.abs(diff) <= tol * price[idx]
+        iv[idx[done]] = sigma[done]
+        converged[idx[done]] = True
+
+        keep = ~done
+        idx, sigma, diff, lo, hi = idx[keep], sigma[keep], diff[keep], lo[keep], hi[keep]
+        S_i, K_i, t_i = S_i[keep], K_i[keep], t_i[keep]
+
+        # Price rises with volatility, so the sign of diff narrows the bracket.
+        hi = np.where(diff > 0, sigma, hi)
+        lo = np.where(diff < 0, sigma, lo)
+        sqrt_t = np.sqrt(t_i)
+        vega = S_i * np.exp(-0.5 * _d1(S_i, K_i, t_i, sigma) ** 2) / _SQRT_2PI * sqrt_t
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            newton = sigma - diff / vega
+        in_bracket = np.isfinite(newton) & (newton > lo) & (newton < hi)
+        sigma = np.where(in_bracket, newton, 0.5 * (lo + hi))
+
+    return iv.reshape(shape), converged.reshape(shape)
+
+
+def chain_prices(df):
+    """
+    Price to invert for IV: the bid/ask mid where both quotes are positive
+    and not crossed, otherwise lastPrice.
+    """
+    bid = df["bid"].to_numpy(dtype=float)
+    ask = df["ask"].to_numpy(dtype=float)
+    mid = 0.5 * (bid + ask)
+    has_quote = (bid > 0) & (ask >= bid)
+    return np.where(has_quote, mid, df["lastPrice"].to_numpy(dtype=float))
@@ -0,0 +1,339 @@
+# utils/intraday.py
+"""
+Per-ticker ring buffers of price bars with incrementally updated indicators.
+
+intraday_feed.bars(ticker, interval) returns a BarBuffer kept up to date
+across calls and sessions. The first call loads INITIAL_PERIODS[interval]
+of history. Later calls poll at most every POLL_SECONDS, ask for the short
+POLL_PERIODS[interval] window, and only feed the bars newer than the last
+one stored (the last bar itself is revised while it is still forming).
+
+Every indicator keeps a small running state, so each new bar costs O(1)
+however long its window: RSI (Wilder), simple and exponential moving
+averages, and a VWAP that restarts each session.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from utils.providers import get_provider
+from utils.scheduler import scheduled
+
+DEFAULT_CAPACITY = 2048
+RSI_PERIOD = 14
+SMA_PERIODS = (50, 200)
+EMA_PERIODS = (20,)
+POLL_SECONDS = 15.0
+MAX_BUFFERS = 256
+
+# History requested on the first load of an interval, and on later polls.
+INITIAL_PERIODS = {"1m": "1d", "2m": "5d", "5m": "5d", "15m": "1mo", "30m": "1mo", "60m": "3mo", "1h": "3mo",
+                   "1d": "1y"}
+POLL_PERIODS = {"1m": "1d", "2m": "1d", "5m": "1d", "15m": "5d", "30m": "5d", "60m": "5d", "1h": "5d",
+                "1d": "5d"}
+
+BAR_COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+
+_NS_PER_DAY = 86_400 * 10**9
+
+
+class RollingMean:
+    """Simple moving average over the last `period` values."""
+    __slots__ = ("period", "_window", "_pos", "_count", "_sum")
+
+    def __init__(self, period):
+        self.period = period
+        self._window = np.zeros(period)
+        self._pos = 0
+        self._count = 0
+        self._sum = 0.0
+
+    def push(self, x):
+        self._sum += x - self._window[self._pos]
+        self._window[self._pos] = x
+        self._pos = (self._pos + 1) % self.period
+        self._count = min(self._count + 1, self.period)
+        return self.value
+
+    def replace(self, x):
+        last = (self._pos - 1) % self.period
+        self._sum += x - self._window[last]
+        self._window[last] = x
+        return self.value
+
+    @property
+    def value(self):
+        return self._sum / self.period if self._count == self.period else math.nan
+
+
+class ExponentialMean:
+    """Exponential moving average, seeded with the mean of the first `period` values."""
+    __slots__ = ("period", "alpha", "_value", "_before", "_count")
+
+    def __init__(self, period):
+        self.period = period
+        self.alpha = 2.0 / (period + 1)
+        self._value = 0.0
+        self._before = 0.0
+        self._count = 0
+
+    def _step(self, state, count, x):
+        if count <= self.period:
+            return state + (x - state) / count
+        return state + self.alpha * (x - state)
+
+    def push(self, x):
+        self._before = self._value
+        self._count += 1
+        self._value = self._step(self._before, self._count, x)
+        return self.value
+
+    def replace(self, x):
+        self._value = self._step(self._before, self._count, x)
+        return self.value
+
+    @property
+    def value(self):
+        return self._value if self._count >= self.period else math.nan
+
+
+class WilderRSI:
+    """Relative strength index with Wilder's smoothing of gains and losses."""
+    __slots__ = ("period", "_prev_close", "_gain", "_loss", "_before", "_count")
+
+    def __init__(self, period=RSI_PERIOD):
+        self.period = period
+        self._prev_close = math.nan
+        self._gain = 0.0
+        self._loss = 0.0
+        self._before = (math.nan, 0.0, 0.0, 0)
+        self._count = 0
+
+    def _step(self, x):
+        if math.isnan(self._prev_close):
+            self._prev_close = x
+            return
+        change = x - self._prev_close
+        self._prev_close = x
+        self._count += 1
+        # The first `period` changes are averaged; after that each one is
+        # blended in with weight 1/period.
+        weight = 1.0 / min(self._count, self.period)
+        self._gain += (max(change, 0.0) - self._gain) * weight
+        self._loss += (max(-change, 0.0) - self._loss) * weight
+
+    def push(self, x):
+        self._before = (self._prev_close, self._gain, self._loss, self._count)
+        self._step(x)
+        return self.value
+
+    def replace(self, x):
+        self._prev_close, self._gain, self._loss, self._count = self._before
+        self._step(x)
+        return self.value
+
+    @property
+    def value(self):
+        if self._count < self.period:
+            return math.nan
+        if self._loss == 0:
+            return 100.0 if self._gain > 0 else 50.0
+        return 100.0 - 100.0 / (1.0 + self._gain / self._loss)
+
+
+class SessionVWAP:
+    """Volume-weighted average of the typical price (H+L+C)/3, restarted each day."""
+    __slots__ = ("_day", "_pv", "_volume", "_before")
+
+    def __init__(self):
+        self._day = None
+        self._pv = 0.0
+        self._volume = 0.0
+        self._before = (None, 0.0, 0.0)
+
+    def _step(self, day, high, low, close, volume):
+        if day != self._day:
+            self._day, self._pv, self._volume = day, 0.0, 0.0
+        self._pv += (high + low + close) / 3.0 * volume
+        self._volume += volume
+
+    def push(self, day, high, low, close, volume):
+        self._before = (self._day, self._pv, self._volume)
+        self._step(day, high, low, close, volume)
+        return self.value
+
+    def replace(self, day, high, low, close, volume):
+        self._day, self._pv, self._volume = self._before
+        self._step(day, high, low, close, volume)
+        return self.value
+
+    @property
+    def value(self):
+        return self._pv / self._volume if self._volume > 0 else math.nan
+
+
+class BarBuffer:
+    """
+    Fixed-capacity ring buffer of OHLCV bars and their indicators.
+
+    Bars are kept in time order; once `capacity` bars are stored, each new
+    one overwrites the oldest. Indicator columns are RSI, SMA_<n>, EMA_<n>
+    and VWAP, computed as each bar arrives. Timestamps are stored as
+    exchange wall-clock time.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, rsi_period=RSI_PERIOD, sma_periods=SMA_PERIODS,
+                 ema_periods=EMA_PERIODS):
+        self.capacity = capacity
+        self._rsi = WilderRSI(rsi_period)
+        self._smas = [RollingMean(n) for n in sma_periods]
+        self._emas = [ExponentialMean(n) for n in ema_periods]
+        self._vwap = SessionVWAP()
+        self.columns = (list(BAR_COLUMNS) + ["RSI"] + [f"SMA_{n}" for n in sma_periods]
+                        + [f"EMA_{n}" for n in ema_periods] + ["VWAP"])
+        self._times = np.zeros(capacity, dtype=np.int64)
+        self._values = np.full((capacity, len(self.columns)), np.nan)
+        self._next = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def last_time(self):
+        """Timestamp of the newest bar, or None when empty."""
+        return pd.Timestamp(int(self._times[(self._next - 1) % self.capacity])) if self._size else None
+
+    def append(self, when, open_, high, low, close, volume):
+        """Adds a bar newer than the last one, or revises the last bar if `when` equals its time."""
+        when = pd.Timestamp(when).value
+        revise = self._size and when == self._times[(self._next - 1) % self.capacity]
+        if revise:
+            row = (self._next - 1) % self.capacity
+            update = "replace"
+        else:
+            if self._size and when < self._times[(self._next - 1) % self.capacity]:
+                raise ValueError("bars must be appended in time order")
+            row = self._next
+            self._next = (self._next + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+            update = "push"
+
+        values = [open_, high, low, close, volume, getattr(self._rsi, update)(close)]
+        values += [getattr(sma, update)(close) for sma in self._smas]
+        values += [getattr(ema, update)(close) for ema in self._emas]
+        values.append(getattr(self._vwap, update)(when // _NS_PER_DAY, high, low, close, volume))
+        self._times[row] = when
+        self._values[row] = values
+
+    def extend(self, bars):
+        """
+        Feeds the rows of an OHLCV DataFrame (indexed by time) that are not
+        older than the newest stored bar. Returns the number of new bars.
+        """
+        if bars is None or bars.empty:
+            return 0
+        # Yahoo pads gaps with empty rows; they would poison the running sums.
+        bars = bars.dropna(subset=["Close"])
+        index = pd.DatetimeIndex(bars.index)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        times = index.values.astype("datetime64[ns]").view(np.int64)
+        last = self._times[(self._next - 1) % self.capacity] if self._size else None
+        start = 0 if last is None else int(np.searchsorted(times, last, side="left"))
+        values = bars[list(BAR_COLUMNS)].fillna({"Volume": 0}).to_numpy(dtype=float)[start:]
+        added = 0
+        for when, (open_, high, low, close, volume) in zip(times[start:], values):
+            if last is None or when > last:
+                added += 1
+            self.append(when, open_, high, low, close, volume)
+        return added
+
+    def latest(self, back=0):
+        """The newest bar (back=1: the one before it) as a dict with 'time', or None."""
+        if back >= self._size:
+            return None
+        row = (self._next - 1 - back) % self.capacity
+        bar = dict(zip(self.columns, self._values[row].tolist()))
+        bar["time"] = pd.Timestamp(int(self._times[row]))
+        return bar
+
+    def frame(self, last=None):
+        """The stored bars, oldest first, as a DataFrame (last: only the newest n)."""
+        n = self._size if last is None else min(last, self._size)
+        rows = (np.arange(self._next - n, self._next)) % self.capacity
+        return pd.DataFrame(self._values[rows], columns=self.columns,
+                            index=pd.DatetimeIndex(self._times[rows].astype("datetime64[ns]"), name="Datetime"))
+
+
+class _Feed:
+    __slots__ = ("buffer", "lock", "polled_at", "last_error")
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.lock = threading.Lock()
+        self.polled_at = None
+        self.last_error = None
+
+
+class IntradayFeed:
+    """
+    Process-wide BarBuffers keyed by (ticker, interval), shared by every
+    session. Concurrent callers for the same buffer wait for one poll.
+    """
+
+    def __init__(self, poll_seconds=POLL_SECONDS, capacity=DEFAULT_CAPACITY, max_buffers=MAX_BUFFERS):
+        self.poll_seconds = poll_seconds
+        self.capacity = capacity
+        self.max_buffers = max_buffers
+        self._feeds = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _feed(self, key):
+        with self._lock:
+            feed = self._feeds.get(key)
+            if feed is None:
+                feed = self._feeds[key] = _Feed(BarBuffer(self.capacity))
+                while len(self._feeds) > self.max_buffers:
+                    self._feeds.popitem(last=False)
+            self._feeds.move_to_end(key)
+            return feed
+
+    def bars(self, ticker, interval="1m"):
+        """
+        The BarBuffer of ticker's `interval` bars, polling for new bars when
+        the last poll is older than poll_seconds. A failed poll keeps the
+        bars already stored; a failed first load raises.
+        """
+        feed = self._feed((ticker, interval))
+        with feed.lock:
+            now = time.monotonic()
+            if feed.polled_at is not None and now - feed.polled_at < self.poll_seconds:
+                return feed.buffer
+            first = feed.polled_at is None
+            period = (INITIAL_PERIODS if first else POLL_PERIODS).get(interval, "1d")
+            try:
+                history = scheduled(get_provider().history, ticker, period=period, interval=interval)
+            except Exception as e:
+                feed.last_error = e
+                if first:
+                    raise
+                return feed.buffer
+            feed.buffer.extend(history)
+            feed.polled_at = now
+            feed.last_error = None
+            return feed.buffer
+
+    def invalidate(self, ticker=None):
+        """Drops every buffer of ticker, or all of them; the next call reloads."""
+        with self._lock:
+            for key in [k for k in self._feeds if ticker is None or k[0] == ticker]:
+                del self._feeds[key]
+
+
+# Process-wide feed shared by every Streamlit session.
+intraday_feed = IntradayFeed()
@@ -0,0 +1,178 @@
+# utils/option_charts.py
+# Plotly figure builders for the YahooOptions.py pages. Kept free of
+# Streamlit so they can be built (and benchmarked) outside the app.
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from utils.timing import timed
+
+# Above this many points (calls + puts), charts switch to large-chart mode:
+# strikes are summed into equal-width buckets server-side and markers are
+# drawn with WebGL. Plotly has no WebGL bar trace, so bar charts are binned only.
+LARGE_CHART_POINTS = 2000
+BUBBLE_MAX_SIZE = 40
+
+def filter_strikes(df, strike_range=None):
+    """Rows of df whose strike lies in strike_range (inclusive); all rows if None."""
+    if strike_range is None:
+        return df
+    low, high = strike_range
+    strikes = df['strike']
+    if strikes.is_monotonic_increasing:
+        # One expiry of an OptionChain is sorted by strike: slice, don't mask.
+        values = strikes.to_numpy(dtype=float)
+        return df.iloc[np.searchsorted(values, low, side="left"):np.searchsorted(values, high, side="right")]
+    return df[(strikes >= low) & (strikes <= high)]
+
+def bin_strikes(df, columns, edges):
+    """
+    Sums columns over the strike buckets delimited by edges.
+
+    Returns:
+        pd.DataFrame: One row per non-empty bucket with the mean strike of its
+        contracts ('strike'), their number ('contracts') and the summed columns.
+    """
+    strikes = df['strike'].to_numpy(dtype=float)
+    n_bins = len(edges) - 1
+    idx = np.clip(np.searchsorted(edges, strikes, side='right') - 1, 0, n_bins - 1)
+    counts = np.bincount(idx, minlength=n_bins)
+    keep = counts > 0
+    binned = {
+        'strike': np.bincount(idx, weights=strikes, minlength=n_bins)[keep] / counts[keep],
+        'contracts': counts[keep],
+    }
+    for col in columns:
+        values = np.nan_to_num(df[col].to_numpy(dtype=float))
+        binned[col] = np.bincount(idx, weights=values, minlength=n_bins)[keep]
+    return pd.DataFrame(binned)
+
+def prepare_chart_data(calls, puts, columns, max_points=LARGE_CHART_POINTS, strike_range=None):
+    """
+    Restricts calls and puts to strike_range and, if more than max_points
+    rows remain, sums columns into shared strike buckets (max_points // 2
+    per side), so the chart stays responsive.
+
+    Returns:
+        tuple: (calls, puts, binned)
+    """
+    calls = filter_strikes(calls, strike_range)
+    puts = filter_strikes(puts, strike_range)
+    if len(calls) + len(puts) <= max_points:
+        return calls, puts, False
+
+    strikes = pd.concat([calls['strike'], puts['strike']]).astype(float)
+    low, high = strikes.min(), strikes.max()
+    edges = np.linspace(low, high if high > low else low + 1.0, max(1, max_points // 2) + 1)
+    return bin_strikes(calls, columns, edges), bin_strikes(puts, columns, edges), True
+
+def add_current_price_line(fig, current_price):
+    """
+    Adds a vertical dashed white line at the current price to a Plotly figure.
+    """
+    fig.add_vline(
+        x=current_price,
+        line_dash="dash",
+        line_color="white",
+        opacity=0.7,
+        annotation_text=f"{current_price}",
+        annotation_position="top",
+    )
+    return fig
+
+@timed("figure")
+def create_oi_volume_charts(calls, puts, S, max_points=LARGE_CHART_POINTS, strike_range=None):
+    """
+    Open Interest and Volume bar charts by strike, with a line at the
+    underlying price S. Large chains are summed into strike buckets.
+    """
+    calls, puts, binned = prepare_chart_data(calls, puts, ['openInterest', 'volume'], max_points, strike_range)
+    calls_df = calls[['strike', 'openInterest', 'volume']].copy()
+    calls_df['OptionType'] = 'Call'
+    
+    puts_df = puts[['strike', 'openInterest', 'volume']].copy()
+    puts_df['OptionType'] = 'Put'
+    
+    combined = pd.concat([calls_df, puts_df], ignore_index=True)
+    combined.sort_values(by='strike', inplace=True)
+    suffix = ' (binned by strike)' if binned else ''
+    
+    fig_oi = px.bar(
+        combined,
+        x='strike',
+        y='openInterest',
+        color='OptionType',
+        title='Open Interest by Strike' + suffix,
+        barmode='group',
+    )
+    fig_oi.update_layout(
+        xaxis_title='Strike Price',
+        yaxis_title='Open Interest',
+        hovermode='x unified'
+    )
+    fig_oi.update_xaxes(rangeslider=dict(visible=True))
+    
+    fig_volume = px.bar(
+        combined,
+        x='strike',
+        y='volume',
+        color='OptionType',
+        title='Volume by Strike' + suffix,
+        barmode='group',
+    )
+    fig_volume.update_layout(
+        xaxis_title='Strike Price',
+        yaxis_title='Volume',
+        hovermode='x unified'
+    )
+    fig_volume.update_xaxes(rangeslider=dict(visible=True))
+    
+    # Add current price line
+    S = round(S, 2)
+    fig_oi = add_current_price_line(fig_oi, S)
+    fig_volume = add_current_price_line(fig_volume, S)
+    
+    
+    return fig_oi, fig_volume
+
+@timed("figure")
+def create_heatmap(calls, puts, value='volume'):
+    calls_df = calls[['strike', 'openInterest', 'volume']].copy()
+    calls_df['OptionType'] = 'Call'
+    
+    puts_df = puts[['strike', 'openInterest', 'volume']].copy()
+    puts_df['OptionType'] = 'Put'
+    
+    combined = pd.concat([calls_df, puts_df], ignore_index=True)
+    pivot_df = combined.pivot(index='strike', columns='OptionType', values=value).fillna(0)
+    pivot_df.sort_index(inplace=True)
+    
+    fig = px.imshow(
+        pivot_df,
+        x=pivot_df.columns,
+        y=pivot_df.index,
+        color_continuous_scale='Blues',
+        aspect='auto',
+        labels=dict(
+            x="Option Type",
+            y="Strike",
+            color=value.title()
+        ),
+        title=f"{value.title()} Heatmap (Calls vs Puts)"
+    )
+    fig.update_yaxes(autorange='reversed')
+    fig.update_layout(hovermode='closest')
+    
+    return fig
+
+@timed("figure")
+def create_donut_chart(call_volume, put_volume):
+    labels = ['Calls', 'Puts']
+    values = [call_volume, put_volume]
+    fig = go.Figure(data=[go.Pie(labels=labels, values=values, hole=0.3)])
+    fig.update_layout(
+        title_text='Call vs Put Volume Ratio',
+        showlegend=True
+    )
+    fig.update_traces(hoverinfo='label+percent+value')
+    return fig
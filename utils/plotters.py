@@ -2,10 +2,12 @@ import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
 import plotly.graph_objects as go
+from utils.timing import timed
 
 
 
 
+@timed("figure")
 def create_oi_volume_charts(calls, puts, discrete_palette):
     # Ensure that OptionType is correctly assigned
     calls_df = calls[['strike', 'openInterest', 'volume']].copy()
@@ -66,15 +68,16 @@ def create_oi_volume_charts(calls, puts, discrete_palette):
 
 
 
+@timed("figure")
 def create_treemap(calls, puts, continuous_scale, expiry_date):
-    # Add 'expiry' column manually since it's not in the DataFrame
-    calls['expiry'] = puts['expiry'] = expiry_date  # Add expiry information
-
-    # Prepare DataFrames for calls and puts
-    calls_df = calls[['strike', 'expiry', 'openInterest', 'volume']].copy()
+    # Prepare DataFrames for calls and puts, adding the expiry (not in the
+    # chain's columns) to the copies so the inputs are left untouched
+    calls_df = calls[['strike', 'openInterest', 'volume']].copy()
+    calls_df['expiry'] = expiry_date
     calls_df['OptionType'] = 'Call'
 
-    puts_df = puts[['strike', 'expiry', 'openInterest', 'volume']].copy()
+    puts_df = puts[['strike', 'openInterest', 'volume']].copy()
+    puts_df['expiry'] = expiry_date
     puts_df['OptionType'] = 'Put'
 
     # Combine the data
@@ -92,6 +95,7 @@ def create_treemap(calls, puts, continuous_scale, expiry_date):
     fig.update_layout(margin=dict(t=50, l=25, r=25, b=25))
     return fig
 
+@timed("figure")
 def create_donut_chart(call_volume, put_volume, discrete_palette):
     labels = ['Calls', 'Puts']
     values = [call_volume, put_volume]
@@ -112,6 +116,7 @@ def create_donut_chart(call_volume, put_volume, discrete_palette):
     fig.update_traces(hoverinfo='label+percent+value')
     return fig
 
+@timed("figure")
 def create_gex_bubble_chart(calls, puts):
     calls_gex = calls[['strike', 'gamma', 'openInterest']].copy()
     calls_gex['GEX'] = calls_gex['gamma'] * calls_gex['openInterest'] * 100
@@ -165,6 +170,7 @@ def create_gex_bubble_chart(calls, puts):
 
 
 # Function to create bar charts
+@timed("figure")
 def create_bar_chart(data, exposure_col, title):
     fig = go.Figure()
     fig.add_trace(go.Bar(
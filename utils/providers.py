@@ -0,0 +1,295 @@
+# utils/providers.py
+"""
+Market-data providers.
+
+Everything that talks to a data source goes through the active provider:
+option expiry lists, option chains, spot quotes and price history.
+YFinanceProvider (the default) calls yfinance; ReplayProvider serves chains
+recorded with record_snapshot() from local files, with optional artificial
+latency and rate limiting, so load and performance tests run without
+network access. Providers raise RateLimitError (or yfinance's own rate-limit
+error) when the source throttles; see is_rate_limited().
+
+The active provider is chosen at import time from the environment:
+OPTIONS_REPLAY_DIR selects replay from that directory, with
+OPTIONS_REPLAY_LATENCY / OPTIONS_REPLAY_JITTER (seconds) as its latency and
+OPTIONS_REPLAY_RATE_LIMIT (requests per second) as its simulated limit.
+Call set_provider() to switch in code, before any data is cached.
+"""
+import json
+import math
+import os
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+
+import pandas as pd
+
+# Recorded snapshot layout, relative to the replay directory:
+#   <TICKER>/dates.json
+#   <TICKER>/spot.json
+#   <TICKER>/chains/<expiry>_calls.csv, <expiry>_puts.csv
+#   <TICKER>/history/<period>_<interval>.csv
+DATES_FILE = "dates.json"
+SPOT_FILE = "spot.json"
+CHAINS_DIR = "chains"
+HISTORY_DIR = "history"
+CHAIN_DATE_COLUMNS = ["lastTradeDate"]
+
+
+class RateLimitError(Exception):
+    """The data source refused a request because too many were made."""
+
+
+def is_rate_limited(error):
+    """
+    True if error means the source is throttling us: a RateLimitError,
+    yfinance's YFRateLimitError, or an HTTP 429 from the underlying session.
+    """
+    if isinstance(error, RateLimitError) or "RateLimit" in type(error).__name__:
+        return True
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429 or "Too Many Requests" in str(error)
+
+
+class DataProvider(ABC):
+    """
+    Interface for market-data sources. Subclasses must implement every
+    method, or they cannot be instantiated. Methods may raise on failure;
+    callers (the fetch and cache layer) decide how failures are reported.
+    """
+    name = "base"
+
+    @abstractmethod
+    def option_dates(self, ticker):
+        """Expiry dates as a tuple of 'YYYY-MM-DD' strings."""
+
+    @abstractmethod
+    def option_chain(self, ticker, expiry_date):
+        """(calls, puts) DataFrames for one expiry, with yfinance's columns."""
+
+    @abstractmethod
+    def spot(self, ticker):
+        """(price, source) for the underlying, or (None, None)."""
+
+    @abstractmethod
+    def history(self, ticker, period="1d", interval="1d"):
+        """OHLCV DataFrame indexed by timestamp; empty if there is no data."""
+
+
+def _valid_price(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) and value > 0 else None
+
+
+def _from_fast_info(stock):
+    return _valid_price(stock.fast_info.get("lastPrice"))
+
+
+def _from_history(stock):
+    history = stock.history(period="1d")
+    if history.empty:
+        return None
+    return _valid_price(history["Close"].iloc[-1])
+
+
+def _from_info(stock):
+    return _valid_price(stock.info.get("regularMarketPrice"))
+
+
+# Cheapest source first; .info is a full profile request and only a last resort.
+QUOTE_SOURCES = (
+    ("fast_info", _from_fast_info),
+    ("history", _from_history),
+    ("info", _from_info),
+)
+
+
+class YFinanceProvider(DataProvider):
+    """Live data from Yahoo Finance through yfinance."""
+    name = "yfinance"
+
+    def _ticker(self, ticker):
+        import yfinance as yf
+
+        return yf.Ticker(ticker)
+
+    def option_dates(self, ticker):
+        return tuple(self._ticker(ticker).options)
+
+    def option_chain(self, ticker, expiry_date):
+        option_chain = self._ticker(ticker).option_chain(str(expiry_date))
+        return option_chain.calls, option_chain.puts
+
+    def spot(self, ticker):
+        stock = self._ticker(ticker)
+        for source, getter in QUOTE_SOURCES:
+            try:
+                price = getter(stock)
+            except Exception as e:
+                # Falling back to the next source would only hit the limit again.
+                if is_rate_limited(e):
+                    raise
+                continue
+            if price is not None:
+                return price, source
+        return None, None
+
+    def history(self, ticker, period="1d", interval="1d"):
+        return self._ticker(ticker).history(period=period, interval=interval)
+
+
+class ReplayProvider(DataProvider):
+    """
+    Serves snapshots recorded by record_snapshot() from root.
+
+    Every call sleeps for latency seconds plus a uniform random extra of up
+    to jitter seconds (drawn from a generator seeded with seed, so a run is
+    reproducible), to mimic network round trips. With rate_limit set, calls
+    beyond rate_limit in any one-second window raise RateLimitError, like a
+    throttled source. Data that was not recorded raises FileNotFoundError,
+    like a failed download.
+    """
+    name = "replay"
+
+    def __init__(self, root, latency=0.0, jitter=0.0, seed=0, rate_limit=None):
+        self.root = root
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.rejected = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._recent = deque()
+
+    def _delay(self):
+        if self.rate_limit:
+            now = time.monotonic()
+            with self._lock:
+                while self._recent and now - self._recent[0] >= 1.0:
+                    self._recent.popleft()
+                if len(self._recent) >= self.rate_limit:
+                    self.rejected += 1
+                    raise RateLimitError("Too Many Requests. Rate limited. Try after a while.")
+                self._recent.append(now)
+        delay = self.latency
+        if self.jitter > 0:
+            with self._lock:
+                delay += self._rng.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _path(self, ticker, *parts):
+        return os.path.join(self.root, ticker, *parts)
+
+    def _read_json(self, path):
+        with open(path) as f:
+            return json.load(f)
+
+    def option_dates(self, ticker):
+        self._delay()
+        return tuple(self._read_json(self._path(ticker, DATES_FILE)))
+
+    def option_chain(self, ticker, expiry_date):
+        self._delay()
+        frames = []
+        for side in ("calls", "puts"):
+            path = self._path(ticker, CHAINS_DIR, f"{expiry_date}_{side}.csv")
+            frames.append(pd.read_csv(path, parse_dates=CHAIN_DATE_COLUMNS))
+        return frames[0], frames[1]
+
+    def spot(self, ticker):
+        self._delay()
+        try:
+            quote = self._read_json(self._path(ticker, SPOT_FILE))
+        except FileNotFoundError:
+            return None, None
+        return _valid_price(quote.get("price")), quote.get("source", self.name)
+
+    def history(self, ticker, period="1d", interval="1d"):
+        self._delay()
+        path = self._path(ticker, HISTORY_DIR, f"{period}_{interval}.csv")
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        return pd.read_csv(path, index_col=0, parse_dates=True)
+
+
+def record_snapshot(ticker, root, source=None, expiries=None, histories=(("1d", "1d"),)):
+    """
+    Records ticker's expiry list, spot and option chains from source (the
+    live yfinance provider by default) under root, in the layout
+    ReplayProvider reads.
+
+    Args:
+        ticker (str): Ticker to record.
+        root (str): Replay directory; created if missing.
+        source (DataProvider): Provider to record from.
+        expiries (list): Expiries to record; all listed ones by default.
+        histories (iterable): (period, interval) pairs of history to record.
+
+    Returns:
+        dict: Maps each expiry that failed to download to its exception.
+    """
+    source = source or YFinanceProvider()
+    chains_dir = os.path.join(root, ticker, CHAINS_DIR)
+    history_dir = os.path.join(root, ticker, HISTORY_DIR)
+    os.makedirs(chains_dir, exist_ok=True)
+    os.makedirs(history_dir, exist_ok=True)
+
+    dates = list(source.option_dates(ticker))
+    with open(os.path.join(root, ticker, DATES_FILE), "w") as f:
+        json.dump(dates, f)
+
+    price, quote_source = source.spot(ticker)
+    with open(os.path.join(root, ticker, SPOT_FILE), "w") as f:
+        json.dump({"price": price, "source": quote_source, "recorded": time.time()}, f)
+
+    errors = {}
+    for expiry in (dates if expiries is None else expiries):
+        try:
+            calls, puts = source.option_chain(ticker, expiry)
+        except Exception as e:
+            errors[expiry] = e
+            continue
+        calls.to_csv(os.path.join(chains_dir, f"{expiry}_calls.csv"), index=False)
+        puts.to_csv(os.path.join(chains_dir, f"{expiry}_puts.csv"), index=False)
+
+    for period, interval in histories:
+        data = source.history(ticker, period=period, interval=interval)
+        data.to_csv(os.path.join(history_dir, f"{period}_{interval}.csv"))
+    return errors
+
+
+def _provider_from_env():
+    root = os.environ.get("OPTIONS_REPLAY_DIR")
+    if not root:
+        return YFinanceProvider()
+    return ReplayProvider(
+        root,
+        latency=float(os.environ.get("OPTIONS_REPLAY_LATENCY", 0.0)),
+        jitter=float(os.environ.get("OPTIONS_REPLAY_JITTER", 0.0)),
+        rate_limit=float(os.environ.get("OPTIONS_REPLAY_RATE_LIMIT", 0.0)) or None,
+    )
+
+
+_provider = _provider_from_env()
+
+
+def get_provider():
+    """The provider all fetches currently go through."""
+    return _provider
+
+
+def set_provider(provider):
+    """
+    Routes all fetches through provider. Data already cached from the
+    previous provider is not cleared; invalidate chain_cache and quote_cache
+    when switching after startup.
+    """
+    global _provider
+    _provider = provider
@@ -0,0 +1,42 @@
+# utils/quotes.py
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.cache import TTLCache
+from utils.data_fetcher import DEFAULT_MAX_WORKERS
+from utils.providers import get_provider
+from utils.scheduler import scheduled
+from utils.timing import timed
+
+# Spot prices go stale quickly, so they get a short TTL and are never served stale.
+QUOTE_CACHE_TTL = 10.0
+
+quote_cache = TTLCache(ttl=QUOTE_CACHE_TTL, stale_ttl=0.0, max_entries=1024)
+
+
+@timed("quote")
+def get_spot(ticker):
+    """
+    Returns (price, source) for the underlying, where source names the quote
+    path that produced it (for yfinance: 'fast_info', 'history' or 'info').
+    Returns (None, None) when no source has a price. Prices are cached for
+    QUOTE_CACHE_TTL seconds; failed lookups are not cached.
+    """
+    key = ("spot", ticker)
+    cached = quote_cache.get_or_load(key, lambda: scheduled(get_provider().spot, ticker))
+    if cached[0] is None:
+        quote_cache.invalidate(key)
+    return cached
+
+
+def get_spots(tickers, max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Returns {ticker: (price, source)} for several tickers, looking up the
+    ones missing from the cache concurrently.
+    """
+    tickers = list(dict.fromkeys(tickers))
+    if not tickers:
+        return {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tickers)))) as executor:
+        futures = [executor.submit(contextvars.copy_context().run, get_spot, t) for t in tickers]
+        return dict(zip(tickers, (f.result() for f in futures)))
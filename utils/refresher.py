@@ -0,0 +1,220 @@
+# utils/refresher.py
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+from utils.data_fetcher import DEFAULT_MAX_WORKERS, refresh_option_chain, refresh_options_dates
+from utils.scheduler import BACKGROUND, fetch_priority
+
+logger = logging.getLogger("options_analyzer.refresher")
+
+DEFAULT_REFRESH_INTERVAL = 60.0
+# Tickers no session has asked for in this long stop being refreshed.
+DEFAULT_IDLE_TIMEOUT = 600.0
+
+DIFF_COLUMNS = ("lastPrice", "bid", "ask", "volume", "openInterest", "impliedVolatility")
+
+
+def diff_chains(old, new, columns=DIFF_COLUMNS):
+    """
+    Compares two option-chain DataFrames contract by contract.
+    Returns a dict with the number of 'added', 'removed' and 'changed' contracts.
+    """
+    if old is None or old.empty:
+        return {"added": 0 if new is None else len(new), "removed": 0, "changed": 0}
+    if new is None or new.empty:
+        return {"added": 0, "removed": len(old), "changed": 0}
+
+    old_idx = old.set_index("contractSymbol")
+    new_idx = new.set_index("contractSymbol")
+    common = new_idx.index.intersection(old_idx.index)
+    cols = [c for c in columns if c in old_idx.columns and c in new_idx.columns]
+    before = old_idx.loc[common, cols]
+    after = new_idx.loc[common, cols]
+    same = (before == after) | (before.isna() & after.isna())
+
+    return {
+        "added": int(new_idx.index.difference(old_idx.index).size),
+        "removed": int(old_idx.index.difference(new_idx.index).size),
+        "changed": int((~same).any(axis=1).sum()),
+    }
+
+
+def _refresh_in_background(ticker, expiry):
+    with fetch_priority(BACKGROUND):
+        return refresh_option_chain(ticker, expiry)
+
+
+class _Tracked:
+    __slots__ = ("interval", "next_due", "last_seen", "version", "last_diff", "last_error", "refreshed_at",
+                 "subscribers")
+
+    def __init__(self, interval, now):
+        self.interval = interval
+        self.next_due = now + interval
+        self.last_seen = now
+        self.version = 0
+        self.last_diff = None
+        self.last_error = None
+        self.refreshed_at = None
+        # subscriber -> (interval it asked for, when it last asked)
+        self.subscribers = {}
+
+    def update_interval(self, now, idle_timeout):
+        # The shortest interval any live subscriber asked for.
+        for subscriber, (_, seen) in list(self.subscribers.items()):
+            if now - seen > idle_timeout:
+                del self.subscribers[subscriber]
+        if not self.subscribers:
+            return
+        interval = min(interval for interval, _ in self.subscribers.values())
+        if interval != self.interval:
+            self.next_due = min(self.next_due, now + interval)
+            self.interval = interval
+
+
+class ChainRefresher:
+    """
+    Reloads the option chains of tracked tickers on a background thread.
+
+    Each refresh writes straight into the shared chain cache and compares the
+    new chain with the cached one. When anything changed, the ticker's version
+    is bumped, so sessions can poll version() cheaply and rerun only when
+    there is new data, instead of sleeping on the script thread.
+
+    Refresh downloads run at BACKGROUND fetch priority, so page loads are
+    served first when the fetch scheduler is saturated.
+    """
+
+    def __init__(self, default_interval=DEFAULT_REFRESH_INTERVAL, idle_timeout=DEFAULT_IDLE_TIMEOUT,
+                 max_workers=DEFAULT_MAX_WORKERS, tick=1.0):
+        self.default_interval = default_interval
+        self.idle_timeout = idle_timeout
+        self.max_workers = max_workers
+        self.tick = tick
+        self._tracked = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def track(self, ticker, interval=None, subscriber=None):
+        """
+        Registers ticker for refreshing and marks it as in use by subscriber
+        (e.g. a session id). The ticker is refreshed at the shortest interval
+        asked for by the subscribers that called track() within idle_timeout,
+        so one session cannot slow down another's refreshes.
+        """
+        interval = float(interval or self.default_interval)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._tracked.get(ticker)
+            if entry is None:
+                entry = self._tracked[ticker] = _Tracked(interval, now)
+            entry.last_seen = now
+            entry.subscribers[subscriber] = (interval, now)
+            entry.update_interval(now, self.idle_timeout)
+        self.start()
+
+    def untrack(self, ticker):
+        with self._lock:
+            self._tracked.pop(ticker, None)
+
+    def version(self, ticker):
+        """Number of refreshes that changed ticker's chain so far."""
+        with self._lock:
+            entry = self._tracked.get(ticker)
+            return 0 if entry is None else entry.version
+
+    def status(self, ticker):
+        """Interval, version, last refresh time, last diff and last error for ticker."""
+        with self._lock:
+            entry = self._tracked.get(ticker)
+            if entry is None:
+                return None
+            return {
+                "interval": entry.interval,
+                "version": entry.version,
+                "refreshed_at": entry.refreshed_at,
+                "last_diff": entry.last_diff,
+                "last_error": entry.last_error,
+            }
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="chain-refresher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def refresh(self, ticker):
+        """
+        Reloads every expiry of ticker now and returns the aggregated diff.
+        An expiry that fails to reload is logged and left out of the diff;
+        the error is raised only if every expiry failed.
+        """
+        with fetch_priority(BACKGROUND):
+            expiries = refresh_options_dates(ticker)
+        totals = {"added": 0, "removed": 0, "changed": 0}
+        if not expiries:
+            return totals
+        errors = []
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(expiries)))) as executor:
+            futures = {executor.submit(_refresh_in_background, ticker, exp): exp for exp in expiries}
+            for future in as_completed(futures):
+                try:
+                    previous, (calls, puts) = future.result()
+                except Exception as e:
+                    logger.warning("refresh of %s %s failed: %s", ticker, futures[future], e)
+                    errors.append(e)
+                    continue
+                old_calls, old_puts = previous if previous is not None else (None, None)
+                for old, new in ((old_calls, calls), (old_puts, puts)):
+                    for k, v in diff_chains(old, new).items():
+                        totals[k] += v
+        if len(errors) == len(expiries):
+            raise errors[0]
+        return totals
+
+    def _due_tickers(self):
+        now = time.monotonic()
+        due = []
+        with self._lock:
+            for ticker, entry in list(self._tracked.items()):
+                if now - entry.last_seen > self.idle_timeout:
+                    del self._tracked[ticker]
+                    continue
+                entry.update_interval(now, self.idle_timeout)
+                if entry.next_due <= now:
+                    entry.next_due = now + entry.interval
+                    due.append(ticker)
+        return due
+
+    def _run(self):
+        while not self._stop.wait(self.tick):
+            for ticker in self._due_tickers():
+                try:
+                    diff = self.refresh(ticker)
+                    error = None
+                except Exception as e:
+                    diff, error = None, e
+                with self._lock:
+                    entry = self._tracked.get(ticker)
+                    if entry is None:
+                        continue
+                    entry.last_error = error
+                    if diff is not None:
+                        entry.refreshed_at = pd.Timestamp.now()
+                        entry.last_diff = diff
+                        if any(diff.values()):
+                            entry.version += 1
+
+
+# Process-wide refresher shared by every Streamlit session.
+chain_refresher = ChainRefresher()
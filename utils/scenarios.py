@@ -0,0 +1,199 @@
+# utils/scenarios.py
+"""
+Exposure stress tests over a grid of spot shocks, IV shifts and days forward.
+
+scenario_grid re-prices every contract of a chain under each (spot, vol,
+time) scenario and reduces the Greeks to chain-wide net GEX, DEX and VEX,
+with the same conventions as exposures.exposure_totals. The whole grid is
+one broadcast array expression over (vols, days, spots, contracts),
+evaluated a block of contracts at a time so memory stays bounded however
+large the chain is.
+
+Under a scenario the underlying is S * (1 + shock), every IV moves by the
+same number of vol points and each contract has `days` fewer calendar days
+to expiry. Contracts without a positive IV are left out of every scenario,
+as they get NaN Greeks on the pages; contracts whose shifted IV or
+remaining time is not positive drop out of that scenario only.
+"""
+import math
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr
+
+from utils.cache import TTLCache
+from utils.exposures import CONTRACT_MULTIPLIER
+from utils.timing import timed
+
+DEFAULT_SPOT_SHOCKS = tuple(np.round(np.linspace(-0.10, 0.10, 50), 6).tolist())
+DEFAULT_IV_SHIFTS = tuple(np.round(np.linspace(-0.10, 0.10, 20), 6).tolist())
+DEFAULT_DAYS_FORWARD = (0, 1, 2, 5, 10)
+
+# Scenario x contract values evaluated per block; each temporary is 8 bytes
+# per element, so about 32 MB at this size.
+BLOCK_ELEMENTS = 4_000_000
+
+SCENARIO_VALUES = ("net_gex", "net_dex", "net_vex")
+
+# Grids computed by chain_scenarios. As in exposure_cache, keys include the
+# snapshot version, so entries never expire; old ones age out of the LRU.
+SCENARIO_CACHE_MAX_ENTRIES = 32
+scenario_cache = TTLCache(ttl=math.inf, stale_ttl=0.0, max_entries=SCENARIO_CACHE_MAX_ENTRIES)
+
+_SQRT_2PI = np.sqrt(2.0 * np.pi)
+
+
+def _contracts(calls, puts, t_calls, t_puts, iv_column):
+    # Strike, IV, time to expiry, call flag and open interest (times the
+    # contract multiplier) of every contract that can be priced at all.
+    # Contracts without a positive IV are dropped here, before any shift,
+    # so every scenario covers the same contracts as the unshifted one.
+    frames = (calls, puts)
+    strikes = np.concatenate([df["strike"].to_numpy(dtype=float) for df in frames])
+    sigma = np.concatenate([df[iv_column].to_numpy(dtype=float) for df in frames])
+    t = np.concatenate([
+        np.broadcast_to(np.asarray(t_calls, dtype=float), len(calls)),
+        np.broadcast_to(np.asarray(t_puts, dtype=float), len(puts)),
+    ])
+    is_call = np.r_[np.ones(len(calls), dtype=bool), np.zeros(len(puts), dtype=bool)]
+    oi = np.concatenate([df["openInterest"].to_numpy(dtype=float) for df in frames]) * CONTRACT_MULTIPLIER
+    keep = (np.isfinite(strikes) & (strikes > 0) & np.isfinite(sigma) & (sigma > 0) & np.isfinite(t)
+            & np.isfinite(oi) & (oi != 0))
+    return strikes[keep], sigma[keep], t[keep], is_call[keep], oi[keep]
+
+
+def _grid_block(log_spots, log_k, sigma, t, is_call, oi, iv_shifts, years_forward):
+    # Net gamma (still to be divided by spot), delta and vanna of one block
+    # of contracts, each of shape (vols, days, spots).
+    vol = sigma[None, None, :] + iv_shifts[:, None, None]          # (V, 1, n)
+    remaining = t[None, None, :] - years_forward[None, :, None]    # (1, T, n)
+    valid = (vol > 0) & (remaining > 0)                            # (V, T, n)
+    vol_sqrt_t = np.where(valid, vol * np.sqrt(np.maximum(remaining, 0.0)), 1.0)
+    weight = np.where(valid, oi, 0.0)
+
+    moneyness = log_spots[:, None] - log_k[None, :]                # (S, n)
+    d1 = moneyness[None, None] + (0.5 * vol_sqrt_t**2)[:, :, None, :]
+    d1 /= vol_sqrt_t[:, :, None, :]                                # (V, T, S, n)
+    pdf = np.exp(-0.5 * d1**2)
+    pdf /= _SQRT_2PI
+
+    # Each reduction over contracts is a batched matrix-vector product.
+    gamma_weight = np.where(is_call, weight, -weight) / vol_sqrt_t
+    gamma = np.matmul(pdf, gamma_weight[..., None])[..., 0]
+    # Put delta is N(d1) - 1.
+    delta = np.matmul(ndtr(d1), weight[..., None])[..., 0]
+    delta -= np.where(is_call, 0.0, weight).sum(axis=-1)[..., None]
+    # vanna = -vega * d2 / (S * vol * sqrt(t)) with vega per vol point, as
+    # in bs_greeks; S and sqrt(t) cancel.
+    vanna_weight = -0.01 * weight / np.where(valid, vol, 1.0)
+    d1 -= vol_sqrt_t[:, :, None, :]
+    d1 *= pdf
+    vanna = np.matmul(d1, vanna_weight[..., None])[..., 0]
+    return gamma, delta, vanna
+
+
+@timed("scenarios")
+def scenario_grid(calls, puts, S, t_calls, t_puts, spot_shocks=DEFAULT_SPOT_SHOCKS, iv_shifts=DEFAULT_IV_SHIFTS,
+                  days_forward=DEFAULT_DAYS_FORWARD, iv_column="impliedVolatility", block_elements=BLOCK_ELEMENTS):
+    """
+    Net GEX, DEX and VEX of a chain under every combination of spot shock,
+    IV shift and days forward.
+
+    At zero shock, zero shift and zero days the values equal exposure_totals
+    of the same chain run through add_exposures.
+
+    Args:
+        calls, puts (pd.DataFrame): Chain rows with 'strike', 'openInterest' and iv_column.
+        S (float): Current underlying price.
+        t_calls, t_puts: Time to expiry in years, scalar or per row.
+        spot_shocks: Relative spot moves, e.g. -0.05 for a 5% drop.
+        iv_shifts: Absolute IV moves, e.g. 0.02 for +2 vol points.
+        days_forward: Calendar days to roll every contract forward.
+        iv_column (str): Column holding the IVs to shift ('solved_iv' after
+            chain_exposures with solve_iv=True).
+        block_elements (int): Scenario x contract values evaluated at once.
+
+    Returns:
+        dict: 'spot_shocks', 'iv_shifts', 'days_forward' and 'spots' (the
+        shocked prices) as 1-D arrays, and 'net_gex', 'net_dex' and
+        'net_vex' arrays of shape (spots, IV shifts, days).
+    """
+    spot_shocks = np.asarray(spot_shocks, dtype=float)
+    iv_shifts = np.asarray(iv_shifts, dtype=float)
+    days_forward = np.asarray(days_forward, dtype=float)
+    if np.any(spot_shocks <= -1):
+        raise ValueError("spot shocks must be greater than -1 (a 100% drop)")
+    spots = S * (1.0 + spot_shocks)
+    log_spots = np.log(spots)
+    years_forward = days_forward / 365.0
+
+    strikes, sigma, t, is_call, oi = _contracts(calls, puts, t_calls, t_puts, iv_column)
+    log_k = np.log(strikes)
+    shape = (len(iv_shifts), len(days_forward), len(spots))
+    gamma, delta, vanna = np.zeros(shape), np.zeros(shape), np.zeros(shape)
+    step = max(1, block_elements // max(1, math.prod(shape)))
+    for start in range(0, len(strikes), step):
+        block = slice(start, start + step)
+        g, d, v = _grid_block(log_spots, log_k[block], sigma[block], t[block], is_call[block], oi[block],
+                              iv_shifts, years_forward)
+        gamma += g
+        delta += d
+        vanna += v
+
+    gamma /= spots
+    return {
+        "spot_shocks": spot_shocks,
+        "iv_shifts": iv_shifts,
+        "days_forward": days_forward,
+        "spots": spots,
+        # (vols, days, spots) -> (spots, vols, days)
+        "net_gex": np.ascontiguousarray(gamma.transpose(2, 0, 1)),
+        "net_dex": np.ascontiguousarray(delta.transpose(2, 0, 1)),
+        "net_vex": np.ascontiguousarray(vanna.transpose(2, 0, 1)),
+    }
+
+
+def chain_scenarios(ticker, version, expiry, calls, puts, S, t_calls, t_puts, spot_shocks=DEFAULT_SPOT_SHOCKS,
+                    iv_shifts=DEFAULT_IV_SHIFTS, days_forward=DEFAULT_DAYS_FORWARD, solve_iv=False):
+    """
+    scenario_grid for a page's chain selection, memoized in scenario_cache
+    per chain snapshot, expiry selection, spot, IV source and grid.
+
+    Args:
+        ticker, version, expiry: As in exposures.chain_exposures; version
+            None computes without caching.
+        calls, puts (pd.DataFrame): The filtered chain. With solve_iv they
+            must come from chain_exposures(..., solve_iv=True), whose
+            'solved_iv' column is shifted instead of Yahoo's IVs.
+        S, t_calls, t_puts, spot_shocks, iv_shifts, days_forward: See scenario_grid.
+
+    Returns:
+        dict: See scenario_grid. It is shared between pages and sessions
+        and must not be modified in place.
+    """
+    grid = tuple(tuple(float(x) for x in axis) for axis in (spot_shocks, iv_shifts, days_forward))
+    iv_column = "solved_iv" if solve_iv else "impliedVolatility"
+
+    def load():
+        return scenario_grid(calls, puts, S, t_calls, t_puts, *grid, iv_column=iv_column)
+
+    if version is None:
+        return load()
+    # Days forward are counted from today, so the grid turns over with the date.
+    key = (ticker, version, expiry, S, solve_iv, grid, datetime.today().date())
+    return scenario_cache.get_or_load(key, load)
+
+
+def scenario_frame(grid):
+    """The grid as a long table: one row per scenario, with its net exposures."""
+    spot_idx, vol_idx, day_idx = np.indices(grid["net_gex"].shape).reshape(3, -1)
+    frame = pd.DataFrame({
+        "spot_shock": grid["spot_shocks"][spot_idx],
+        "spot": grid["spots"][spot_idx],
+        "iv_shift": grid["iv_shifts"][vol_idx],
+        "days_forward": grid["days_forward"][day_idx],
+    })
+    for value in SCENARIO_VALUES:
+        frame[value] = grid[value].reshape(-1)
+    return frame
@@ -0,0 +1,299 @@
+# utils/scheduler.py
+"""
+Rate-limited scheduling of upstream fetches.
+
+Every provider call made by the fetch layer goes through fetch_scheduler,
+which spends one token per request from a token bucket refilled at `rate`
+requests per second (up to `burst` saved tokens). Waiting requests are
+served strictly by priority class, then in arrival order, so interactive
+page loads jump ahead of background refreshes.
+
+When the provider reports throttling, the whole scheduler pauses for a
+jittered, exponentially growing backoff (the limit is per client, so
+sending other requests would only extend it) and the request is retried
+ahead of newer ones in its class, up to max_retries times.
+
+Priorities follow the calling context: wrap background work in
+`with fetch_priority(BACKGROUND):`. Threads started by the fetch layer
+inherit their caller's priority.
+
+A caller that stops waiting (e.g. on a timeout) can withdraw its queued
+requests: requests made inside `with fetch_cancel_event(event):` leave the
+queue with FetchCancelled once FetchScheduler.cancel(event) is called,
+instead of spending a token and holding up the requests behind them.
+
+The limits come from the environment: OPTIONS_FETCH_RATE (requests per
+second, 0 for unlimited) and OPTIONS_FETCH_BURST. With a replay provider
+and no OPTIONS_FETCH_RATE, fetches are unlimited.
+"""
+import contextvars
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from utils.cache import LoadCancelled
+from utils.providers import is_rate_limited
+
+INTERACTIVE = 0
+BACKGROUND = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+DEFAULT_RATE = 4.0
+DEFAULT_BURST = 20
+DEFAULT_MAX_RETRIES = 4
+DEFAULT_BACKOFF = 2.0
+DEFAULT_MAX_BACKOFF = 60.0
+# Recent waits kept per priority class for the percentiles in stats().
+WAIT_SAMPLES = 512
+
+_priority = contextvars.ContextVar("fetch_priority", default=INTERACTIVE)
+_cancel_event = contextvars.ContextVar("fetch_cancel_event", default=None)
+
+
+class FetchCancelled(LoadCancelled):
+    """A queued request was withdrawn because its caller stopped waiting for it."""
+
+
+@contextmanager
+def fetch_priority(priority):
+    """Runs the enclosed fetches (and threads started for them) at priority."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority():
+    return _priority.get()
+
+
+@contextmanager
+def fetch_cancel_event(event):
+    """
+    Lets the enclosed fetches be withdrawn with FetchScheduler.cancel(event)
+    while they wait in the queue. Requests already sent are not interrupted.
+    """
+    token = _cancel_event.set(event)
+    try:
+        yield
+    finally:
+        _cancel_event.reset(token)
+
+
+class _ClassStats:
+    __slots__ = ("requests", "waiting", "wait_total", "wait_max", "waits")
+
+    def __init__(self):
+        self.requests = 0
+        self.waiting = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.waits = deque(maxlen=WAIT_SAMPLES)
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class FetchScheduler:
+    """
+    Token-bucket rate limiter with priority classes and throttling backoff.
+
+    Args:
+        rate (float): Requests per second; None or 0 means unlimited.
+        burst (int): Tokens the bucket holds, i.e. requests that may go out
+            back to back after an idle period.
+        max_retries (int): Retries of a throttled request before its error
+            is raised to the caller.
+        backoff (float): Pause in seconds after the first throttled request;
+            it doubles with every consecutive throttled response.
+        max_backoff (float): Upper bound of the pause.
+        seed: Seed for the backoff jitter.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST, max_retries=DEFAULT_MAX_RETRIES,
+                 backoff=DEFAULT_BACKOFF, max_backoff=DEFAULT_MAX_BACKOFF, seed=None):
+        self.rate = rate or None
+        self.burst = max(1, int(burst))
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._rng = random.Random(seed)
+        self._cond = threading.Condition()
+        self._queue = []
+        self._seq = itertools.count()
+        self._tokens = float(self.burst)
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        self._strikes = 0
+        self._classes = {p: _ClassStats() for p in PRIORITY_NAMES}
+        self.throttled = 0
+        self.retries = 0
+        self.gave_up = 0
+        self.cancelled = 0
+
+    def configure(self, rate=None, burst=None, max_retries=None, backoff=None, max_backoff=None):
+        """Updates the limits; pass rate=0 to remove the rate limit."""
+        with self._cond:
+            self._refill(time.monotonic())
+            if rate is not None:
+                self.rate = rate or None
+            if burst is not None:
+                self.burst = max(1, int(burst))
+                self._tokens = min(self._tokens, self.burst)
+            if max_retries is not None:
+                self.max_retries = max_retries
+            if backoff is not None:
+                self.backoff = backoff
+            if max_backoff is not None:
+                self.max_backoff = max_backoff
+            self._cond.notify_all()
+
+    def call(self, fn, *args, **kwargs):
+        """
+        Calls fn(*args, **kwargs) once a token is free and no request of a
+        higher priority is waiting, retrying it with backoff while the
+        provider reports throttling. Other errors are raised at once.
+        Raises FetchCancelled if the request is withdrawn while waiting.
+        """
+        priority = current_priority()
+        ticket = [priority, next(self._seq)]
+        event = _cancel_event.get()
+        for attempt in itertools.count():
+            self._acquire(ticket, event)
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                if not is_rate_limited(e) or not self._throttled(attempt):
+                    raise
+                continue
+            with self._cond:
+                self._strikes = 0
+            return result
+
+    def _refill(self, now):
+        if self.rate is None:
+            self._tokens = float(self.burst)
+        else:
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def cancel(self, *events):
+        """Sets events, withdrawing the waiting requests made under fetch_cancel_event() with them."""
+        with self._cond:
+            for event in events:
+                event.set()
+            self._cond.notify_all()
+
+    def _acquire(self, ticket, event=None):
+        # Blocks until ticket is at the head of the queue and a token is
+        # free, or raises FetchCancelled once event is set.
+        stats = self._classes[ticket[0]]
+        start = time.monotonic()
+        with self._cond:
+            heapq.heappush(self._queue, ticket)
+            stats.waiting += 1
+            try:
+                while True:
+                    if event is not None and event.is_set():
+                        self.cancelled += 1
+                        raise FetchCancelled("the caller stopped waiting for this request")
+                    now = time.monotonic()
+                    self._refill(now)
+                    if self._queue[0] is ticket and now >= self._paused_until and self._tokens >= 1:
+                        break
+                    if self._queue[0] is not ticket:
+                        timeout = None
+                    elif now < self._paused_until:
+                        timeout = self._paused_until - now
+                    else:
+                        timeout = (1 - self._tokens) / self.rate
+                    self._cond.wait(timeout)
+                heapq.heappop(self._queue)
+                self._tokens -= 1
+            except BaseException:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+                raise
+            finally:
+                stats.waiting -= 1
+                self._cond.notify_all()
+
+            waited = time.monotonic() - start
+            stats.requests += 1
+            stats.wait_total += waited
+            stats.wait_max = max(stats.wait_max, waited)
+            stats.waits.append(waited)
+
+    def _throttled(self, attempt):
+        # Pauses every request for a jittered backoff; False once the
+        # request has used up its retries.
+        with self._cond:
+            self.throttled += 1
+            if attempt >= self.max_retries:
+                self.gave_up += 1
+                return False
+            self.retries += 1
+            self._strikes += 1
+            delay = min(self.max_backoff, self.backoff * 2 ** (self._strikes - 1))
+            delay *= self._rng.uniform(0.5, 1.5)
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            # Whatever was saved up is spent; restart from an empty bucket.
+            self._tokens = 0.0
+            self._cond.notify_all()
+            return True
+
+    def stats(self):
+        """Limits, pause state, throttling and cancellation counters and per-priority queue and wait metrics."""
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            classes = {}
+            for priority, s in self._classes.items():
+                waits = list(s.waits)
+                classes[PRIORITY_NAMES[priority]] = {
+                    "requests": s.requests,
+                    "queued": s.waiting,
+                    "wait_avg_s": s.wait_total / s.requests if s.requests else 0.0,
+                    "wait_p95_s": _percentile(waits, 0.95),
+                    "wait_max_s": s.wait_max,
+                }
+            return {
+                # None when unlimited: infinity has no JSON encoding.
+                "rate": self.rate,
+                "burst": self.burst,
+                "tokens": self._tokens,
+                "queued": len(self._queue),
+                "paused_s": max(0.0, self._paused_until - now),
+                "throttled": self.throttled,
+                "retries": self.retries,
+                "gave_up": self.gave_up,
+                "cancelled": self.cancelled,
+                "classes": classes,
+            }
+
+
+def _scheduler_from_env():
+    rate = os.environ.get("OPTIONS_FETCH_RATE")
+    if rate is None:
+        # Replayed data has no upstream limit to respect.
+        rate = 0.0 if os.environ.get("OPTIONS_REPLAY_DIR") else DEFAULT_RATE
+    return FetchScheduler(rate=float(rate), burst=int(os.environ.get("OPTIONS_FETCH_BURST", DEFAULT_BURST)))
+
+
+# Process-wide scheduler shared by every fetch, session and background refresh.
+fetch_scheduler = _scheduler_from_env()
+
+
+def scheduled(fn, *args, **kwargs):
+    """fn(*args, **kwargs) run through fetch_scheduler at the caller's priority."""
+    return fetch_scheduler.call(fn, *args, **kwargs)
@@ -0,0 +1,373 @@
+# utils/store.py
+"""
+Append-only local history of fetched option chains and their exposures.
+
+Once open_store() is called, every chain the fetch layer downloads (page
+loads, background refreshes, scans) is queued and written by a background
+thread, so fetching never waits on disk. The writer batches what arrives
+within flush_interval seconds, computes the batch's per-contract exposures
+from the current spot, and writes one Parquet file per ticker, day and kind:
+
+    <root>/<TICKER>/<YYYY-MM-DD>/chain-<HHMMSSffffff>-<pid>-<n>.parquet
+    <root>/<TICKER>/<YYYY-MM-DD>/exposures-<HHMMSSffffff>-<pid>-<n>.parquet
+    <root>/index.sqlite
+
+Files are never modified once written. Every row carries the time its chain
+was fetched ('captured_at') and its 'expiry'. index.sqlite records each
+file's ticker, kind, time span and expiries, so time-range and expiry
+queries only open the files they need; reindex() rebuilds it from the files.
+
+Writing Parquet needs pyarrow. OPTIONS_STORE_DIR opens a store in the app.
+"""
+import itertools
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from utils.data_fetcher import add_chain_listener, remove_chain_listener
+from utils.scheduler import BACKGROUND, fetch_priority
+
+logger = logging.getLogger("options_analyzer.store")
+
+STORE_KINDS = ("chain", "exposures")
+INDEX_FILE = "index.sqlite"
+# Seconds the writer waits for more chains before writing a batch; a
+# refresh of every expiry of a ticker usually lands in one file.
+DEFAULT_FLUSH_INTERVAL = 2.0
+# Chains waiting to be written; beyond this, new ones are dropped (and
+# counted) rather than making fetches wait.
+DEFAULT_MAX_PENDING = 4096
+
+EXPOSURE_COLUMNS = ["captured_at", "expiry", "contractSymbol", "type", "strike", "spot", "t",
+                    "openInterest", "impliedVolatility", "calc_delta", "calc_gamma", "calc_vanna",
+                    "DEX", "GEX", "VEX"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS partitions (
+    path TEXT PRIMARY KEY, ticker TEXT NOT NULL, day TEXT NOT NULL, kind TEXT NOT NULL,
+    first_ns INTEGER NOT NULL, last_ns INTEGER NOT NULL, rows INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS partition_expiries (
+    path TEXT NOT NULL, expiry TEXT NOT NULL, PRIMARY KEY (path, expiry)
+);
+CREATE INDEX IF NOT EXISTS partitions_by_time ON partitions (ticker, kind, first_ns, last_ns);
+CREATE INDEX IF NOT EXISTS expiries_by_date ON partition_expiries (expiry, path);
+"""
+
+
+def _require_parquet():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError("The snapshot store writes Parquet and needs pyarrow; install it to enable the store")
+
+
+def _ns(value):
+    return None if value is None else pd.Timestamp(value).value
+
+
+class SnapshotStore:
+    """
+    Append-only, partitioned Parquet store of chains and exposures.
+
+    Args:
+        root (str): Store directory; created if missing.
+        flush_interval (float): Seconds to collect chains into one batch.
+        max_pending (int): Queued chains beyond which new ones are dropped.
+        exposures (bool): Also compute and store per-contract exposures.
+    """
+
+    def __init__(self, root, flush_interval=DEFAULT_FLUSH_INTERVAL, max_pending=DEFAULT_MAX_PENDING,
+                 exposures=True):
+        _require_parquet()
+        self.root = root
+        self.flush_interval = flush_interval
+        self.exposures = exposures
+        os.makedirs(root, exist_ok=True)
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.files_written = 0
+        self.rows_written = 0
+        self.dropped = 0
+        self.errors = 0
+        self.last_error = None
+        with self._connect() as db:
+            db.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # WAL lets queries read the index while the writer appends to it.
+        db = sqlite3.connect(os.path.join(self.root, INDEX_FILE), timeout=30)
+        try:
+            db.execute("PRAGMA journal_mode=WAL")
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    # -- writing ---------------------------------------------------------
+
+    def record_chain(self, ticker, expiry, calls, puts, captured_at=None):
+        """
+        Queues one fetched expiry for writing and returns at once. The
+        frames are only read. Returns False if the queue was full and the
+        chain was dropped.
+        """
+        captured_at = pd.Timestamp.now() if captured_at is None else pd.Timestamp(captured_at)
+        try:
+            self._queue.put_nowait((ticker, str(expiry), calls, puts, captured_at))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        self._start()
+        return True
+
+    def flush(self, timeout=None):
+        """Waits until everything queued so far is written; False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="snapshot-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        # Spot lookups for the exposures must not hold up page loads.
+        with fetch_priority(BACKGROUND):
+            while True:
+                batch = [self._queue.get()]
+                deadline = time.monotonic() + self.flush_interval
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(self._queue.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+                try:
+                    self._write_batch(batch)
+                except Exception as e:
+                    logger.exception("could not write %d chains to %s", len(batch), self.root)
+                    with self._lock:
+                        self.errors += 1
+                        self.last_error = e
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+
+    def _write_batch(self, batch):
+        groups = {}
+        for ticker, expiry, calls, puts, captured_at in batch:
+            groups.setdefault((ticker, captured_at.strftime("%Y-%m-%d")), []).append(
+                (expiry, calls, puts, captured_at))
+        for (ticker, day), records in groups.items():
+            chain = pd.concat([_chain_rows(*record) for record in records], ignore_index=True)
+            self._append(ticker, day, "chain", chain)
+            if self.exposures:
+                exposures = _exposure_rows(ticker, day, chain)
+                if exposures is not None:
+                    self._append(ticker, day, "exposures", exposures)
+
+    def _append(self, ticker, day, kind, frame):
+        if frame.empty:
+            return
+        first, last = frame["captured_at"].min(), frame["captured_at"].max()
+        directory = os.path.join(self.root, ticker, day)
+        os.makedirs(directory, exist_ok=True)
+        name = f"{kind}-{first:%H%M%S%f}-{os.getpid()}-{next(self._seq)}.parquet"
+        path = os.path.join(directory, name)
+        # Write under a temporary name so readers never see a partial file.
+        frame.to_parquet(path + ".tmp", index=False)
+        os.replace(path + ".tmp", path)
+        self._index(os.path.relpath(path, self.root), ticker, day, kind, first, last, len(frame),
+                    frame["expiry"].unique())
+        with self._lock:
+            self.files_written += 1
+            self.rows_written += len(frame)
+
+    def _index(self, path, ticker, day, kind, first, last, rows, expiries):
+        with self._connect() as db:
+            db.execute("INSERT OR REPLACE INTO partitions VALUES (?, ?, ?, ?, ?, ?, ?)",
+                       (path, ticker, day, kind, _ns(first), _ns(last), int(rows)))
+            db.executemany("INSERT OR IGNORE INTO partition_expiries VALUES (?, ?)",
+                           [(path, str(e)) for e in expiries])
+
+    def reindex(self):
+        """Rebuilds index.sqlite from the Parquet files; returns the number indexed."""
+        with self._connect() as db:
+            db.execute("DELETE FROM partitions")
+            db.execute("DELETE FROM partition_expiries")
+        count = 0
+        for directory, _, names in os.walk(self.root):
+            for name in sorted(names):
+                kind = name.split("-", 1)[0]
+                if not name.endswith(".parquet") or kind not in STORE_KINDS:
+                    continue
+                path = os.path.join(directory, name)
+                ticker, day = os.path.relpath(directory, self.root).split(os.sep)[-2:]
+                frame = pd.read_parquet(path, columns=["captured_at", "expiry"])
+                self._index(os.path.relpath(path, self.root), ticker, day, kind, frame["captured_at"].min(),
+                            frame["captured_at"].max(), len(frame), frame["expiry"].unique())
+                count += 1
+        return count
+
+    # -- reading ---------------------------------------------------------
+
+    def partitions(self, ticker, kind="chain", start=None, end=None, expiries=None):
+        """Paths of the files holding ticker's kind rows captured in [start, end] for any of expiries."""
+        if kind not in STORE_KINDS:
+            raise ValueError(f"kind must be one of {STORE_KINDS}")
+        sql = "SELECT path FROM partitions WHERE ticker = ? AND kind = ?"
+        params = [ticker, kind]
+        if start is not None:
+            sql += " AND last_ns >= ?"
+            params.append(_ns(start))
+        if end is not None:
+            sql += " AND first_ns <= ?"
+            params.append(_ns(end))
+        if expiries is not None:
+            expiries = [str(e) for e in expiries]
+            sql += (" AND path IN (SELECT path FROM partition_expiries WHERE expiry IN (%s))"
+                    % ",".join("?" * len(expiries)))
+            params.extend(expiries)
+        with self._connect() as db:
+            rows = db.execute(sql + " ORDER BY first_ns", params).fetchall()
+        return [os.path.join(self.root, path) for (path,) in rows]
+
+    def read(self, ticker, kind="chain", start=None, end=None, expiries=None, columns=None):
+        """
+        Rows of ticker's stored chains (kind 'chain') or exposures (kind
+        'exposures') captured between start and end (inclusive, either
+        open), optionally only for some expiries ('YYYY-MM-DD').
+
+        Returns:
+            pd.DataFrame: Rows in capture order; empty if nothing matches.
+        """
+        if columns is not None:
+            columns = list(dict.fromkeys(["captured_at", "expiry", *columns]))
+        frames = [pd.read_parquet(path, columns=columns)
+                  for path in self.partitions(ticker, kind, start, end, expiries)]
+        if not frames:
+            return pd.DataFrame(columns=columns or ["captured_at", "expiry"])
+        frame = pd.concat(frames, ignore_index=True)
+        mask = np.ones(len(frame), dtype=bool)
+        if start is not None:
+            mask &= (frame["captured_at"] >= pd.Timestamp(start)).to_numpy()
+        if end is not None:
+            mask &= (frame["captured_at"] <= pd.Timestamp(end)).to_numpy()
+        if expiries is not None:
+            mask &= frame["expiry"].isin([str(e) for e in expiries]).to_numpy()
+        return frame[mask].reset_index(drop=True)
+
+    def exposure_history(self, ticker, start=None, end=None, expiries=None):
+        """
+        Chain-wide exposure totals over time, with the same signs as
+        exposures.exposure_totals. Expiries are fetched separately, so each
+        row sums the latest stored exposures of every expiry as of one
+        capture: one row per captured_at with spot, call_gex, put_gex,
+        net_gex, net_dex and net_vex.
+        """
+        frame = self.read(ticker, "exposures", start, end, expiries,
+                          columns=["type", "spot", "DEX", "GEX", "VEX"])
+        columns = ["captured_at", "spot", "call_gex", "put_gex", "net_gex", "net_dex", "net_vex"]
+        if frame.empty:
+            return pd.DataFrame(columns=columns)
+        is_call = (frame["type"].astype(str) == "Call").to_numpy()
+        frame = frame.assign(call_gex=np.where(is_call, frame["GEX"], 0.0),
+                             put_gex=np.where(is_call, 0.0, frame["GEX"]))
+        per_expiry = frame.groupby(["captured_at", "expiry"], sort=True).agg(
+            spot=("spot", "last"), call_gex=("call_gex", "sum"), put_gex=("put_gex", "sum"),
+            net_dex=("DEX", "sum"), net_vex=("VEX", "sum"))
+        history = pd.DataFrame({"spot": per_expiry["spot"].groupby(level="captured_at").last()})
+        for column in ("call_gex", "put_gex", "net_dex", "net_vex"):
+            history[column] = per_expiry[column].unstack("expiry").ffill().sum(axis=1)
+        history["net_gex"] = history["call_gex"] - history["put_gex"]
+        return history.reset_index()[columns]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "pending": self._queue.qsize(),
+                "files_written": self.files_written,
+                "rows_written": self.rows_written,
+                "dropped": self.dropped,
+                "errors": self.errors,
+            }
+
+
+def _chain_rows(expiry, calls, puts, captured_at):
+    frame = pd.concat([calls.assign(type="Call"), puts.assign(type="Put")], ignore_index=True)
+    frame.insert(0, "expiry", expiry)
+    frame.insert(0, "captured_at", captured_at)
+    return frame
+
+
+def _exposure_rows(ticker, day, chain):
+    # Imported here: quotes imports the fetch layer this module hooks into.
+    from utils.exposures import chain_exposures, years_to_expiry
+    from utils.quotes import get_spot
+
+    S, _ = get_spot(ticker)
+    if S is None:
+        return None
+    # Time to expiry as of the capture date, as the pages compute it.
+    t = years_to_expiry(chain["expiry"], today=day)
+    is_call = (chain["type"] == "Call").to_numpy()
+    calls, puts = chain_exposures(ticker, None, None, chain[is_call], chain[~is_call], S, t[is_call], t[~is_call])
+    exposures = pd.concat([calls, puts], ignore_index=True)
+    exposures["spot"] = np.float32(S)
+    return exposures[[c for c in EXPOSURE_COLUMNS if c in exposures.columns]]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def open_store(root=None, **kwargs):
+    """
+    Starts recording every fetched chain into root (OPTIONS_STORE_DIR by
+    default) and returns the store; returns None when no directory is
+    configured. Calling it again returns the store already open.
+    """
+    global _store
+    root = root or os.environ.get("OPTIONS_STORE_DIR")
+    with _store_lock:
+        if _store is None and root:
+            _store = SnapshotStore(root, **kwargs)
+            add_chain_listener(_store.record_chain)
+        return _store
+
+
+def close_store(timeout=None):
+    """Stops recording, after writing what is queued. Returns False if that timed out."""
+    global _store
+    with _store_lock:
+        store, _store = _store, None
+    if store is None:
+        return True
+    remove_chain_listener(store.record_chain)
+    return store.flush(timeout)
+
+
+def get_store():
+    """The open store, or None."""
+    return _store
@@ -0,0 +1,269 @@
+# utils/timing.py
+"""
+Lightweight per-stage timing spans.
+
+Spans are recorded per script run (per thread) only while profiling is
+enabled for that run; when it is off, span() and @timed cost one attribute
+lookup. Each span records wall time, row count and, optionally, the peak
+traced memory allocated inside it.
+
+tracemalloc is process-wide: it is started when the first memory-tracking
+run begins and stopped when the last one ends, so it costs nothing while no
+session asks for it. Its peak is process-wide too, so a span's peak is only
+reported (otherwise None) if no other memory-tracking run started or was
+active while it ran; allocations made by other, untracked threads in that
+time still count.
+"""
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+import weakref
+
+import pandas as pd
+
+logger = logging.getLogger("options_analyzer.timing")
+
+# JSON-lines file every finished run is appended to, if set.
+METRICS_FILE = os.environ.get("OPTIONS_METRICS_FILE")
+
+class _State(threading.local):
+    # Class-level default, so lookups on threads without a run stay cheap.
+    run = None
+
+
+_state = _State()
+
+
+def _current():
+    return _state.run
+
+
+# Memory-tracking runs in progress, across threads. _memory_epoch counts the
+# runs ever started, so a span can tell whether another one overlapped it.
+_memory_lock = threading.Lock()
+_memory_runs = 0
+_memory_epoch = 0
+_owns_tracing = False
+
+
+def _begin_memory_tracking():
+    global _memory_runs, _memory_epoch, _owns_tracing
+    with _memory_lock:
+        _memory_runs += 1
+        _memory_epoch += 1
+        if _memory_runs == 1 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _owns_tracing = True
+
+
+def _end_memory_tracking():
+    global _memory_runs, _owns_tracing
+    with _memory_lock:
+        _memory_runs -= 1
+        # Leave tracing alone if someone else (e.g. PYTHONTRACEMALLOC) started it.
+        if _memory_runs == 0 and _owns_tracing:
+            tracemalloc.stop()
+            _owns_tracing = False
+
+
+def _sole_memory_run():
+    # The epoch if exactly one memory-tracking run is active, else None.
+    with _memory_lock:
+        return _memory_epoch if _memory_runs == 1 else None
+
+
+class _Run:
+    def __init__(self, label, track_memory):
+        self.label = label
+        self.track_memory = track_memory
+        self.spans = []
+        self.stack = []
+        self.started = time.time()
+        self.t0 = time.perf_counter()
+        if track_memory:
+            _begin_memory_tracking()
+            # Also released if the run is dropped without finish_run(), e.g.
+            # when the script stops early and the next run replaces it.
+            self.release = weakref.finalize(self, _end_memory_tracking)
+
+
+def start_run(label="", enabled=True, track_memory=False):
+    """
+    Starts collecting spans for the current thread's script run, discarding
+    the previous run's spans. With enabled=False nothing is recorded.
+    With track_memory, tracemalloc runs until this run's finish_run().
+    """
+    _discard(_state.run)
+    _state.run = None
+    if enabled:
+        _state.run = _Run(label, track_memory)
+
+
+def _discard(run):
+    if run is not None and run.track_memory:
+        run.release()
+
+
+def is_enabled():
+    return _current() is not None
+
+
+class _Span:
+    __slots__ = ("run", "record", "start", "mem_start", "child_peak", "epoch")
+
+    def __init__(self, run, name, rows, attrs):
+        self.run = run
+        self.record = {"stage": name, "rows": rows, "depth": len(run.stack)}
+        self.record.update(attrs)
+        self.child_peak = 0
+
+    def __enter__(self):
+        self.run.stack.append(self)
+        if self.run.track_memory:
+            # Resetting the peak would spoil another run's spans, so only
+            # the sole memory-tracking run measures.
+            self.epoch = _sole_memory_run()
+            if self.epoch is not None:
+                self.mem_start = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+        self.start = time.perf_counter()
+        self.record["start_ms"] = (self.start - self.run.t0) * 1000.0
+        return self.record
+
+    def __exit__(self, exc_type, exc, tb):
+        self.record["wall_ms"] = (time.perf_counter() - self.start) * 1000.0
+        self.run.stack.pop()
+        if self.run.track_memory:
+            if self.epoch is None or _sole_memory_run() != self.epoch:
+                # Another memory-tracking run overlapped this span.
+                self.record["peak_mem_kb"] = None
+            else:
+                # reset_peak() in nested spans hides their peaks from us, so
+                # children report theirs upwards.
+                peak = max(tracemalloc.get_traced_memory()[1], self.child_peak)
+                self.record["peak_mem_kb"] = max(0, peak - self.mem_start) / 1024.0
+                if self.run.stack:
+                    parent = self.run.stack[-1]
+                    parent.child_peak = max(parent.child_peak, peak)
+        if exc_type is not None:
+            self.record["error"] = exc_type.__name__
+        self.run.spans.append(self.record)
+        return False
+
+
+class _NullSpan:
+    def __enter__(self):
+        return {}
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name, rows=None, **attrs):
+    """
+    Context manager timing one stage. The yielded dict can be updated inside
+    the block, e.g. to set 'rows' once they are known.
+    """
+    run = _current()
+    if run is None:
+        return _NULL_SPAN
+    return _Span(run, name, rows, attrs)
+
+
+def _count_rows(args):
+    rows = [len(a) for a in args if isinstance(a, (pd.DataFrame, pd.Series))]
+    return sum(rows) if rows else None
+
+
+def timed(stage):
+    """
+    Decorator recording each call as a span named '<stage>:<function>', with
+    the total length of its DataFrame/Series arguments as the row count.
+    """
+    def decorator(fn):
+        name = f"{stage}:{fn.__name__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            run = _current()
+            if run is None:
+                return fn(*args, **kwargs)
+            with _Span(run, name, _count_rows(args), {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def finish_run():
+    """
+    Ends the current run and returns its spans (in completion order; use
+    'start_ms' to order them by start).
+    Spans are also logged at DEBUG level and appended to METRICS_FILE.
+    """
+    run = _current()
+    if run is None:
+        return []
+    _state.run = None
+    _discard(run)
+    export_spans(run.spans, run.label, run.started)
+    return run.spans
+
+
+def export_spans(spans, label="", started=None, path=None):
+    """Writes one JSON line per span to the log and, if set, the metrics file."""
+    path = path or METRICS_FILE
+    started = started or time.time()
+    lines = [json.dumps({"run": label, "run_started": started, **s}, default=str) for s in spans]
+    for line in lines:
+        logger.debug(line)
+    if path and lines:
+        with open(path, "a") as f:
+            f.write("\n".join(lines) + "\n")
+
+
+def spans_frame(spans):
+    """Spans as a DataFrame, in start order with stage names indented by depth."""
+    if not spans:
+        return pd.DataFrame(columns=["stage", "rows", "wall_ms", "peak_mem_kb"])
+    frame = pd.DataFrame(spans).sort_values("start_ms", kind="stable")
+    frame["stage"] = [("  " * d) + s for d, s in zip(frame["depth"], frame["stage"])]
+    return frame.drop(columns=["depth"])
+
+
+def render_debug_panel(spans):
+    """Sidebar expander listing this run's spans, with a JSON download."""
+    import streamlit as st
+
+    with st.sidebar.expander("Debug: stage timings", expanded=False):
+        if not spans:
+            st.write("Enable profiling to record stage timings.")
+            return
+        frame = spans_frame(spans)
+        top_level = [s for s in spans if s["depth"] == 0]
+        st.write(f"**Total (top-level stages):** {sum(s['wall_ms'] for s in top_level):.1f} ms")
+        st.dataframe(frame)
+        st.download_button(
+            "Download spans (JSON)",
+            data=json.dumps(spans, default=str, indent=2),
+            file_name="stage_timings.json",
+            mime="application/json",
+        )
+
+
+def render_chart(fig, **kwargs):
+    """
+    st.plotly_chart wrapped in a 'render' span. This measures serializing
+    and sending the figure; the browser's own drawing time is not visible
+    from the server.
+    """
+    import streamlit as st
+
+    with span("render:plotly_chart", key=kwargs.get("key")):
+        return st.plotly_chart(fig, **kwargs)
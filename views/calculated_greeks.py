@@ -0,0 +1,73 @@
+# views/calculated_greeks.py
+from datetime import datetime
+
+import plotly.express as px
+import streamlit as st
+
+from utils.data_fetcher import format_ticker
+from utils.exposures import chain_exposures
+from utils.quotes import get_spot
+from utils.timing import render_chart
+from views.common import fetch_chain
+
+
+def render(solve_iv=False):
+    """
+    Calculated Greeks page: per-contract delta, gamma and vanna for one expiry.
+    Returns the ticker shown, so the caller can keep it refreshed.
+    """
+    st.write("This page calculates delta, gamma, and vanna based on market data.")
+    
+    user_ticker = st.text_input("Enter Stock Ticker (e.g., AAPL, TSLA):", "AAPL", key="greek_ticker")
+    ticker = format_ticker(user_ticker)
+    
+    if ticker:
+        chain, data_version = fetch_chain(ticker)
+        if chain.empty:
+            st.warning("No options data available for this ticker.")
+        else:
+            unique_exps = chain.expiries
+            if not unique_exps:
+                st.error("No expiration dates could be extracted from contract symbols.")
+            else:
+                unique_exps_str = [d.strftime("%Y-%m-%d") for d in unique_exps]
+                expiry_date_str = st.selectbox("Select an Expiry Date (extracted from contract symbols):", options=unique_exps_str, key="greek_expiry")
+                selected_expiry = datetime.strptime(expiry_date_str, "%Y-%m-%d").date()
+                calls, puts = chain.select(selected_expiry)
+                
+                S, spot_source = get_spot(ticker)
+                if S is None:
+                    st.error("Could not fetch underlying price.")
+                else:
+                    S = round(S, 2)
+                    st.markdown(f"**Underlying Price (S):** {S} (source: {spot_source})")
+                    today = datetime.today().date()
+                    t_days = (selected_expiry - today).days
+                    if t_days <= 0:
+                        st.error("The selected expiration date is in the past!")
+                    else:
+                        t = t_days / 365.0
+                        st.markdown(f"**Time to Expiration (t in years):** {t:.4f}")
+                        
+                        # Same shared table the exposure pages read for this expiry
+                        calls, puts = chain_exposures(ticker, data_version, expiry_date_str, calls, puts,
+                                                      S, t, t, solve_iv=solve_iv)
+                        results = {}
+                        if not calls.empty:
+                            results["Calls"] = calls
+                        else:
+                            st.warning("No call options data available.")
+                        if not puts.empty:
+                            results["Puts"] = puts
+                        else:
+                            st.warning("No put options data available.")
+                        
+                        for typ, df in results.items():
+                            st.write(f"### {typ} with Calculated Greeks")
+                            iv_cols = ['impliedVolatility', 'solved_iv', 'iv_converged'] if solve_iv else ['impliedVolatility']
+                            st.dataframe(df[['contractSymbol', 'strike'] + iv_cols + ['calc_delta', 'calc_gamma', 'calc_vanna']])
+                            fig = px.scatter(df, x="strike", y="calc_delta", title=f"{typ}: Delta vs. Strike",
+                                             labels={"strike": "Strike", "calc_delta": "Calculated Delta"})
+                            render_chart(fig, use_container_width=True)
+
+    return ticker
@@ -0,0 +1,42 @@
+# views/common.py
+# Helpers shared by the page modules in views/. Those only the Greek
+# exposure pages need live in views/exposure_common.py, so the other pages
+# do not import scipy.
+import streamlit as st
+
+from utils.data_fetcher import load_option_chain, snapshot_version, DEFAULT_MAX_WORKERS, DEFAULT_EXPIRY_TIMEOUT
+
+def fetch_chain(ticker, max_workers=DEFAULT_MAX_WORKERS, timeout=DEFAULT_EXPIRY_TIMEOUT):
+    """
+    Fetches option chains for all available expirations for the given ticker.
+    Expiry lists and chains are served from the shared chain cache, so reruns
+    and page switches for the same ticker do not hit the network.
+    Expirations in ticker.options are downloaded concurrently, at most
+    max_workers at a time, waiting up to timeout seconds for each expiry.
+    If ticker.options is empty (as for SPX), a fallback expiry is used.
+    Returns the OptionChain, whose expiries are indexed once when it is
+    assembled: chain.expiries lists them (as datetime.date) and
+    chain.select(expiry) slices one out without scanning the chain.
+    Also returns the version of the cached snapshot the chain came from,
+    for keying cached figures.
+    """
+    # Read the version first: if a refresh lands mid-load, the figures are
+    # keyed to the older version and simply rebuilt on the next rerun.
+    data_version = snapshot_version(ticker)
+    chain, errors = load_option_chain(ticker, max_workers=max_workers, timeout=timeout)
+    if data_version is None:
+        data_version = snapshot_version(ticker)
+    if errors:
+        details = "; ".join(f"{exp}: {e}" for exp, e in errors.items())
+        st.error(f"Could not fetch options data for {len(errors)} expiries of {ticker} ({details})")
+    return chain, data_version
+
+def large_chart_threshold():
+    """
+    Sidebar input for the point count above which charts switch to
+    large-chart mode (binned strikes, WebGL markers).
+    """
+    from utils.option_charts import LARGE_CHART_POINTS
+
+    return st.sidebar.number_input("Large-chart threshold (points)", min_value=100,
+                                   value=LARGE_CHART_POINTS, step=500, key="large_chart_points")
@@ -0,0 +1,53 @@
+# views/exposure_common.py
+# Helpers shared by the Greek exposure pages in views/.
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+from utils.exposures import years_to_expiry
+
+# Extra choice in the exposure pages' expiry selectors
+ALL_EXPIRATIONS = "All expirations"
+
+def expiry_times(calls, puts, selected_expiry=None):
+    """
+    Time to expiration in years for an exposure page's calls and puts.
+    For one selected expiry both are the same scalar t, shown on the page,
+    or (None, None) if that expiry has passed. With selected_expiry=None
+    (All expirations) every contract uses its own expiry; contracts that
+    have already expired get t <= 0 and drop out as NaN Greeks.
+    """
+    if selected_expiry is None:
+        st.markdown("**Time to Expiration:** per contract, across all expirations")
+        return years_to_expiry(calls['extracted_expiry']), years_to_expiry(puts['extracted_expiry'])
+    t_days = (selected_expiry - datetime.today().date()).days
+    if t_days <= 0:
+        return None, None
+    t = t_days / 365.0
+    st.markdown(f"**Time to Expiration (t in years):** {t:.4f}")
+    return t, t
+
+def show_strike_totals(calls_by_strike, puts_by_strike):
+    """
+    Table of strike-level GEX/DEX/VEX totals for calls, puts and net.
+    """
+    totals = calls_by_strike.merge(puts_by_strike, on='strike', how='outer', suffixes=(' Calls', ' Puts')).fillna(0)
+    totals['Net GEX'] = totals['GEX Calls'] - totals['GEX Puts']
+    totals['Net DEX'] = totals['DEX Calls'] + totals['DEX Puts']
+    totals['Net VEX'] = totals['VEX Calls'] + totals['VEX Puts']
+    with st.expander("Strike-level totals across all expirations"):
+        st.dataframe(totals.sort_values('strike'))
+
+def strike_zoom(calls, puts, max_points, key):
+    """
+    For charts above max_points, a strike-range slider to zoom into. Charts
+    are binned by strike until the chosen range holds max_points or fewer
+    contracts, then show every strike. Returns the range, or None.
+    """
+    if len(calls) + len(puts) <= max_points:
+        return None
+    strikes = pd.concat([calls['strike'], puts['strike']]).astype(float)
+    low, high = float(strikes.min()), float(strikes.max())
+    st.caption(f"{len(strikes)} points: charts are binned by strike. Narrow the range for full per-strike detail.")
+    return st.slider("Zoom to strikes:", min_value=low, max_value=high, value=(low, high), key=key)
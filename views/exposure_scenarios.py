@@ -0,0 +1,102 @@
+# views/exposure_scenarios.py
+from datetime import datetime
+
+import numpy as np
+import streamlit as st
+
+from utils.data_fetcher import format_ticker
+from utils.exposures import chain_exposures
+from utils.figure_cache import cached_figure
+from utils.exposure_charts import create_scenario_heatmap
+from utils.quotes import get_spot
+from utils.scenarios import chain_scenarios, scenario_frame, DEFAULT_DAYS_FORWARD
+from utils.timing import render_chart
+from views.common import fetch_chain
+from views.exposure_common import ALL_EXPIRATIONS, expiry_times
+
+# Label shown for each scenario_grid value
+EXPOSURE_LABELS = {"Net GEX": "net_gex", "Net DEX": "net_dex", "Net VEX": "net_vex"}
+DAYS_FORWARD_CHOICES = [0, 1, 2, 3, 5, 7, 10, 14, 21, 30]
+
+
+def render(solve_iv=False):
+    """
+    Exposure Scenarios page: net GEX, DEX or VEX of the chain stressed over
+    a grid of spot shocks, IV shifts and days forward, shown as a spot x IV
+    heatmap for one horizon.
+    Returns the ticker shown, so the caller can keep it refreshed.
+    """
+    user_ticker = st.text_input("Enter Stock Ticker (e.g., AAPL, TSLA, SPX):", "AAPL", key="scenario_ticker")
+    ticker = format_ticker(user_ticker)  # Apply formatting here
+
+    if ticker:
+        chain, data_version = fetch_chain(ticker)
+        if chain.empty:
+            st.warning("No options data available for this ticker.")
+        else:
+            unique_exps = chain.expiries
+            if not unique_exps:
+                st.error("No expiration dates could be extracted from contract symbols.")
+            else:
+                unique_exps_str = [d.strftime("%Y-%m-%d") for d in unique_exps]
+                # Stress tests usually cover the whole book, so default to every expiry
+                expiry_date_str = st.selectbox("Select an Expiry Date (extracted from contract symbols):",
+                                               options=unique_exps_str + [ALL_EXPIRATIONS],
+                                               index=len(unique_exps_str), key="scenario_expiry")
+                all_expiries = expiry_date_str == ALL_EXPIRATIONS
+                calls, puts = chain.calls, chain.puts
+                if not all_expiries:
+                    selected_expiry = datetime.strptime(expiry_date_str, "%Y-%m-%d").date()
+                    calls, puts = chain.select(selected_expiry)
+
+                # Grid of scenarios
+                col_spot, col_iv = st.columns(2)
+                with col_spot:
+                    spot_range = st.slider("Spot shock range (%):", -50, 50, (-10, 10), key="scenario_spot_range")
+                    spot_steps = st.number_input("Spot steps:", min_value=2, max_value=200, value=50,
+                                                 key="scenario_spot_steps")
+                with col_iv:
+                    iv_range = st.slider("IV shift range (vol points):", -50, 50, (-10, 10), key="scenario_iv_range")
+                    iv_steps = st.number_input("IV steps:", min_value=2, max_value=100, value=20,
+                                               key="scenario_iv_steps")
+                days_forward = st.multiselect("Days forward:", DAYS_FORWARD_CHOICES,
+                                              default=list(DEFAULT_DAYS_FORWARD), key="scenario_days")
+                days_forward = sorted(days_forward) or [0]
+                spot_shocks = tuple(np.round(np.linspace(spot_range[0], spot_range[1], int(spot_steps)) / 100, 6).tolist())
+                iv_shifts = tuple(np.round(np.linspace(iv_range[0], iv_range[1], int(iv_steps)) / 100, 6).tolist())
+
+                S, spot_source = get_spot(ticker)
+                if S is None:
+                    st.error("Could not fetch underlying price.")
+                else:
+                    S = round(S, 2)
+                    st.markdown(f"**Underlying Price (S):** {S} (source: {spot_source})")
+                    t_calls, t_puts = expiry_times(calls, puts, None if all_expiries else selected_expiry)
+                    if t_calls is None:
+                        st.error("The selected expiration date is in the past!")
+                    else:
+                        if solve_iv:
+                            # The solved IVs are what the scenarios shift
+                            calls, puts = chain_exposures(ticker, data_version, expiry_date_str, calls, puts,
+                                                          S, t_calls, t_puts, solve_iv=True)
+                        grid = chain_scenarios(ticker, data_version, expiry_date_str, calls, puts, S,
+                                               t_calls, t_puts, spot_shocks, iv_shifts, days_forward,
+                                               solve_iv=solve_iv)
+                        st.caption(f"{len(spot_shocks)} spot x {len(iv_shifts)} IV x {len(days_forward)} day "
+                                   f"scenarios over {len(calls) + len(puts)} contracts")
+
+                        label = st.selectbox("Exposure:", list(EXPOSURE_LABELS), key="scenario_value")
+                        days = st.select_slider("Days forward shown:", options=days_forward, key="scenario_day_shown")
+                        values = grid[EXPOSURE_LABELS[label]][:, :, days_forward.index(days)]
+
+                        # The grid depends on the expiry, spot, IV source, grid axes and today's date
+                        view = (ticker, expiry_date_str, S, solve_iv, datetime.today().date(),
+                                spot_shocks, iv_shifts, tuple(days_forward), label, days)
+                        fig = cached_figure(data_version, view, create_scenario_heatmap, grid["spots"],
+                                            grid["iv_shifts"], values, S, label, days)
+                        render_chart(fig, use_container_width=True)
+
+                        with st.expander("Scenario table"):
+                            st.dataframe(scenario_frame(grid))
+
+    return ticker
@@ -0,0 +1,92 @@
+# views/gamma_exposure.py
+from datetime import datetime
+
+import streamlit as st
+
+from utils.data_fetcher import format_ticker
+from utils.exposures import chain_exposures, strike_exposures, chain_gamma_profile, gamma_flip
+from utils.figure_cache import cached_figure
+from utils.exposure_charts import create_exposure_bubble_chart, create_exposure_bar_chart, create_gamma_profile_chart
+from utils.quotes import get_spot
+from utils.timing import render_chart
+from views.common import fetch_chain, large_chart_threshold
+from views.exposure_common import ALL_EXPIRATIONS, expiry_times, show_strike_totals, strike_zoom
+
+
+def render(solve_iv=False):
+    """
+    Gamma Exposure page: GEX by strike, the net gamma profile and the gamma-flip level.
+    Returns the ticker shown, so the caller can keep it refreshed.
+    """
+    large_chart_points = large_chart_threshold()
+    user_ticker = st.text_input("Enter Stock Ticker (e.g., AAPL, TSLA, SPX):", "AAPL", key="gamma_ticker")
+    ticker = format_ticker(user_ticker)  # Apply formatting here
+    
+    if ticker:
+        chain, data_version = fetch_chain(ticker)
+        if chain.empty:
+            st.warning("No options data available for this ticker.")
+        else:
+            unique_exps = chain.expiries
+            if not unique_exps:
+                st.error("No expiration dates could be extracted from contract symbols.")
+            else:
+                unique_exps_str = [d.strftime("%Y-%m-%d") for d in unique_exps]
+                expiry_date_str = st.selectbox("Select an Expiry Date (extracted from contract symbols):", options=unique_exps_str + [ALL_EXPIRATIONS], key="gamma_expiry")
+                all_expiries = expiry_date_str == ALL_EXPIRATIONS
+                calls, puts = chain.calls, chain.puts
+                if not all_expiries:
+                    selected_expiry = datetime.strptime(expiry_date_str, "%Y-%m-%d").date()
+                    calls, puts = chain.select(selected_expiry)
+                
+                # Get underlying price
+                S, spot_source = get_spot(ticker)
+                if S is None:
+                    st.error("Could not fetch underlying price.")
+                else:
+                    S = round(S, 2)
+                    st.markdown(f"**Underlying Price (S):** {S} (source: {spot_source})")
+                    t_calls, t_puts = expiry_times(calls, puts, None if all_expiries else selected_expiry)
+                    if t_calls is None:
+                        st.error("The selected expiration date is in the past!")
+                    else:
+                        calls, puts = chain_exposures(ticker, data_version, expiry_date_str, calls, puts,
+                                                      S, t_calls, t_puts, solve_iv=solve_iv)
+                        calls = calls.dropna(subset=["calc_gamma"])
+                        puts = puts.dropna(subset=["calc_gamma"])
+                        contract_calls, contract_puts = calls, puts
+                        if all_expiries:
+                            # One bar per strike, summed over every expiry
+                            calls, puts = strike_exposures(calls, puts)
+                            show_strike_totals(calls, puts)
+                        
+                        strike_range = strike_zoom(calls, puts, large_chart_points, key="gex_zoom")
+                        
+                        # Bubble Chart for Gamma Exposure
+                        # Exposures depend on the expiry, spot, IV source and today's date
+                        view = (ticker, expiry_date_str, S, solve_iv, datetime.today().date())
+                        fig_bubble = cached_figure(data_version, view, create_exposure_bubble_chart, calls, puts,
+                                                   'GEX', 'Gamma Exposure', large_chart_points, strike_range)
+                        render_chart(fig_bubble, use_container_width=True)
+                        
+                        # Grouped Bar Chart for Gamma Exposure by Strike
+                        fig_bar = cached_figure(data_version, view, create_exposure_bar_chart, calls, puts,
+                                                'GEX', 'Gamma Exposure', S, large_chart_points, strike_range)
+                        
+                        # Net GEX profile as spot moves +/-10%, with the zero-gamma flip level
+                        spots, net_gex = chain_gamma_profile(ticker, data_version, expiry_date_str, contract_calls,
+                                                             contract_puts, S, solve_iv=solve_iv)
+                        flip = gamma_flip(spots, net_gex, S)
+                        fig_profile = cached_figure(data_version, view, create_gamma_profile_chart, spots, net_gex, S, flip)
+                        
+                        col_bar, col_profile = st.columns(2)
+                        with col_bar:
+                            render_chart(fig_bar, use_container_width=True)
+                        with col_profile:
+                            render_chart(fig_profile, use_container_width=True)
+                        if flip is not None:
+                            st.markdown(f"**Gamma Flip Level:** {flip:.2f}")
+                        else:
+                            st.markdown("**Gamma Flip Level:** net GEX does not change sign within ±10% of spot")
+
+    return ticker
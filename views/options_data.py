@@ -0,0 +1,97 @@
+# views/options_data.py
+from datetime import datetime
+
+import streamlit as st
+
+from utils.data_fetcher import format_ticker
+from utils.figure_cache import cached_figure
+from utils.option_charts import create_oi_volume_charts, create_heatmap
+from utils.quotes import get_spot
+from utils.timing import render_chart
+from views.common import fetch_chain, large_chart_threshold
+
+
+def render(solve_iv=False):
+    """
+    Options Data page: chain table, OI/volume bars and heatmaps for one expiry, with strike and volume filters.
+    Returns the ticker shown, so the caller can keep it refreshed.
+    """
+    large_chart_points = large_chart_threshold()
+    st.write("**Select filters below to see updated data, charts, and tables.**")
+    user_ticker = st.text_input("Enter Stock Ticker (e.g., AAPL, TSLA, SPX, NDX):", "AAPL")
+    ticker = format_ticker(user_ticker)
+    if ticker:
+        chain, data_version = fetch_chain(ticker)
+        if chain.empty:
+            st.warning("No options data available for this ticker.")
+        else:
+            unique_exps = chain.expiries
+            if not unique_exps:
+                st.error("No expiration dates could be extracted from contract symbols.")
+            else:
+                unique_exps_str = [d.strftime("%Y-%m-%d") for d in unique_exps]
+                expiry_date_str = st.selectbox("Select an Expiry Date (extracted from contract symbols):", options=unique_exps_str)
+                selected_expiry = datetime.strptime(expiry_date_str, "%Y-%m-%d").date()
+                calls, puts = chain.select(selected_expiry)
+                if calls.empty and puts.empty:
+                    st.warning("No options data found for the selected expiry.")
+                else:
+                    # Each expiry is sorted by strike, so its ends are the limits.
+                    ends = [df['strike'].iloc[i] for df in (calls, puts) if not df.empty for i in (0, -1)]
+                    min_strike, max_strike = float(min(ends)), float(max(ends))
+                    strike_range = st.slider(
+                        "Select Strike Range:",
+                        min_value=min_strike,
+                        max_value=max_strike,
+                        value=(min_strike, max_strike),
+                        step=1.0
+                    )
+                    volume_over_oi = st.checkbox("Show only rows where Volume > Open Interest")
+                    calls_filtered, puts_filtered = chain.select(selected_expiry, strike_range)
+                    if volume_over_oi:
+                        calls_filtered = calls_filtered[calls_filtered['volume'] > calls_filtered['openInterest']]
+                        puts_filtered = puts_filtered[puts_filtered['volume'] > puts_filtered['openInterest']]
+                    if calls_filtered.empty and puts_filtered.empty:
+                        st.warning("No data left after applying filters.")
+                    else:
+                        # Everything that shaped calls_filtered/puts_filtered
+                        view = (ticker, expiry_date_str, strike_range, volume_over_oi)
+                        charts_container = st.container()
+                        heatmaps_container = st.container()
+                        tables_container = st.container()
+                        with charts_container:
+                            st.subheader(f"Options Data for {ticker} (Expiry: {expiry_date_str})")
+                            if not calls_filtered.empty and not puts_filtered.empty:
+                                S, spot_source = get_spot(ticker)
+                                if S is None:
+                                    st.error("Could not fetch underlying price.")
+                                else:
+                                    fig_oi, fig_volume = cached_figure(data_version, view, create_oi_volume_charts,
+                                                                       calls_filtered, puts_filtered, S, large_chart_points)
+                                    render_chart(fig_oi, use_container_width=True, key="oi_chart")
+                                    render_chart(fig_volume, use_container_width=True, key="vol_chart")
+                            else:
+                                st.warning("No data to chart for the chosen filters.")
+                        with heatmaps_container:
+                            if not calls_filtered.empty and not puts_filtered.empty:
+                                st.write("### Heatmaps")
+                                volume_heatmap = cached_figure(data_version, view, create_heatmap,
+                                                               calls_filtered, puts_filtered, value='volume')
+                                oi_heatmap = cached_figure(data_version, view, create_heatmap,
+                                                           calls_filtered, puts_filtered, value='openInterest')
+                                render_chart(volume_heatmap, use_container_width=True, key="vol_heatmap")
+                                render_chart(oi_heatmap, use_container_width=True, key="oi_heatmap")
+                        with tables_container:
+                            st.write("### Filtered Data Tables")
+                            if not calls_filtered.empty:
+                                st.write("**Calls Table**")
+                                st.dataframe(calls_filtered)
+                            else:
+                                st.write("No calls match filters.")
+                            if not puts_filtered.empty:
+                                st.write("**Puts Table**")
+                                st.dataframe(puts_filtered)
+                            else:
+                                st.write("No puts match filters.")
+
+    return ticker
@@ -0,0 +1,43 @@
+# views/volume_ratio.py
+from datetime import datetime
+
+import streamlit as st
+
+from utils.data_fetcher import format_ticker
+from utils.figure_cache import cached_figure
+from utils.option_charts import create_donut_chart
+from utils.timing import render_chart
+from views.common import fetch_chain
+
+
+def render(solve_iv=False):
+    """
+    Volume Ratio page: call vs put volume for one expiry.
+    Returns the ticker shown, so the caller can keep it refreshed.
+    """
+    user_ticker = st.text_input("Enter Stock Ticker (e.g., AAPL, TSLA):", "AAPL", key="greek_ticker")
+    ticker = format_ticker(user_ticker)
+    if ticker:
+        chain, data_version = fetch_chain(ticker)
+        if chain.empty:
+            st.warning("No options data available for this ticker.")
+        else:
+            unique_exps = chain.expiries
+            if not unique_exps:
+                st.error("No expiration dates could be extracted from contract symbols.")
+            else:
+                unique_exps_str = [d.strftime("%Y-%m-%d") for d in unique_exps]
+                expiry_date_str = st.selectbox("Select an Expiry Date (extracted from contract symbols):", options=unique_exps_str)
+                selected_expiry = datetime.strptime(expiry_date_str, "%Y-%m-%d").date()
+                calls, puts = chain.select(selected_expiry)
+                if calls.empty and puts.empty:
+                    st.warning("No options data found for the selected expiry.")
+                else:
+                    call_volume = calls['volume'].sum()
+                    put_volume = puts['volume'].sum()
+                    fig = cached_figure(data_version, (ticker, expiry_date_str), create_donut_chart, call_volume, put_volume)
+                    render_chart(fig, use_container_width=True, key="donut_chart")
+                    st.markdown(f"**Total Call Volume:** {call_volume}")
+                    st.markdown(f"**Total Put Volume:** {put_volume}")
+
+    return ticker